@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark native table slide generation with and without the prototype-cell
+fast path (PowerPointBuilderService.FAST_TABLES).
+
+Usage: python benchmark_table_slides.py [risk_count] [change_count] [repeats]
+"""
+import sys
+import time
+
+from services.builder_service import create_builder
+
+RISKS_PER_SLIDE = 8
+
+
+def build_slides_data(risk_count: int, change_count: int) -> list:
+    """Risk register pages plus a long schedule-change table."""
+    risks = [
+        {
+            'id': f"R-{n:04d}",
+            'title': f"Supplier capacity risk {n}",
+            'mitigation': f"Qualify second source for part {n}",
+            'severity_normalized': ['critical', 'high', 'medium', 'low'][n % 4],
+            'status': 'open',
+            'owner': f"Owner {n % 7}",
+            'likelihood': n % 5 + 1,
+            'impact': n % 3 + 2,
+        }
+        for n in range(risk_count)
+    ]
+    total_pages = max(1, -(-risk_count // RISKS_PER_SLIDE))
+    slides_data = [
+        {
+            'type': 'risks',
+            'data': risks[page * RISKS_PER_SLIDE:(page + 1) * RISKS_PER_SLIDE],
+            'title': 'Risk Register',
+            'page_num': page + 1,
+            'total_pages': total_pages,
+        }
+        for page in range(total_pages)
+    ]
+    changes = [
+        {
+            'milestone_name': f"Milestone {n}",
+            'old_date': '2025-01-01',
+            'new_date': '2025-02-01',
+            'reason': f"Tooling delay on line {n % 4}",
+            'impact': 'Expedite freight and add weekend shift',
+        }
+        for n in range(change_count)
+    ]
+    slides_data.append({'type': 'changes', 'data': changes, 'title': 'Schedule Changes'})
+    return slides_data
+
+
+def time_build(slides_data: list, fast: bool, repeats: int) -> float:
+    """Best-of-N wall time for one deck."""
+    best = float('inf')
+    for _ in range(repeats):
+        builder = create_builder()
+        builder.FAST_TABLES = fast
+        started = time.perf_counter()
+        builder.generate_hybrid_presentation({'title': 'Benchmark'}, slides_data)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+if __name__ == "__main__":
+    risk_count = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    change_count = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    repeats = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+
+    slides_data = build_slides_data(risk_count, change_count)
+    slow = time_build(slides_data, fast=False, repeats=repeats)
+    fast = time_build(slides_data, fast=True, repeats=repeats)
+
+    print(f"{risk_count} risks, {change_count} changes, best of {repeats}")
+    print(f"  per-cell formatting: {slow:.3f}s")
+    print(f"  prototype stamping:  {fast:.3f}s ({slow / fast:.2f}x)")
@@ -137,9 +137,31 @@ async def startup_event():
         logger.warning(f"Could not load projects: {e}")
         project_repo = ProjectRepository(data_dir=DATA_DIR)
     
+    # Warm start the screenshot browser (BROWSER_PRELAUNCH=true)
+    from routers.powerpoint_reports import screenshot_service, export_job_manager, export_cache
+    await screenshot_service.browser_manager.start()
+    
+    # Expire finished export jobs and their files
+    export_job_manager.start_cleanup()
+    
+    # Trim exports left over from previous runs to the cache limits
+    export_cache.enforce_limits()
+    
     logger.info("Systems³ Project Reporter started successfully!")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release resources on shutdown"""
+    from routers.powerpoint_reports import screenshot_service, export_job_manager
+    from routers.risks import risk_import_job_manager
+    from services.build_pool import shutdown_build_pool
+    await export_job_manager.shutdown()
+    await risk_import_job_manager.shutdown()
+    await screenshot_service.close()
+    shutdown_build_pool()
+
+
 @app.get("/")
 async def root(request: Request):
     """Landing page - shows user info if logged in"""
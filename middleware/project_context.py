@@ -36,6 +36,21 @@ def _get_user_repo(request: Request) -> ProjectRepository:
     )
 
 
+def _get_export_snapshot(request: Request):
+    """
+    Get the export snapshot a screenshot render should read from.
+    
+    Pages captured during a PowerPoint export carry the X-Export-Snapshot
+    header so they show the same data as the rest of the deck.
+    """
+    token = request.headers.get('X-Export-Snapshot') if hasattr(request, 'headers') else None
+    if not token:
+        return None
+    from services.export_snapshot import export_snapshots
+    user_id = getattr(request.state, 'user_id', None) if hasattr(request, 'state') else None
+    return export_snapshots.get(token, user_id)
+
+
 def get_selected_project_code(request: Request) -> Optional[str]:
     """
     Get selected project code from request
@@ -86,9 +101,15 @@ def get_selected_project(request: Request):
     if not project_code:
         return None
     
-    # Get user-scoped repository
-    repo = _get_user_repo(request)
-    project = repo.get_project_by_code(project_code)
+    snapshot = _get_export_snapshot(request)
+    if snapshot is not None:
+        project = next(
+            (p for p in snapshot.projects if p.project_code == project_code), None
+        )
+    else:
+        # Get user-scoped repository
+        repo = _get_user_repo(request)
+        project = repo.get_project_by_code(project_code)
     
     if not project:
         logger.error(f"❌ Project {project_code} not found in repository")
@@ -114,6 +135,10 @@ def get_all_projects(request: Request = None):
         legacy_repo = ProjectRepository(data_dir=DATA_DIR)
         return legacy_repo.load_all_projects()
     
+    snapshot = _get_export_snapshot(request)
+    if snapshot is not None:
+        return list(snapshot.projects)
+    
     # Get user-scoped repository
     repo = _get_user_repo(request)
     return repo.load_all_projects()
@@ -0,0 +1,154 @@
+"""
+Risk Aggregates
+Counts over one program's risk register: the 3x3 likelihood x impact
+matrix, severity distribution, owner (raw and anonymized) and category
+breakdowns and open vs closed. Built with pandas group-bys when a register is loaded, then kept up
+to date by adding/subtracting each written risk, so readers (heat-map card
+and slide, metrics) get them without touching the risks.
+"""
+from typing import Any, Callable, Dict, Iterable, Optional
+
+import pandas as pd
+
+SEVERITY_LEVELS = ('critical', 'high', 'medium', 'low')
+
+# Matrix axes: matrix[likelihood][impact], low -> high
+MATRIX_LEVELS = ('low', 'medium', 'high')
+
+UNASSIGNED = 'Unassigned'
+UNCATEGORIZED = 'Uncategorized'
+
+
+def _status(risk: Dict[str, Any]) -> str:
+    return str(risk.get('status') or 'open').lower()
+
+
+def _level(value: Any) -> str:
+    return str(value).strip().lower() if value is not None else ''
+
+
+class RiskAggregates:
+    """Incrementally maintained counts of one register."""
+
+    def __init__(self, label_owner: Optional[Callable[[str], str]] = None):
+        """
+        Args:
+            label_owner: Maps an owner to its anonymized label (e.g.
+                OwnerLabels.label); owners are counted under their labels in
+                labeled_owners as well. Without it labels are the owners.
+        """
+        self.label_owner = label_owner
+        self.total = 0
+        self.severity = {level: 0 for level in SEVERITY_LEVELS}
+        self.status: Dict[str, int] = {}
+        self.matrix = [[0] * len(MATRIX_LEVELS) for _ in MATRIX_LEVELS]
+        self.owners: Dict[str, int] = {}
+        self.labeled_owners: Dict[str, int] = {}
+        self.categories: Dict[str, int] = {}
+
+    @classmethod
+    def from_risks(
+        cls,
+        risks: Iterable[Dict[str, Any]],
+        label_owner: Optional[Callable[[str], str]] = None
+    ) -> "RiskAggregates":
+        """
+        Count a whole register in one pass of vectorized group-bys.
+
+        Args:
+            risks: Risk dictionaries
+            label_owner: Owner -> anonymized label (see __init__)
+
+        Returns:
+            RiskAggregates
+        """
+        aggregates = cls(label_owner)
+        risks = list(risks)
+        if not risks:
+            return aggregates
+
+        frame = pd.DataFrame({
+            'severity': [risk.get('severity_normalized', 'medium') for risk in risks],
+            'status': [risk.get('status') for risk in risks],
+            'likelihood': [risk.get('likelihood') for risk in risks],
+            'impact': [risk.get('impact') for risk in risks],
+            'owner': [risk.get('owner') for risk in risks],
+            'category': [risk.get('category') for risk in risks]
+        }, dtype=object)
+
+        aggregates.total = len(frame)
+        for severity, count in frame['severity'].value_counts().items():
+            if severity in aggregates.severity:
+                aggregates.severity[severity] = int(count)
+
+        status = frame['status'].where(frame['status'].astype(bool), 'open').astype(str).str.lower()
+        aggregates.status = {key: int(count) for key, count in status.value_counts().items()}
+
+        levels = pd.CategoricalDtype(MATRIX_LEVELS)
+        matrix = (
+            pd.DataFrame({
+                'likelihood': frame['likelihood'].map(_level).astype(levels),
+                'impact': frame['impact'].map(_level).astype(levels)
+            })
+            .groupby(['likelihood', 'impact'], observed=False)
+            .size()
+            .unstack(fill_value=0)
+            .reindex(index=list(MATRIX_LEVELS), columns=list(MATRIX_LEVELS), fill_value=0)
+        )
+        aggregates.matrix = [[int(count) for count in row] for row in matrix.to_numpy()]
+
+        owners = frame['owner'].where(frame['owner'].astype(bool), UNASSIGNED)
+        aggregates.owners = {str(key): int(count) for key, count in owners.value_counts().items()}
+        for owner, count in aggregates.owners.items():
+            label = aggregates._label(owner)
+            aggregates.labeled_owners[label] = aggregates.labeled_owners.get(label, 0) + count
+        categories = frame['category'].where(frame['category'].astype(bool), UNCATEGORIZED)
+        aggregates.categories = {str(key): int(count) for key, count in categories.value_counts().items()}
+        return aggregates
+
+    def add(self, risk: Dict[str, Any], delta: int):
+        """Count a risk in (delta=1) or out (delta=-1)."""
+        self.total += delta
+
+        severity = risk.get('severity_normalized', 'medium')
+        if severity in self.severity:
+            self.severity[severity] += delta
+
+        self._bump(self.status, _status(risk), delta)
+        owner = str(risk.get('owner') or UNASSIGNED)
+        self._bump(self.owners, owner, delta)
+        self._bump(self.labeled_owners, self._label(owner), delta)
+        self._bump(self.categories, str(risk.get('category') or UNCATEGORIZED), delta)
+
+        likelihood, impact = _level(risk.get('likelihood')), _level(risk.get('impact'))
+        if likelihood in MATRIX_LEVELS and impact in MATRIX_LEVELS:
+            self.matrix[MATRIX_LEVELS.index(likelihood)][MATRIX_LEVELS.index(impact)] += delta
+
+    def _label(self, owner: str) -> str:
+        if owner == UNASSIGNED or self.label_owner is None:
+            return owner
+        return self.label_owner(owner)
+
+    @staticmethod
+    def _bump(counts: Dict[str, int], key: str, delta: int):
+        count = counts.get(key, 0) + delta
+        if count:
+            counts[key] = count
+        else:
+            counts.pop(key, None)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Copy of the counts."""
+        return {
+            'total': self.total,
+            'severity_counts': dict(self.severity),
+            'status_counts': dict(self.status),
+            'open': self.status.get('open', 0),
+            'closed': self.status.get('closed', 0),
+            'matrix': [list(row) for row in self.matrix],
+            'matrix_levels': list(MATRIX_LEVELS),
+            'owners': dict(self.owners),
+            'labeled_owners': dict(self.labeled_owners),
+            'categories': dict(self.categories)
+        }
+
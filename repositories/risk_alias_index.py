@@ -0,0 +1,180 @@
+"""
+Risk Alias Index
+Persistent map from every name a program is known by (uploaded file/program
+name, project name, project code) to the canonical program name its risk
+register is stored under. Lookups try the query as given and then the
+cleaned variants the routers used to derive by hand (extension stripped,
+"-09" version suffix stripped, and for the PDF export only, the text before
+the first dash), so no caller needs its own cleaning rules or a directory
+listing.
+"""
+from typing import Dict, Iterable, List, Optional
+import json
+import logging
+import os
+import re
+import threading
+
+logger = logging.getLogger(__name__)
+
+INDEX_NAME = "program_aliases.json"
+
+
+def name_variants(name: str, prefix: bool = False) -> List[str]:
+    """
+    Names to try for a program, most specific first.
+
+    Args:
+        name: Program name, project name or code as received
+        prefix: Also try the part before the first dash (only the PDF
+            export cleaned names that way; "ABC-Phase Two" is not "ABC")
+
+    Returns:
+        The name, without .xml/.xlsx/.yaml, without a trailing -NN version,
+        and (with prefix) the part before the first dash
+    """
+    variants = [name.strip()]
+    base = name.replace('.xml', '').replace('.xlsx', '').replace('.yaml', '').strip()
+    variants.append(base)
+    variants.append(re.sub(r'-\d+$', '', base).strip())
+    if prefix and '-' in base:
+        variants.append(base.split('-')[0].strip())
+    return [v for i, v in enumerate(variants) if v and v not in variants[:i]]
+
+
+def alias_key(name: str) -> str:
+    """Case-insensitive lookup key."""
+    return name.strip().casefold()
+
+
+class RiskAliasIndex:
+    """Name -> canonical risk register lookup, persisted next to the registers."""
+
+    def __init__(self, storage_dir: str):
+        """
+        Initialize the index, building it from the register files on first use.
+
+        Args:
+            storage_dir: Directory holding <program>_risks.json files
+        """
+        self.storage_dir = storage_dir
+        self.path = os.path.join(storage_dir, INDEX_NAME)
+        self._lock = threading.Lock()
+        self._programs: Dict[str, List[str]] = {}
+        self._keys: Dict[str, str] = {}
+        self._load()
+
+    def resolve(self, name: str, exact: bool = False, prefix: bool = False) -> Optional[str]:
+        """
+        Find the canonical program for a name.
+
+        Args:
+            name: Program name, project name or code, in any of the forms
+                callers receive it (with extension/version suffix)
+            exact: Only match the name itself, not its cleaned variants
+                (writes must not land in a program that merely shares a prefix)
+            prefix: Also try the text before the first dash
+
+        Returns:
+            Canonical program name, or None if no register is known
+        """
+        if not name:
+            return None
+        with self._lock:
+            for variant in ([name] if exact else name_variants(name, prefix)):
+                canonical = self._keys.get(alias_key(variant))
+                if canonical is not None:
+                    return canonical
+        return None
+
+    def add(self, program_name: str, aliases: Iterable[str] = ()):
+        """
+        Register a program's register and extra names for it. Persisted only
+        if something changed; an alias of another program moves to this one,
+        but another program's own (canonical) name is never taken over.
+
+        Args:
+            program_name: Canonical name the register is saved under
+            aliases: Other names (uploaded name, project name/code)
+        """
+        with self._lock:
+            changed = program_name not in self._programs
+            names = self._programs.setdefault(program_name, [])
+            for name in [program_name, *aliases]:
+                if not name or not name.strip():
+                    continue
+                key = alias_key(name)
+                owner = self._keys.get(key)
+                if owner == program_name:
+                    continue
+                if owner is not None and alias_key(owner) == key:
+                    logger.warning(f"⚠️ Risk alias '{name}' is the name of program '{owner}', not moved to '{program_name}'")
+                    continue
+                if owner is not None:
+                    logger.info(f"🔀 Risk alias '{name}' moved from '{owner}' to '{program_name}'")
+                    self._programs[owner] = [n for n in self._programs[owner] if alias_key(n) != key]
+                self._keys[key] = program_name
+                if name not in names:
+                    names.append(name)
+                changed = True
+            if changed:
+                self._save()
+
+    def remove(self, program_name: str):
+        """Forget a deleted program and all its aliases."""
+        with self._lock:
+            names = self._programs.pop(program_name, None)
+            if names is None:
+                return
+            for name in names:
+                if self._keys.get(alias_key(name)) == program_name:
+                    del self._keys[alias_key(name)]
+            self._save()
+
+    def programs(self) -> List[str]:
+        """Canonical names of all known registers."""
+        with self._lock:
+            return list(self._programs)
+
+    def _load(self):
+        """Read the index, or rebuild it from the register files once."""
+        try:
+            with open(self.path, 'r') as f:
+                self._programs = json.load(f).get('programs', {})
+        except FileNotFoundError:
+            self._rebuild()
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Risk alias index unreadable ({e}), rebuilding")
+            self._rebuild()
+            return
+        self._keys = {}
+        for program_name, names in self._programs.items():
+            for name in names:
+                self._keys[alias_key(name)] = program_name
+        # A program's own name always resolves to it
+        for program_name in self._programs:
+            self._keys[alias_key(program_name)] = program_name
+
+    def _rebuild(self):
+        """Index the registers already on disk (first start after upgrade)."""
+        self._programs, self._keys = {}, {}
+        if os.path.isdir(self.storage_dir):
+            for filename in sorted(os.listdir(self.storage_dir)):
+                if not filename.endswith('_risks.json'):
+                    continue
+                try:
+                    with open(os.path.join(self.storage_dir, filename), 'r') as f:
+                        program_name = json.load(f).get('program_name') or filename[:-len('_risks.json')]
+                except (OSError, ValueError):
+                    continue
+                self._programs[program_name] = [program_name]
+                self._keys[alias_key(program_name)] = program_name
+        self._save()
+        logger.info(f"🗂️ Built risk alias index for {len(self._programs)} programs")
+
+    def _save(self):
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump({'programs': self._programs}, f, indent=2)
+        os.replace(temp_path, self.path)
@@ -0,0 +1,94 @@
+"""
+Risk Manifest
+One small file (risk_manifest.json) summarizing every risk register in a
+storage directory: program name, risk count, severity and status counts,
+last update and file path. RiskStore updates the entry of a program every
+time it persists a change, so program listings, dashboard totals and risk
+metric cards never have to open the registers themselves.
+"""
+from typing import Any, Dict, List, Optional
+import json
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "risk_manifest.json"
+
+
+class RiskManifest:
+    """Program name -> register summary, persisted next to the registers."""
+
+    def __init__(self, storage_dir: str):
+        """
+        Initialize the manifest from disk.
+
+        Args:
+            storage_dir: Directory holding <program>_risks.json files
+        """
+        self.path = os.path.join(storage_dir, MANIFEST_NAME)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self.loaded = self._load()
+
+    def get(self, program_name: str) -> Optional[Dict[str, Any]]:
+        """Summary of one program (a copy), or None if it has no register."""
+        with self._lock:
+            entry = self._entries.get(program_name)
+            return self._copy(entry) if entry is not None else None
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Summaries of all registers, ordered by program name."""
+        with self._lock:
+            return [self._copy(self._entries[name]) for name in sorted(self._entries)]
+
+    def record(self, entry: Dict[str, Any]):
+        """
+        Store a program's current summary.
+
+        Args:
+            entry: Dict with program_name, risk_count, severity_counts,
+                status_counts, last_updated and filepath
+        """
+        with self._lock:
+            self._entries[entry['program_name']] = self._copy(entry)
+            self._save()
+
+    def remove(self, program_name: str):
+        """Forget a deleted program."""
+        with self._lock:
+            if self._entries.pop(program_name, None) is not None:
+                self._save()
+
+    def replace_all(self, entries: List[Dict[str, Any]]):
+        """Replace every summary at once (used when rebuilding)."""
+        with self._lock:
+            self._entries = {entry['program_name']: self._copy(entry) for entry in entries}
+            self._save()
+        self.loaded = True
+
+    @staticmethod
+    def _copy(entry: Dict[str, Any]) -> Dict[str, Any]:
+        copy = dict(entry)
+        copy['severity_counts'] = dict(entry.get('severity_counts', {}))
+        copy['status_counts'] = dict(entry.get('status_counts', {}))
+        return copy
+
+    def _load(self) -> bool:
+        """Read the manifest; False if it has to be rebuilt."""
+        try:
+            with open(self.path, 'r') as f:
+                self._entries = json.load(f).get('programs', {})
+            return True
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError) as e:
+            logger.warning(f"Risk manifest unreadable ({e}), rebuilding")
+            return False
+
+    def _save(self):
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump({'programs': self._entries}, f, indent=2)
+        os.replace(temp_path, self.path)
@@ -0,0 +1,81 @@
+"""
+Risk Owner Labels
+Owner names are shown as "Owner A", "Owner B", ... in the order owners first
+appear in a program's register, after sensitive company names are replaced.
+The risk store keeps one OwnerAnonymizer per register and extends it as
+risks are written, so every reader gets the same label for an owner.
+"""
+from typing import Dict, Iterable, List
+
+# Sensitive words to replace for privacy
+SENSITIVE_REPLACEMENTS = {
+    'Safran': 'Client 1',
+    'safran': 'Client 1',
+    'SAFRAN': 'CLIENT 1',
+}
+
+
+class OwnerAnonymizer:
+    """Anonymizes owner names to prevent PII exposure"""
+    
+    def __init__(self):
+        self._name_map: Dict[str, str] = {}
+        self._counter = 0
+    
+    def anonymize(self, name: str) -> str:
+        """Convert real name to anonymous placeholder like 'Owner A'"""
+        if not name:
+            return name
+        
+        # Sanitize sensitive company names first
+        sanitized = name
+        for sensitive, replacement in SENSITIVE_REPLACEMENTS.items():
+            sanitized = sanitized.replace(sensitive, replacement)
+        
+        # Check if already anonymized
+        if sanitized in self._name_map:
+            return self._name_map[sanitized]
+        
+        # Generate new anonymous name
+        self._counter += 1
+        if self._counter <= 26:
+            anon_name = f"Owner {chr(64 + self._counter)}"
+        else:
+            first = chr(64 + ((self._counter - 1) // 26))
+            second = chr(65 + ((self._counter - 1) % 26))
+            anon_name = f"Owner {first}{second}"
+        
+        self._name_map[sanitized] = anon_name
+        return anon_name
+
+
+class OwnerLabels:
+    """Labels of one register's owners, assigned on first appearance.
+
+    Labels are only ever added: deleting an owner's last risk keeps its
+    label, so no other owner's label shifts.
+    """
+
+    def __init__(self, owners: Iterable[str] = ()):
+        self._anonymizer = OwnerAnonymizer()
+        self._labels: Dict[str, str] = {}
+        for owner in owners:
+            self.label(owner)
+
+    def label(self, owner: str) -> str:
+        """Label of an owner, assigning the next one if it is new."""
+        if not owner:
+            return owner
+        label = self._labels.get(owner)
+        if label is None:
+            label = self._labels[owner] = self._anonymizer.anonymize(owner)
+        return label
+
+    def to_dict(self) -> Dict[str, str]:
+        """Copy of the owner -> label map."""
+        return dict(self._labels)
+
+    def order(self) -> List[str]:
+        """Owners in the order their labels were assigned (persisted so
+        labels survive a reload)."""
+        return list(self._labels)
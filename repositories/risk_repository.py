@@ -4,56 +4,15 @@ Manages storage and retrieval of normalized risk data.
 
 PRIVACY: Owner names are anonymized at load time.
 """
-import json
 import os
 import re
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+from typing import Callable, Iterable, Iterator, List, Dict, Any, Optional, Set, Tuple
 from pathlib import Path
 import logging
 
-logger = logging.getLogger(__name__)
-
-# Sensitive words to replace for privacy
-SENSITIVE_REPLACEMENTS = {
-    'Safran': 'Client 1',
-    'safran': 'Client 1',
-    'SAFRAN': 'CLIENT 1',
-}
-
+from repositories.risk_store import get_risk_store
 
-class OwnerAnonymizer:
-    """Anonymizes owner names to prevent PII exposure"""
-    
-    def __init__(self):
-        self._name_map: Dict[str, str] = {}
-        self._counter = 0
-    
-    def anonymize(self, name: str) -> str:
-        """Convert real name to anonymous placeholder like 'Owner A'"""
-        if not name:
-            return name
-        
-        # Sanitize sensitive company names first
-        sanitized = name
-        for sensitive, replacement in SENSITIVE_REPLACEMENTS.items():
-            sanitized = sanitized.replace(sensitive, replacement)
-        
-        # Check if already anonymized
-        if sanitized in self._name_map:
-            return self._name_map[sanitized]
-        
-        # Generate new anonymous name
-        self._counter += 1
-        if self._counter <= 26:
-            anon_name = f"Owner {chr(64 + self._counter)}"
-        else:
-            first = chr(64 + ((self._counter - 1) // 26))
-            second = chr(65 + ((self._counter - 1) % 26))
-            anon_name = f"Owner {first}{second}"
-        
-        self._name_map[sanitized] = anon_name
-        return anon_name
+logger = logging.getLogger(__name__)
 
 
 class RiskRepository:
@@ -79,6 +38,9 @@ class RiskRepository:
         self.storage_dir = storage_dir
         os.makedirs(storage_dir, exist_ok=True)
         
+        # Records are shared by every repository on the same directory
+        self.store = get_risk_store(storage_dir)
+        
         # Log storage location for debugging
         logger.info(f"RiskRepository initialized with storage_dir: {self.storage_dir}")
         logger.info(f"DATA_STORAGE_PATH env var: {os.getenv('DATA_STORAGE_PATH', 'NOT SET')}")
@@ -96,105 +58,328 @@ class RiskRepository:
         Returns:
             Path to saved file
         """
-        # Create safe filename from program name
-        safe_name = "".join(
-            c if c.isalnum() or c in (' ', '-', '_') else '_' 
-            for c in program_name
-        ).strip()
-        
-        filename = f"{safe_name}_risks.json"
-        filepath = os.path.join(self.storage_dir, filename)
-        
-        # Add metadata
-        data = {
-            'program_name': program_name,
-            'risks': risks,
-            'risk_count': len(risks),
-            'last_updated': datetime.now().isoformat(),
-            'severity_counts': self._count_by_severity(risks)
-        }
-        
-        with open(filepath, 'w') as f:
-            json.dump(data, f, indent=2)
-        
-        return filepath
+        program_name = self._canonical(program_name)
+        return self.store.replace_all(program_name, risks)
     
+    def save_risks_stream(
+        self,
+        program_name: str,
+        risk_chunks: Iterable[List[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """
+        Save risks for a program from an iterator of chunks, writing each
+        chunk as it arrives (same file layout as save_risks).
+
+        The in-memory register is built from the same chunks, and the file
+        is moved into place only once complete, so a failed import leaves
+        the previous risks untouched.
+
+        Args:
+            program_name: Name of the program
+            risk_chunks: Lists of normalized risk dictionaries
+
+        Returns:
+            Dict with filepath, risk_count and severity_counts
+        """
+        program_name = self._canonical(program_name)
+        return self.store.replace_stream(program_name, risk_chunks)
+
     def load_risks(self, program_name: str) -> Optional[List[Dict[str, Any]]]:
         """
         Load risks for a program.
         
         Args:
-            program_name: Name of the program
+            program_name: Program name, project name or code (cleaned or not;
+                resolved through the alias index)
             
         Returns:
             List of risks or None if not found
         """
-        # Create safe filename from program name
-        safe_name = "".join(
-            c if c.isalnum() or c in (' ', '-', '_') else '_' 
-            for c in program_name
-        ).strip()
-        
-        filename = f"{safe_name}_risks.json"
-        filepath = os.path.join(self.storage_dir, filename)
-        
-        # Debug logging
-        print(f"🔍 RiskRepository.load_risks() called with program_name: '{program_name}'")
-        print(f"🔍 Constructed safe_name: '{safe_name}'")
-        print(f"🔍 Looking for filename: '{filename}'")
-        print(f"🔍 Full filepath: '{filepath}'")
-        print(f"🔍 File exists: {os.path.exists(filepath)}")
-        
-        # List actual files in directory
-        if os.path.exists(self.storage_dir):
-            actual_files = os.listdir(self.storage_dir)
-            print(f"🔍 Actual files in {self.storage_dir}: {actual_files}")
-        else:
-            print(f"🔍 Storage directory does not exist: {self.storage_dir}")
-        
-        if not os.path.exists(filepath):
-            print(f"❌ Risk file not found: {filepath}")
+        canonical = self.resolve_program(program_name)
+        risks = self.store.list(canonical) if canonical else None
+        if risks is None:
+            logger.debug(f"No risk register for '{program_name}'")
             return None
         
-        try:
-            with open(filepath, 'r') as f:
-                data = json.load(f)
-            risks = data.get('risks', [])
+        # PRIVACY: Anonymize owner names
+        labels = self.store.owner_labels(canonical)
+        for risk in risks:
+            if 'owner' in risk and risk['owner']:
+                risk['owner'] = self._owner_label(canonical, labels, risk['owner'])
+        
+        return risks
+
+    def load_sequenced_risks(self, program_name: str) -> Optional[List[Tuple[int, Dict[str, Any]]]]:
+        """
+        Load risks for a program with their sequence numbers (assigned when
+        a risk is added, increasing along register order and never reused,
+        so they identify a place in the register across edits).
+        
+        Args:
+            program_name: Program name, project name or code
             
-            # PRIVACY: Anonymize owner names
-            anonymizer = OwnerAnonymizer()
+        Returns:
+            List of (sequence, risk) pairs, owners anonymized as in
+            load_risks, or None if not found
+        """
+        canonical = self.resolve_program(program_name)
+        sequenced = self.store.list_sequenced(canonical) if canonical else None
+        if sequenced is None:
+            return None
+        
+        # PRIVACY: Anonymize owner names
+        labels = self.store.owner_labels(canonical)
+        for _, risk in sequenced:
+            if risk.get('owner'):
+                risk['owner'] = self._owner_label(canonical, labels, risk['owner'])
+        return sequenced
+
+    def iter_risks(self, program_name: str) -> Optional[Iterator[Dict[str, Any]]]:
+        """
+        Stream risks for a program without materializing the register.
+
+        Owners get the same labels load_risks would give them.
+
+        Args:
+            program_name: Program name, project name or code
+
+        Returns:
+            Iterator of risks in register order, or None if not found
+        """
+        canonical = self.resolve_program(program_name)
+        risks = self.store.iterate(canonical) if canonical else None
+        if risks is None:
+            return None
+
+        labels = self.store.owner_labels(canonical)
+
+        def anonymized():
             for risk in risks:
-                if 'owner' in risk and risk['owner']:
-                    risk['owner'] = anonymizer.anonymize(risk['owner'])
+                if risk.get('owner'):
+                    risk['owner'] = self._owner_label(canonical, labels, risk['owner'])
+                yield risk
+
+        return anonymized()
+
+    def get_risk_ids(self, program_name: str) -> Set[str]:
+        """
+        IDs already used by a program's risks, read from the store's ID
+        index without copying the risks.
+        
+        Args:
+            program_name: Program name, project name or code
             
-            return risks
-        except Exception as e:
-            print(f"Error loading risks: {e}")
+        Returns:
+            Set of risk IDs (empty if the program has no register)
+        """
+        canonical = self.resolve_program(program_name)
+        return self.store.ids(canonical) if canonical else set()
+    
+    def resolve_program(self, *names: str, prefix: bool = False) -> Optional[str]:
+        """
+        Find the register a program is stored under.
+        
+        Args:
+            names: Candidate names (e.g. project name, then project code)
+            prefix: Also try the text before the first dash of each name
+            
+        Returns:
+            Canonical program name or None if none has risks
+        """
+        for name in names:
+            canonical = self.store.aliases.resolve(name, prefix=prefix)
+            if canonical:
+                return canonical
+        return None
+    
+    def add_aliases(self, program_name: str, aliases: List[str]):
+        """
+        Record other names a program's risks should be found by.
+        
+        Args:
+            program_name: Name the risks were saved under
+            aliases: Uploaded program name, project name and code, ...
+        """
+        self.store.aliases.add(self._canonical(program_name), aliases)
+    
+    def count_risks(self, *names: str) -> int:
+        """Number of risks of a program found by any of the names (0 if none)."""
+        summary = self.get_summary(*names)
+        return summary['risk_count'] if summary else 0
+    
+    def get_summary(self, *names: str) -> Optional[Dict[str, Any]]:
+        """
+        Manifest entry of a program, without loading its risks.
+        
+        Args:
+            names: Candidate names (e.g. project name, then project code)
+            
+        Returns:
+            Dict with program_name, risk_count, severity_counts,
+            status_counts, last_updated and filepath, or None
+        """
+        canonical = self.resolve_program(*names)
+        return self.store.manifest.get(canonical) if canonical else None
+    
+    def get_aggregates(self, *names: str) -> Optional[Dict[str, Any]]:
+        """
+        Precomputed counts of a program's register, without loading its risks.
+        
+        Args:
+            names: Candidate names (e.g. project name, then project code)
+            
+        Returns:
+            Dict with total, severity_counts, status_counts, open, closed,
+            matrix (likelihood x impact, low -> high), owners (anonymized)
+            and categories, or None if the program has no risks
+        """
+        canonical = self.resolve_program(*names)
+        if canonical is None or not self.store.exists(canonical):
             return None
+        aggregates = self.store.aggregates(canonical)
+        
+        # PRIVACY: Owner breakdown uses the same labels as load_risks
+        aggregates['owners'] = aggregates.pop('labeled_owners')
+        return aggregates
     
-    def get_all_programs_with_risks(self) -> List[str]:
+    def get_version(self, program_name: str) -> int:
+        """Counter that changes with every write to the program's risks
+        (for caches derived from the register)."""
+        program_name = self._canonical(program_name, exact=False)
+        return self.store.version(program_name)
+    
+    def get_program_summaries(self) -> List[Dict[str, Any]]:
+        """Manifest entries of all programs with risk data."""
+        return self.store.manifest.entries()
+    
+    def _canonical(self, program_name: str, exact: bool = True) -> str:
         """
-        Get list of all programs that have risk data.
+        Registered name for a program, or the name itself for a new one.
+        Writes match the name exactly; reads also try its cleaned variants.
+        """
+        return self.store.aliases.resolve(program_name, exact=exact) or program_name
+    
+    def get_risk(self, program_name: str, risk_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a single risk by ID.
         
+        Args:
+            program_name: Name of the program
+            risk_id: ID of the risk
+            
         Returns:
-            List of program names
+            Risk (owner anonymized as in load_risks) or None if not found
         """
-        programs = []
+        program_name = self._canonical(program_name, exact=False)
+        risk = self.store.get(program_name, risk_id)
+        return self.anonymize_owner(program_name, risk) if risk else None
+    
+    def create_risk(self, program_name: str, risk: Dict[str, Any], prefix: str) -> Dict[str, Any]:
+        """
+        Add a risk, allocating the next PREFIX-### ID if its ID is missing or taken.
         
-        if not os.path.exists(self.storage_dir):
-            return programs
+        Args:
+            program_name: Name of the program
+            risk: Normalized risk dictionary
+            prefix: Program prefix for generated IDs
+            
+        Returns:
+            The stored risk with its final ID
+        """
+        program_name = self._canonical(program_name)
+        return self.store.insert(program_name, risk, prefix)
+    
+    def update_risk(
+        self,
+        program_name: str,
+        risk_id: str,
+        apply: Callable[[Dict[str, Any]], None]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Change a single risk atomically.
         
-        for filename in os.listdir(self.storage_dir):
-            if filename.endswith('_risks.json'):
-                filepath = os.path.join(self.storage_dir, filename)
-                try:
-                    with open(filepath, 'r') as f:
-                        data = json.load(f)
-                    programs.append(data.get('program_name', ''))
-                except:
-                    continue
+        Args:
+            program_name: Name of the program
+            risk_id: ID of the risk
+            apply: Mutates the risk in place
+            
+        Returns:
+            The updated risk or None if not found
+        """
+        program_name = self._canonical(program_name)
+        return self.store.update(program_name, risk_id, apply)
+    
+    def delete_risk(self, program_name: str, risk_id: str) -> bool:
+        """
+        Delete a single risk.
+        
+        Args:
+            program_name: Name of the program
+            risk_id: ID of the risk
+            
+        Returns:
+            True if deleted, False if not found
+        """
+        program_name = self._canonical(program_name)
+        return self.store.delete(program_name, risk_id)
+    
+    def rewrite_risks(
+        self,
+        program_name: str,
+        transform: Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]]
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Apply a change to the whole register (e.g. renumbering) atomically.
+        
+        Args:
+            program_name: Name of the program
+            transform: Takes the risks and returns the new register
+            
+        Returns:
+            The new register or None if the program has no risks
+        """
+        program_name = self._canonical(program_name)
+        return self.store.rewrite(program_name, transform)
+    
+    def has_risks(self, program_name: str) -> bool:
+        """Whether a program has at least one risk."""
+        program_name = self._canonical(program_name, exact=False)
+        return self.store.count(program_name) > 0
+    
+    def get_severity_counts(self, program_name: str) -> Dict[str, int]:
+        """Risk count per severity level (kept up to date on every write)."""
+        program_name = self._canonical(program_name, exact=False)
+        return self.store.severity_counts(program_name)
+    
+    def anonymize_owner(self, program_name: str, risk: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Replace a risk's owner with the label load_risks would give it.
         
-        return programs
+        Labels are kept by the store as owners first appear in the register,
+        so this is a lookup.
+        """
+        if not risk.get('owner'):
+            return risk
+        program_name = self._canonical(program_name, exact=False)
+        risk['owner'] = self.store.owner_label(program_name, risk['owner'])
+        return risk
+    
+    def _owner_label(self, program_name: str, labels: Dict[str, str], owner: str) -> str:
+        """Label from a fetched owner_labels map; owners written since it was
+        fetched are looked up in the store."""
+        label = labels.get(owner)
+        if label is None:
+            label = labels[owner] = self.store.owner_label(program_name, owner)
+        return label
+    
+    def get_all_programs_with_risks(self) -> List[str]:
+        """
+        Get list of all programs that have risk data.
+        
+        Returns:
+            List of program names
+        """
+        return [entry['program_name'] for entry in self.store.manifest.entries()]
     
     def delete_risks(self, program_name: str) -> bool:
         """
@@ -206,19 +391,8 @@ class RiskRepository:
         Returns:
             True if deleted, False if not found
         """
-        # Create safe filename from program name
-        safe_name = "".join(
-            c if c.isalnum() or c in (' ', '-', '_') else '_' 
-            for c in program_name
-        ).strip()
-        
-        filename = f"{safe_name}_risks.json"
-        filepath = os.path.join(self.storage_dir, filename)
-        
-        if os.path.exists(filepath):
-            os.remove(filepath)
-            return True
-        return False
+        program_name = self._canonical(program_name)
+        return self.store.remove(program_name)
     
     @staticmethod
     def _count_by_severity(risks: List[Dict[str, Any]]) -> Dict[str, int]:
@@ -0,0 +1,638 @@
+"""
+Risk Store
+Keyed, in-memory view of each program's risk register with per-record
+get/put/delete. A program is loaded once from its <program>_risks.json
+snapshot; single-risk writes are appended to a <program>_risks.journal file
+instead of re-serializing the whole register, and the snapshot is rewritten
+only when the journal has grown as large as the register itself.
+
+Aggregates (severity/status counts, likelihood x impact matrix, owner and
+category breakdowns), the anonymized owner labels and the next free
+PREFIX-### number are maintained incrementally, and every operation on a program runs under that program's
+lock, so concurrent edits cannot lose updates or hand out the same ID twice.
+Each persisted change also refreshes the program's entry in the risk
+manifest. Only the most recently used programs stay in memory; colder ones
+are dropped and reloaded from disk when next needed.
+"""
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import json
+import logging
+import os
+import tempfile
+import textwrap
+import threading
+
+from repositories.risk_aggregates import RiskAggregates
+from repositories.risk_alias_index import RiskAliasIndex
+from repositories.risk_manifest import RiskManifest
+from repositories.risk_owner_labels import OwnerLabels
+
+logger = logging.getLogger(__name__)
+
+
+def safe_program_name(program_name: str) -> str:
+    """Program name as used in risk file names."""
+    return "".join(
+        c if c.isalnum() or c in (' ', '-', '_') else '_'
+        for c in program_name
+    ).strip()
+
+
+class ProgramRisks:
+    """Loaded risk register of one program."""
+
+    def __init__(self, program_name: str, snapshot_path: str, journal_path: str):
+        self.program_name = program_name
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path
+        self.lock = threading.RLock()
+        self.records: Dict[str, Dict[str, Any]] = {}
+        self.owner_labels = OwnerLabels()
+        self.aggregates = RiskAggregates(self.owner_labels.label)
+        # Risk ID -> sequence number, assigned when the risk is added and
+        # never reused: increases along register order and, unlike a list
+        # index, does not shift when other risks are added or deleted
+        self.sequences: Dict[str, int] = {}
+        self.next_sequence = 0
+        self.next_numbers: Dict[str, int] = {}
+        self.journal_entries = 0
+        self.version = 0
+        self.signature: Optional[Tuple[int, int]] = None
+        self.exists = False
+        # Operations in progress (an entry in use is never evicted)
+        self.users = 0
+
+
+class RiskStore:
+    """Per-record access to the risk registers in one storage directory."""
+
+    def __init__(self, storage_dir: str, compact_min_entries: int = None, max_programs: int = None):
+        """
+        Initialize the store.
+
+        Args:
+            storage_dir: Directory holding <program>_risks.json files
+            compact_min_entries: Journal entries always tolerated before the
+                snapshot is rewritten (RISK_JOURNAL_COMPACT_MIN, default 200)
+            max_programs: Registers kept in memory; the least recently used
+                ones beyond this are evicted (RISK_STORE_MAX_PROGRAMS, default 32)
+        """
+        if compact_min_entries is None:
+            compact_min_entries = int(os.getenv("RISK_JOURNAL_COMPACT_MIN", "200"))
+        if max_programs is None:
+            max_programs = int(os.getenv("RISK_STORE_MAX_PROGRAMS", "32"))
+        self.storage_dir = storage_dir
+        self.compact_min_entries = compact_min_entries
+        self.max_programs = max(1, max_programs)
+        self.aliases = RiskAliasIndex(storage_dir)
+        self.manifest = RiskManifest(storage_dir)
+        self._programs: "OrderedDict[str, ProgramRisks]" = OrderedDict()
+        # Reloaded entries continue above every evicted entry's version, so
+        # caches keyed by version never mistake a reload for an old state
+        self._version_floor = 0
+        self._lock = threading.Lock()
+        if not self.manifest.loaded:
+            self._rebuild_manifest()
+
+    def snapshot_path(self, program_name: str) -> str:
+        """Path of a program's <program>_risks.json file."""
+        return os.path.join(self.storage_dir, f"{safe_program_name(program_name)}_risks.json")
+
+    def exists(self, program_name: str) -> bool:
+        """Whether the program has a risk register."""
+        with self._locked(program_name) as program:
+            return program.exists
+
+    def list(self, program_name: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        All risks of a program, in register order.
+
+        Returns:
+            Copies of the risks, or None if the program has no register
+        """
+        with self._locked(program_name) as program:
+            if not program.exists:
+                return None
+            return [dict(risk) for risk in program.records.values()]
+
+    def list_sequenced(self, program_name: str) -> Optional[List[Tuple[int, Dict[str, Any]]]]:
+        """
+        All risks of a program in register order, with their sequence numbers.
+
+        Returns:
+            (sequence, risk copy) pairs, or None if the program has no register
+        """
+        with self._locked(program_name) as program:
+            if not program.exists:
+                return None
+            return [
+                (program.sequences[risk_id], dict(risk))
+                for risk_id, risk in program.records.items()
+            ]
+
+    def iterate(self, program_name: str) -> Optional[Iterator[Dict[str, Any]]]:
+        """
+        Stream a program's risks in register order, one copy at a time.
+
+        Writes replace records rather than mutating them, so the iterator
+        reads a consistent point-in-time register without holding the lock
+        or copying every risk up front.
+
+        Returns:
+            Iterator of risk copies, or None if the program has no register
+        """
+        with self._locked(program_name) as program:
+            if not program.exists:
+                return None
+            records = list(program.records.values())
+        return (dict(risk) for risk in records)
+
+    def ids(self, program_name: str) -> Set[str]:
+        """IDs of a program's risks (empty if it has no register)."""
+        with self._locked(program_name) as program:
+            return set(program.records)
+
+    def get(self, program_name: str, risk_id: str) -> Optional[Dict[str, Any]]:
+        """Get one risk by ID (a copy), or None."""
+        with self._locked(program_name) as program:
+            risk = program.records.get(risk_id)
+            return dict(risk) if risk is not None else None
+
+    def put(self, program_name: str, risk: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Insert or replace a risk, keyed by its 'id'.
+
+        Returns:
+            Copy of the stored risk
+        """
+        with self._locked(program_name) as program:
+            stored = dict(risk)
+            self._apply_put(program, stored)
+            self._journal(program, self._put_entry(program, stored))
+            return dict(stored)
+
+    def insert(self, program_name: str, risk: Dict[str, Any], prefix: str) -> Dict[str, Any]:
+        """
+        Add a new risk, allocating PREFIX-### if its ID is missing or taken.
+        Allocation and insert happen under one lock.
+
+        Returns:
+            Copy of the stored risk (with its final ID)
+        """
+        with self._locked(program_name) as program:
+            stored = dict(risk)
+            if not stored.get('id') or stored['id'] in program.records:
+                stored['id'] = self._allocate(program, prefix)
+            self._apply_put(program, stored)
+            self._journal(program, self._put_entry(program, stored))
+            return dict(stored)
+
+    def update(
+        self,
+        program_name: str,
+        risk_id: str,
+        apply: Callable[[Dict[str, Any]], None]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Read-modify-write one risk atomically.
+
+        Args:
+            program_name: Name of the program
+            risk_id: ID of the risk to change
+            apply: Mutates a copy of the risk in place (must keep its ID)
+
+        Returns:
+            Copy of the updated risk, or None if it does not exist
+        """
+        with self._locked(program_name) as program:
+            current = program.records.get(risk_id)
+            if current is None:
+                return None
+            updated = dict(current)
+            apply(updated)
+            updated['id'] = risk_id
+            self._apply_put(program, updated)
+            self._journal(program, self._put_entry(program, updated))
+            return dict(updated)
+
+    def delete(self, program_name: str, risk_id: str) -> bool:
+        """
+        Delete one risk.
+
+        Returns:
+            True if deleted, False if not found
+        """
+        with self._locked(program_name) as program:
+            risk = program.records.pop(risk_id, None)
+            if risk is None:
+                return False
+            program.sequences.pop(risk_id, None)
+            program.aggregates.add(risk, -1)
+            program.version += 1
+            self._journal(program, {'op': 'delete', 'id': risk_id})
+            return True
+
+    def owner_labels(self, program_name: str) -> Dict[str, str]:
+        """Anonymized label of every owner seen in the register (see OwnerLabels)."""
+        with self._locked(program_name) as program:
+            return program.owner_labels.to_dict()
+
+    def owner_label(self, program_name: str, owner: str) -> str:
+        """Anonymized label of one owner."""
+        with self._locked(program_name) as program:
+            return program.owner_labels.label(owner)
+
+    def allocate_id(self, program_name: str, prefix: str) -> str:
+        """Reserve the next free PREFIX-### ID of a program."""
+        with self._locked(program_name) as program:
+            return self._allocate(program, prefix)
+
+    def severity_counts(self, program_name: str) -> Dict[str, int]:
+        """Risk count per severity, maintained incrementally."""
+        with self._locked(program_name) as program:
+            return dict(program.aggregates.severity)
+
+    def aggregates(self, program_name: str) -> Dict[str, Any]:
+        """Matrix, severity/status/owner/category counts, owners also by
+        anonymized label (see RiskAggregates)."""
+        with self._locked(program_name) as program:
+            return program.aggregates.to_dict()
+
+    def count(self, program_name: str) -> int:
+        """Number of risks of a program."""
+        with self._locked(program_name) as program:
+            return len(program.records)
+
+    def version(self, program_name: str) -> int:
+        """Counter bumped by every change (for caches derived from the register)."""
+        with self._locked(program_name) as program:
+            return program.version
+
+    def replace_all(self, program_name: str, risks: List[Dict[str, Any]]) -> str:
+        """
+        Replace a program's whole register.
+
+        Returns:
+            Path of the written snapshot
+        """
+        with self._locked(program_name) as program:
+            self._reset(program, [dict(risk) for risk in risks])
+            program.exists = True
+            self._write_snapshot(program)
+            self.aliases.add(program.program_name)
+            self.manifest.record(self._summary(program))
+            return program.snapshot_path
+
+    def rewrite(
+        self,
+        program_name: str,
+        transform: Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]]
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Apply a whole-register change (e.g. renumbering) atomically.
+
+        Returns:
+            Copy of the new register, or None if the program has none
+        """
+        with self._locked(program_name) as program:
+            if not program.exists:
+                return None
+            risks = transform([dict(risk) for risk in program.records.values()])
+            self._reset(program, risks, program.owner_labels.order())
+            self._write_snapshot(program)
+            self.manifest.record(self._summary(program))
+            return [dict(risk) for risk in risks]
+
+    def remove(self, program_name: str) -> bool:
+        """
+        Delete a program's register files.
+
+        Returns:
+            True if deleted, False if not found
+        """
+        with self._locked(program_name) as program:
+            existed = os.path.exists(program.snapshot_path)
+            for path in (program.snapshot_path, program.journal_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            self._reset(program, [])
+            program.exists = False
+            program.signature = None
+            self.aliases.remove(program.program_name)
+            self.manifest.remove(program.program_name)
+            return existed
+
+    def replace_stream(self, program_name: str, risk_chunks: Iterable[List[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Replace a program's register from an iterator of chunks (e.g. a
+        streamed upload), in the same file layout as replace_all.
+
+        Each chunk is written to a temporary file as it arrives and added to
+        the new records and aggregates, so the register is never read back.
+        Readers keep the previous risks until the file is moved into place;
+        a failed import leaves them untouched.
+
+        Returns:
+            Dict with filepath, risk_count and severity_counts
+        """
+        snapshot_path = self.snapshot_path(program_name)
+        staged = ProgramRisks(program_name, snapshot_path, snapshot_path[:-len('.json')] + '.journal')
+        # Unique per import: concurrent imports of one program each fill
+        # their own file outside the lock, and the last one to finish wins
+        fd, temp_path = tempfile.mkstemp(
+            dir=self.storage_dir, prefix=os.path.basename(snapshot_path) + '.', suffix='.stream.tmp'
+        )
+        risk_count = 0
+        try:
+            with open(fd, 'w') as f:
+                # mkstemp creates the file private; snapshots are world-readable
+                os.fchmod(f.fileno(), 0o644)
+                f.write('{\n')
+                f.write(f'  "program_name": {json.dumps(program_name)},\n')
+                f.write('  "risks": [')
+                for chunk in risk_chunks:
+                    for risk in chunk:
+                        f.write(',\n' if risk_count else '\n')
+                        f.write(textwrap.indent(json.dumps(risk, indent=2), '    '))
+                        self._apply_put(staged, risk)
+                        risk_count += 1
+                f.write('\n  ]' if risk_count else ']')
+                f.write(f',\n  "risk_count": {risk_count},\n')
+                f.write(f'  "last_updated": {json.dumps(datetime.now().isoformat())},\n')
+                f.write('  "severity_counts": ')
+                f.write(textwrap.indent(json.dumps(staged.aggregates.severity, indent=2), '  ').lstrip())
+                f.write(',\n  "owner_order": ')
+                f.write(textwrap.indent(json.dumps(staged.owner_labels.order(), indent=2), '  ').lstrip())
+                f.write(f',\n  "sequences": {json.dumps(list(staged.sequences.values()))}')
+                f.write(f',\n  "next_sequence": {staged.next_sequence}')
+                f.write('\n}')
+
+            # The old register is replaced wholesale, no need to load it
+            with self._locked(program_name, load=False) as program:
+                os.replace(temp_path, program.snapshot_path)
+                if os.path.exists(program.journal_path):
+                    os.remove(program.journal_path)
+                program.records = staged.records
+                program.aggregates = staged.aggregates
+                program.owner_labels = staged.owner_labels
+                program.sequences = staged.sequences
+                program.next_sequence = staged.next_sequence
+                program.next_numbers = {}
+                program.journal_entries = 0
+                program.version += 1
+                program.exists = True
+                program.signature = self._signature(program)
+                self.aliases.add(program.program_name)
+                self.manifest.record(self._summary(program))
+                return {
+                    'filepath': program.snapshot_path,
+                    'risk_count': risk_count,
+                    'severity_counts': dict(program.aggregates.severity)
+                }
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def _summary(self, program: ProgramRisks) -> Dict[str, Any]:
+        """Manifest entry for a program's current state."""
+        return {
+            'program_name': program.program_name,
+            'risk_count': len(program.records),
+            'severity_counts': dict(program.aggregates.severity),
+            'status_counts': dict(program.aggregates.status),
+            'last_updated': datetime.now().isoformat(),
+            'filepath': program.snapshot_path
+        }
+
+    def _rebuild_manifest(self):
+        """Summarize the registers already on disk (first start after
+        upgrade). Registers are read once and not kept in memory."""
+        entries = []
+        for program_name in self.aliases.programs():
+            snapshot_path = self.snapshot_path(program_name)
+            program = ProgramRisks(
+                program_name, snapshot_path, snapshot_path[:-len('.json')] + '.journal'
+            )
+            self._load(program)
+            if program.exists:
+                entries.append(self._summary(program))
+        self.manifest.replace_all(entries)
+        logger.info(f"🗂️ Built risk manifest for {len(entries)} programs")
+
+    @contextmanager
+    def _locked(self, program_name: str, load: bool = True) -> Iterator[ProgramRisks]:
+        """
+        Hold a program's lock with its register loaded, (re)loading it if
+        its snapshot changed on disk or it was evicted.
+
+        Args:
+            program_name: Canonical program name
+            load: Skip loading (the caller replaces the whole register)
+        """
+        program = self._acquire(program_name)
+        try:
+            with program.lock:
+                if load and (program.signature is None or program.signature != self._signature(program)):
+                    self._load(program)
+                yield program
+        finally:
+            with self._lock:
+                program.users -= 1
+
+    def _acquire(self, program_name: str) -> ProgramRisks:
+        """Get (or create) a program's entry and mark it in use."""
+        snapshot_path = self.snapshot_path(program_name)
+        with self._lock:
+            program = self._programs.get(snapshot_path)
+            if program is None:
+                journal_path = snapshot_path[:-len('.json')] + '.journal'
+                program = ProgramRisks(program_name, snapshot_path, journal_path)
+                program.version = self._version_floor
+                self._programs[snapshot_path] = program
+            self._programs.move_to_end(snapshot_path)
+            program.users += 1
+            self._evict_cold()
+            return program
+
+    def _evict_cold(self):
+        """Drop the least recently used registers beyond max_programs
+        (caller holds self._lock). Entries in use are skipped."""
+        excess = len(self._programs) - self.max_programs
+        for snapshot_path, program in list(self._programs.items()):
+            if excess <= 0:
+                break
+            if program.users:
+                continue
+            del self._programs[snapshot_path]
+            self._version_floor = max(self._version_floor, program.version)
+            excess -= 1
+            logger.debug(f"Evicted risk register '{program.program_name}' from memory")
+
+    @staticmethod
+    def _signature(program: ProgramRisks) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(program.snapshot_path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _load(self, program: ProgramRisks):
+        """Read the snapshot and replay the journal."""
+        risks: List[Dict[str, Any]] = []
+        owner_order: List[str] = []
+        sequences: Optional[List[int]] = None
+        program.exists = os.path.exists(program.snapshot_path)
+        if program.exists:
+            try:
+                with open(program.snapshot_path, 'r') as f:
+                    data = json.load(f)
+                risks = data.get('risks', [])
+                owner_order = data.get('owner_order', [])
+                sequences = data.get('sequences')
+                program.next_sequence = max(program.next_sequence, data.get('next_sequence', 0))
+            except Exception as e:
+                logger.error(f"Error loading risks from {program.snapshot_path}: {e}")
+        self._reset(program, risks, owner_order, sequences)
+
+        if program.exists and os.path.exists(program.journal_path):
+            with open(program.journal_path, 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Torn last line of an interrupted write
+                        continue
+                    if entry.get('op') == 'put':
+                        self._apply_put(program, entry['risk'], entry.get('seq'))
+                    elif entry.get('op') == 'delete':
+                        risk = program.records.pop(entry.get('id'), None)
+                        if risk is not None:
+                            program.sequences.pop(entry.get('id'), None)
+                            program.aggregates.add(risk, -1)
+                    program.journal_entries += 1
+        program.signature = self._signature(program)
+
+    @staticmethod
+    def _reset(
+        program: ProgramRisks,
+        risks: List[Dict[str, Any]],
+        owner_order: Iterable[str] = (),
+        sequences: Optional[List[int]] = None
+    ):
+        """Replace the register; owners keep the labels of owner_order,
+        the others are labeled in register order. Risks get the given
+        sequence numbers (as read from a snapshot) or new ones."""
+        program.records = {risk.get('id'): risk for risk in risks}
+        program.owner_labels = OwnerLabels(
+            list(owner_order) + [risk['owner'] for risk in risks if risk.get('owner')]
+        )
+        program.aggregates = RiskAggregates.from_risks(program.records.values(), program.owner_labels.label)
+        if sequences is None or len(sequences) != len(program.records):
+            sequences = range(program.next_sequence, program.next_sequence + len(program.records))
+        program.sequences = dict(zip(program.records, sequences))
+        program.next_sequence = max([program.next_sequence, *(n + 1 for n in program.sequences.values())])
+        program.next_numbers = {}
+        program.journal_entries = 0
+        program.version += 1
+
+    @staticmethod
+    def _apply_put(program: ProgramRisks, risk: Dict[str, Any], sequence: Optional[int] = None):
+        previous = program.records.get(risk.get('id'))
+        if previous is not None:
+            program.aggregates.add(previous, -1)
+        else:
+            # New risks go to the end of the register with the next sequence
+            if sequence is None or sequence < program.next_sequence:
+                sequence = program.next_sequence
+            program.sequences[risk.get('id')] = sequence
+            program.next_sequence = sequence + 1
+        program.records[risk.get('id')] = risk
+        program.aggregates.add(risk, 1)
+        program.owner_labels.label(risk.get('owner'))
+        program.version += 1
+
+        # Keep already computed ID counters ahead of stored IDs
+        risk_id = str(risk.get('id') or '')
+        for prefix, next_number in program.next_numbers.items():
+            number = RiskStore._id_number(risk_id, prefix)
+            if number is not None and number >= next_number:
+                program.next_numbers[prefix] = number + 1
+
+    @staticmethod
+    def _id_number(risk_id: str, prefix: str) -> Optional[int]:
+        suffix = risk_id[len(prefix) + 1:]
+        if risk_id.startswith(prefix + '-') and suffix.isdigit():
+            return int(suffix)
+        return None
+
+    @staticmethod
+    def _put_entry(program: ProgramRisks, risk: Dict[str, Any]) -> Dict[str, Any]:
+        """Journal entry of a put, with the risk's sequence number."""
+        return {'op': 'put', 'risk': risk, 'seq': program.sequences[risk.get('id')]}
+
+    def _allocate(self, program: ProgramRisks, prefix: str) -> str:
+        if prefix not in program.next_numbers:
+            numbers = [self._id_number(str(risk_id), prefix) for risk_id in program.records]
+            program.next_numbers[prefix] = max([n for n in numbers if n is not None], default=0) + 1
+        number = program.next_numbers[prefix]
+        program.next_numbers[prefix] = number + 1
+        return f"{prefix}-{str(number).zfill(3)}"
+
+    def _journal(self, program: ProgramRisks, entry: Dict[str, Any]):
+        """Persist one change; compact once the journal outgrows the register."""
+        program.version += 1
+        if not program.exists:
+            # First write of a new program creates its snapshot
+            program.exists = True
+            self._write_snapshot(program)
+            self.aliases.add(program.program_name)
+            self.manifest.record(self._summary(program))
+            return
+
+        with open(program.journal_path, 'a') as f:
+            f.write(json.dumps(entry) + '\n')
+        program.journal_entries += 1
+
+        if program.journal_entries > max(self.compact_min_entries, len(program.records)):
+            self._write_snapshot(program)
+        self.manifest.record(self._summary(program))
+
+    def _write_snapshot(self, program: ProgramRisks):
+        """Write the register in the save_risks layout and clear the journal."""
+        risks = list(program.records.values())
+        data = {
+            'program_name': program.program_name,
+            'risks': risks,
+            'risk_count': len(risks),
+            'last_updated': datetime.now().isoformat(),
+            'severity_counts': dict(program.aggregates.severity),
+            'owner_order': program.owner_labels.order(),
+            'sequences': list(program.sequences.values()),
+            'next_sequence': program.next_sequence
+        }
+        temp_path = f"{program.snapshot_path}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(temp_path, program.snapshot_path)
+        if os.path.exists(program.journal_path):
+            os.remove(program.journal_path)
+        program.journal_entries = 0
+        program.signature = self._signature(program)
+
+
+_stores: Dict[str, RiskStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_risk_store(storage_dir: str) -> RiskStore:
+    """Shared store for a storage directory (every RiskRepository instance
+    on the same directory sees the same records and locks)."""
+    key = os.path.abspath(storage_dir)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = RiskStore(key)
+        return _stores[key]
@@ -62,7 +62,6 @@ async def home(request: Request):
     Admin users see all projects.
     """
     from repositories.risk_repository import RiskRepository
-    import re
     
     # Dashboard shows projects for the current user (respects data isolation)
     projects = get_all_projects(request)
@@ -75,22 +74,14 @@ async def home(request: Request):
     # 1. Risks embedded in project YAML files
     total_risks = sum(len(p.risks) for p in projects)
     
-    # 2. Risks from RiskRepository (uploaded separately)
+    # 2. Risks from RiskRepository (uploaded separately; counted from the risk manifest)
     for project in projects:
-        # Clean the project name the same way as risk upload does
-        clean_name = (project.project_name
-                     .replace('.xml', '')
-                     .replace('.xlsx', '')
-                     .replace('.yaml', '')
-                     .strip())
-        clean_name = re.sub(r'-\d+$', '', clean_name).strip()
-        
-        repo_risks = risk_repo.load_risks(clean_name)
-        if repo_risks:
-            total_risks += len(repo_risks)
+        repo_risk_count = risk_repo.count_risks(project.project_name, project.project_code)
+        if repo_risk_count:
+            total_risks += repo_risk_count
             # Also add to project object for display in cards
             if not hasattr(project, '_repo_risks_count'):
-                project._repo_risks_count = len(repo_risks)
+                project._repo_risks_count = repo_risk_count
     
     total_changes = sum(len(p.changes) for p in projects)
     
@@ -306,51 +297,40 @@ async def program_metrics(request: Request):
     risk_metrics = None
     
     if projects:
-        # Collect all risks from TWO sources:
+        # Count risks from TWO sources:
         # 1. Project YAML files (risks embedded in project)
-        # 2. RiskRepository (risks uploaded separately)
-        all_risks = []
+        # 2. RiskRepository (risks uploaded separately) - counts come from
+        #    the risk manifest, the risks themselves are not loaded
+        yaml_risks = []
+        risk_summaries = []
         
         # Source 1: Risks from project YAML
         for project in projects:
-            logger.warning(f"Project {project.project_code}: has 'risks' attr? {hasattr(project, 'risks')}")
-            if hasattr(project, 'risks'):
-                logger.warning(f"Project {project.project_code}: risks count = {len(project.risks)}")
-                logger.warning(f"Project {project.project_code}: risks type = {type(project.risks)}")
-                if project.risks:
-                    logger.warning(f"Project {project.project_code}: First risk from YAML = {project.risks[0]}")
-                    all_risks.extend(project.risks)
+            if getattr(project, 'risks', None):
+                logger.info(f"Project {project.project_code}: {len(project.risks)} risks in YAML")
+                yaml_risks.extend(project.risks)
         
-        # Source 2: Risks from RiskRepository
-        # Try to load risks for each project by name
-        # Use the same cleaning logic as risk upload to ensure filename matches
-        import re
-        for project in projects:
-            # Clean the project name the same way as risk upload does
-            clean_name = project.project_name.replace('.xml', '').replace('.xlsx', '').replace('.yaml', '').strip()
-            clean_name = re.sub(r'-\d+$', '', clean_name).strip()
-            
-            logger.warning(f"🔍 Attempting to load risks for project: original='{project.project_name}', cleaned='{clean_name}'")
-            repo_risks = risk_repo.load_risks(clean_name)
-            if repo_risks:
-                logger.warning(f"✅ Project {project.project_name}: Loaded {len(repo_risks)} risks from RiskRepository")
-                all_risks.extend(repo_risks)
-            else:
-                logger.warning(f"❌ Project {project.project_name}: No risks found in RiskRepository for cleaned name '{clean_name}'")
-        
-        if all_risks:
-            logger.warning(f"✅ Loaded {len(all_risks)} total risks from {len(projects)} project(s) (YAML + Repository)")
+        if yaml_risks:
             # Convert Risk objects to dictionaries if needed
             risks_dicts = []
-            for r in all_risks:
+            for r in yaml_risks:
                 if hasattr(r, 'dict'):
                     risks_dicts.append(r.dict())
                 elif isinstance(r, dict):
                     risks_dicts.append(r)
                 else:
                     logger.warning(f"Unknown risk type: {type(r)}")
-            logger.info(f"Converted {len(risks_dicts)} risks to dicts")
-            risk_metrics = metrics_calculator.calculate_risk_metrics(risks_dicts)
+            risk_summaries.append(metrics_calculator.summarize_risks(risks_dicts))
+        
+        # Source 2: Risks from RiskRepository (found via the alias index)
+        for project in projects:
+            summary = risk_repo.get_summary(project.project_name, project.project_code)
+            if summary:
+                logger.info(f"✅ Project {project.project_name}: {summary['risk_count']} risks in RiskRepository")
+                risk_summaries.append(summary)
+        
+        if any(summary['risk_count'] for summary in risk_summaries):
+            risk_metrics = metrics_calculator.calculate_risk_metrics_from_summaries(risk_summaries)
             logger.info(f"Calculated risk metrics: {json.dumps(risk_metrics, indent=2)}")
         else:
             logger.warning(f"❌ No risks found in {len(projects)} project(s) from either YAML or RiskRepository")
@@ -390,7 +370,6 @@ async def risk_analysis(request: Request):
     """
     from main import BUILD_VERSION
     from repositories.risk_repository import RiskRepository
-    import re
     
     # Get selected project ONLY
     project = get_selected_project(request)
@@ -410,24 +389,26 @@ async def risk_analysis(request: Request):
     risk_repo = RiskRepository()
     standalone_risks = []
     
-    # Load risks for this project (clean the name the same way as risk upload)
-    program_name = project.project_name
-    # Use the SAME cleaning logic as risk upload (from routers/risks.py)
-    clean_name = program_name.replace('.xml', '').replace('.xlsx', '').replace('.yaml', '').strip()
-    clean_name = re.sub(r'-\d+$', '', clean_name).strip()
-    
-    logger.info(f"📊 Risks: {project.project_name} (cleaned: '{clean_name}')")
-    loaded_risks = risk_repo.load_risks(clean_name)
+    # Load risks for this project (found via the alias index)
+    logger.info(f"📊 Risks: {project.project_name}")
+    program = risk_repo.resolve_program(project.project_name, project.project_code)
+    loaded_risks = risk_repo.load_risks(program) if program else None
     if loaded_risks:
         logger.info(f"Loaded {len(loaded_risks)} risks from repository")
         standalone_risks = loaded_risks
     
+    # Severity cards and heat map read the precomputed aggregates
+    risk_aggregates = risk_repo.get_aggregates(program) if program else None
+    risk_heatmap = chart_service.format_risk_heatmap(risk_aggregates) if risk_aggregates else None
+    
     user = get_user_from_request(request)
     context = {
         "request": request,
         "project": project,
         "risk_data": risk_data,
         "standalone_risks": standalone_risks,
+        "risk_aggregates": risk_aggregates,
+        "risk_heatmap": risk_heatmap,
         "build_version": BUILD_VERSION,
         "user": user
     }
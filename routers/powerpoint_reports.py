@@ -6,22 +6,32 @@ from fastapi import APIRouter, Request, UploadFile, File, HTTPException, Backgro
 from fastapi.responses import FileResponse, StreamingResponse, HTMLResponse
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
-from typing import List, Dict, Optional, Any
+from typing import Callable, List, Dict, Optional, Any
 from pathlib import Path
 from datetime import datetime
 import logging
 import asyncio
+import re
+import shutil
+import tempfile
 import uuid
 import io
 
 from middleware.project_context import get_selected_project, get_all_projects
-from repositories.project_repository import ProjectRepository
 from repositories.risk_repository import RiskRepository
 
 # Import AI-generated services
 from services.screenshot_service import ScreenshotService
-from services.builder_service import PowerPointBuilderService
+from services.builder_service import create_builder
+from services.build_pool import build_hybrid_presentation_async
 from repositories.template_repository import TemplateRepository, ConfigurationManager
+from services.export_job_service import ExportJobManager, JobLimitExceeded
+from services.export_cache import ExportCache
+from services.slide_cache import SlideCache, fingerprint_slide, hash_data
+from services.template_normalizer import normalized_path
+from services.export_snapshot import (
+    SNAPSHOT_HEADER, ExportSnapshot, export_snapshots, load_export_snapshot
+)
 
 logger = logging.getLogger(__name__)
 
@@ -47,12 +57,14 @@ api_router = APIRouter(prefix="/api/reports", tags=["powerpoint-api"])
 
 # Initialize AI-generated services
 screenshot_service = ScreenshotService()
-ppt_builder = PowerPointBuilderService()
 template_repo = TemplateRepository(config_dir=str(DATA_DIR / "templates"))
 config_manager = ConfigurationManager(config_dir=str(DATA_DIR / "configurations"))
+export_cache = ExportCache(EXPORTS_DIR)
+slide_cache = SlideCache(DATA_DIR / "slide_cache")
 
 # Job tracking
 export_jobs: Dict[str, Dict[str, Any]] = {}
+export_job_manager = ExportJobManager(export_jobs)
 
 
 # Pydantic models
@@ -82,6 +94,22 @@ class ExportRequest(BaseModel):
     slide_titles: Optional[List[str]] = None
     project_name: Optional[str] = None  # Project name for slide titles
     project_code: Optional[str] = None  # Project code for context
+    incremental: bool = False  # Reuse unchanged captures from this report's previous export
+
+
+def clean_project_name(project_name: str) -> str:
+    """
+    Strip file extensions and a trailing version suffix from a project name.
+    
+    Args:
+        project_name: Project name as selected (e.g. "ZnNi-2.xml")
+        
+    Returns:
+        Name used in view URLs and data lookups (e.g. "ZnNi")
+    """
+    clean_name = project_name.replace(
+        '.xml', '').replace('.xlsx', '').replace('.yaml', '').strip()
+    return re.sub(r'-\d+$', '', clean_name).strip()
 
 
 def get_slide_title_from_url(url: str, project_name: str) -> str:
@@ -112,6 +140,8 @@ def get_slide_title_from_url(url: str, project_name: str) -> str:
             return f"Milestones: {project_name}"
     elif '/risks/print/' in path:
         return f"Risk Register: {project_name}"
+    elif '/risks/heatmap/' in path:
+        return f"Risk Heat Map: {project_name}"
     elif '/risks' in path:
         return f"Risk Register: {project_name}"
     elif '/changes' in path:
@@ -131,7 +161,8 @@ def get_slide_title_from_url(url: str, project_name: str) -> str:
 def expand_views_for_pagination(
     views: List[str], 
     project_name: str,
-    risks_per_page: int = 8  # Table format fits more rows
+    risks_per_page: int = 8,  # Table format fits more rows
+    risks: Optional[List[Dict[str, Any]]] = None
 ) -> tuple[List[str], List[str]]:
     """
     Expand views list to handle multi-page content like risks.
@@ -143,6 +174,8 @@ def expand_views_for_pagination(
         views: List of view URLs
         project_name: Project name for loading risks
         risks_per_page: Number of risks per page (default 8 for table format)
+        risks: Already loaded risks (e.g. from the export snapshot); loaded
+            from the risk repository when omitted
         
     Returns:
         Tuple of (expanded_views, expanded_titles)
@@ -154,15 +187,10 @@ def expand_views_for_pagination(
         if '/risks/print/' in view:
             # This is a risks view - check how many risks exist
             try:
-                # Clean program name same way as the risks endpoint
-                import re
-                clean_name = project_name.replace(
-                    '.xml', '').replace('.xlsx', '').replace('.yaml', ''
-                ).strip()
-                clean_name = re.sub(r'-\d+$', '', clean_name).strip()
-                
-                risks = risk_repo.load_risks(clean_name)
-                total_risks = len(risks) if risks else 0
+                if risks is None:
+                    total_risks = risk_repo.count_risks(project_name)
+                else:
+                    total_risks = len(risks)
                 
                 if total_risks > risks_per_page:
                     # Need multiple pages
@@ -197,12 +225,7 @@ def expand_views_for_pagination(
         elif '/milestones' in view:
             # Convert milestones to print-friendly URL with blank resources
             # Use the print endpoint for month view with blank_resources
-            import re
-            clean_name = project_name.replace(
-                '.xml', '').replace('.xlsx', '').replace('.yaml', ''
-            ).strip()
-            clean_name = re.sub(r'-\d+$', '', clean_name).strip()
-            
+            clean_name = clean_project_name(project_name)
             print_url = f"/milestones/print/{clean_name}?blank_resources=true"
             expanded_views.append(print_url)
             expanded_titles.append(f"Milestones: {project_name}")
@@ -266,290 +289,501 @@ async def list_templates():
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@api_router.post("/export")
-async def export_to_powerpoint(
-    request: Request,
+def resolve_export_context(request: Request, export_request: ExportRequest) -> Dict[str, Any]:
+    """
+    Capture everything an export needs from the incoming request, so the
+    export itself can run after the request has finished (e.g. as a job).
+    
+    Args:
+        request: Incoming request
+        export_request: Export request body
+        
+    Returns:
+        Dict with base_url, project_name, auth_token, user_id and is_admin
+    """
+    # Get base URL
+    base_url = f"{request.url.scheme}://{request.url.netloc}"
+    
+    # Get project name - prefer from request body, fall back to context
+    if export_request.project_name:
+        project_name = export_request.project_name
+    else:
+        selected_project = get_selected_project(request)
+        project_name = (selected_project.project_name 
+                       if selected_project else "All Projects")
+    
+    return {
+        "base_url": base_url,
+        "project_name": project_name,
+        "auth_token": request.cookies.get("systems3_auth"),
+        "user_id": getattr(request.state, "user_id", None) or "anonymous",
+        "is_admin": getattr(request.state, "is_admin", False),
+    }
+
+
+async def run_export(
     export_request: ExportRequest,
-    background_tasks: BackgroundTasks
-):
+    base_url: str,
+    project_name: str,
+    auth_token: Optional[str] = None,
+    progress: Optional[Callable[[str, int, int], None]] = None,
+    filename: Optional[str] = None,
+    user_id: str = "anonymous",
+    is_admin: bool = False
+) -> Path:
     """
-    Export dashboard views to PowerPoint using AI-generated services
+    Capture/build all slides for an export and save the deck to the export cache.
+    
+    Args:
+        export_request: Export request body
+        base_url: Scheme and host the views are captured from
+        project_name: Project the report is for
+        auth_token: Auth cookie value forwarded to the screenshot browser
+        progress: Optional callback(stage, current, total) called per slide
+        filename: Optional output filename (defaults to title + timestamp)
+        user_id: Owner of the export (scopes data and the incremental slide cache)
+        is_admin: Whether the owner sees all projects
+        
+    Returns:
+        Path of the saved .pptx file
     """
+    # Load the export's data once; native slides and captured pages read it
+    clean_name = clean_project_name(project_name)
+    snapshot = await asyncio.to_thread(
+        load_export_snapshot, project_name, clean_name, risk_repo, user_id, is_admin
+    )
+    snapshot_token = export_snapshots.register(snapshot)
+    
+    # Incremental mode: unchanged screenshot slides reuse the previous capture
+    report_key = None
+    if export_request.incremental:
+        report_key = SlideCache.report_key(user_id, project_name, export_request.title)
+        slide_cache.begin(report_key)
+    
+    # Captured images are spooled here and referenced by path until the build
+    spool_dir = Path(tempfile.mkdtemp(prefix="ppt-export-"))
     try:
-        logger.info(f"Starting PowerPoint export with {len(export_request.views)} views")
-        
-        # Get custom template if specified
-        template_path = None
-        if export_request.template_id and export_request.template_id != "custom":
-            # Check if it's a user-uploaded template
-            import os
-            DATA_DIR = Path(os.getenv("DATA_STORAGE_PATH", str(BASE_DIR / "mock_data")))
-            POWERPOINT_TEMPLATES_DIR = DATA_DIR / "powerpoint_templates"
-            
-            template_file = POWERPOINT_TEMPLATES_DIR / f"{export_request.template_id}.pptx"
-            if template_file.exists():
-                template_path = template_file
-                logger.info(f"Using custom template: {export_request.template_id}")
-            else:
-                logger.warning(f"Template {export_request.template_id} not found, using default")
-        
-        # Get base URL
-        base_url = f"{request.url.scheme}://{request.url.netloc}"
+        return await _run_export(
+            export_request, base_url, project_name, auth_token, progress, filename,
+            spool_dir, user_id, snapshot, snapshot_token, report_key
+        )
+    finally:
+        shutil.rmtree(spool_dir, ignore_errors=True)
+        export_snapshots.release(snapshot_token)
+        if report_key:
+            slide_cache.end(report_key)
+
+
+def _spool_image(spool_dir: Path, image_bytes: bytes) -> str:
+    """Write a captured image to the export's spool directory and return its path."""
+    fd, path = tempfile.mkstemp(dir=spool_dir, prefix="slide_", suffix=".img")
+    with open(fd, 'wb') as f:
+        f.write(image_bytes)
+    return path
+
+
+async def _run_export(
+    export_request: ExportRequest,
+    base_url: str,
+    project_name: str,
+    auth_token: Optional[str],
+    progress: Optional[Callable[[str, int, int], None]],
+    filename: Optional[str],
+    spool_dir: Path,
+    user_id: str,
+    snapshot: ExportSnapshot,
+    snapshot_token: str,
+    report_key: Optional[str] = None
+) -> Path:
+    """Body of run_export; screenshots are spooled to spool_dir, all data
+    comes from snapshot and report_key enables incremental mode."""
+    logger.info(f"Starting PowerPoint export with {len(export_request.views)} views")
+    
+    # Get custom template if specified
+    template_path = None
+    if export_request.template_id and export_request.template_id != "custom":
+        # Check if it's a user-uploaded template
+        import os
+        DATA_DIR = Path(os.getenv("DATA_STORAGE_PATH", str(BASE_DIR / "mock_data")))
+        POWERPOINT_TEMPLATES_DIR = DATA_DIR / "powerpoint_templates"
         
-        # Get project name - prefer from request body, fall back to context
-        if export_request.project_name:
-            project_name = export_request.project_name
+        template_file = POWERPOINT_TEMPLATES_DIR / f"{export_request.template_id}.pptx"
+        if template_file.exists():
+            # Prefer the copy normalized at upload (unused layouts/media stripped)
+            normalized_file = normalized_path(template_file)
+            template_path = normalized_file if normalized_file.exists() else template_file
+            logger.info(f"Using custom template: {export_request.template_id}")
         else:
-            selected_project = get_selected_project(request)
-            project_name = (selected_project.project_name 
-                           if selected_project else "All Projects")
-        
-        # Expand views for multi-page content (e.g., risks with many items)
-        expanded_views, generated_titles = expand_views_for_pagination(
-            export_request.views, project_name
+            logger.warning(f"Template {export_request.template_id} not found, using default")
+    
+    # Expand views for multi-page content (e.g., risks with many items)
+    expanded_views, generated_titles = expand_views_for_pagination(
+        export_request.views, project_name, risks=snapshot.risks
+    )
+    
+    if len(expanded_views) != len(export_request.views):
+        logger.info(
+            f"📄 Views expanded from {len(export_request.views)} "
+            f"to {len(expanded_views)} for pagination"
         )
-        
-        if len(expanded_views) != len(export_request.views):
-            logger.info(
-                f"📄 Views expanded from {len(export_request.views)} "
-                f"to {len(expanded_views)} for pagination"
+    
+    # The job was queued with one step per requested view; report the
+    # expanded slide count before the first capture
+    if progress:
+        progress("capture", 0, len(expanded_views))
+    
+    # Build full URLs for screenshot capture
+    full_urls = [f"{base_url}{view}" for view in expanded_views]
+    logger.info(f"Processing views: {full_urls}")
+    
+    # Extract project code from first URL to set as header for all screenshots
+    from urllib.parse import urlparse, parse_qs
+    extra_headers = {}
+    if full_urls:
+        parsed = urlparse(full_urls[0])
+        if parsed.query:
+            query_params = parse_qs(parsed.query)
+            if 'project' in query_params:
+                project_code = query_params['project'][0]
+                extra_headers['X-Project-Code'] = project_code
+                logger.info(f"📌 Using project code: {project_code}")
+    
+    # Pages rendered for this export read the same snapshot as native slides
+    extra_headers[SNAPSHOT_HEADER] = snapshot_token
+    
+    # Get auth cookie from request to pass to screenshot service
+    auth_cookies = []
+    if auth_token:
+        parsed_base = urlparse(base_url)
+        auth_cookies.append({
+            "name": "systems3_auth",
+            "value": auth_token,
+            "domain": parsed_base.hostname,
+            "path": "/",
+            "httpOnly": True,
+            "secure": parsed_base.scheme == "https",
+            "sameSite": "Lax"
+        })
+    
+    # Clean project name for data loading
+    clean_name = clean_project_name(project_name)
+    
+    # Each export gets its own builder so concurrent exports don't collide
+    ppt_builder = create_builder()
+    
+    # Captures are fitted/encoded to the slide content area in one pass;
+    # a template cache miss hashes and parses the file, so keep it off the loop
+    image_size = await asyncio.to_thread(
+        ppt_builder.get_image_target_size,
+        str(template_path) if template_path else None
+    )
+    
+    # Incremental mode (report_key set by run_export): unchanged screenshot
+    # slides reuse the previous capture
+    data_version = None
+    template_version = None
+    used_fingerprints = []
+    reused_count = 0
+    if report_key:
+        data_version = snapshot.version
+        if template_path:
+            template_stat = Path(template_path).stat()
+            template_version = hash_data(str(template_path), template_stat.st_mtime_ns, template_stat.st_size)
+        logger.info(f"♻️ Incremental export (data version {data_version})")
+    
+    async def capture_to_spool(
+        url: str,
+        cache_view: str,
+        hide_navigation: bool,
+        transform: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Capture a view (or reuse its previous capture) into the spool dir."""
+        nonlocal reused_count
+        fingerprint = None
+        if report_key:
+            fingerprint = fingerprint_slide(
+                cache_view, data_version, transform, template_version,
+                viewport=(export_request.viewport_width, export_request.viewport_height),
+                hide_navigation=hide_navigation
             )
+            cached = slide_cache.lookup(report_key, fingerprint)
+            if cached is not None:
+                used_fingerprints.append(fingerprint)
+                reused_count += 1
+                return _spool_image(spool_dir, cached)
         
-        # Build full URLs for screenshot capture
-        full_urls = [f"{base_url}{view}" for view in expanded_views]
-        logger.info(f"Processing views: {full_urls}")
-        
-        # Extract project code from first URL to set as header for all screenshots
-        from urllib.parse import urlparse, parse_qs
-        extra_headers = {}
-        if full_urls:
-            parsed = urlparse(full_urls[0])
-            if parsed.query:
-                query_params = parse_qs(parsed.query)
-                if 'project' in query_params:
-                    project_code = query_params['project'][0]
-                    extra_headers['X-Project-Code'] = project_code
-                    logger.info(f"📌 Using project code: {project_code}")
+        # Failed captures raise, so a placeholder is never cached as the slide
+        screenshot = await screenshot_service.capture_screenshot_async(
+            url=url,
+            hide_navigation=hide_navigation,
+            resolution=(
+                export_request.viewport_width, 
+                export_request.viewport_height
+            ),
+            extra_headers=extra_headers if extra_headers else None,
+            cookies=auth_cookies if auth_cookies else None,
+            output_size=image_size,
+            transform=transform,
+            raise_on_error=True
+        )
+        spooled = _spool_image(spool_dir, screenshot)
+        if fingerprint:
+            slide_cache.store(report_key, fingerprint, Path(spooled))
+            used_fingerprints.append(fingerprint)
+        return spooled
+    
+    # Build slides data - native tables for milestones/risks/changes (editable)
+    slides_data = []
+    
+    for idx, (view, title) in enumerate(zip(expanded_views, generated_titles)):
+        if progress:
+            progress("capture", idx, len(expanded_views))
         
-        # Get auth cookie from request to pass to screenshot service
-        auth_cookies = []
-        auth_token = request.cookies.get("systems3_auth")
-        if auth_token:
-            parsed_base = urlparse(base_url)
-            auth_cookies.append({
-                "name": "systems3_auth",
-                "value": auth_token,
-                "domain": parsed_base.hostname,
-                "path": "/",
-                "httpOnly": True,
-                "secure": parsed_base.scheme == "https",
-                "sameSite": "Lax"
+        # Milestones: native editable table
+        if '/milestones' in view:
+            logger.info(f"📊 Creating native table for milestones")
+            milestones = snapshot.milestones
+            
+            # Convert to dicts if needed
+            ms_list = []
+            for m in milestones:
+                if hasattr(m, '__dict__'):
+                    ms_list.append({
+                        'name': m.name,
+                        'target_date': m.target_date,
+                        'status': m.status,
+                        'resources': m.resources,
+                        'completion_percentage': m.completion_percentage
+                    })
+                else:
+                    ms_list.append(m)
+            
+            logger.info(f"📊 Passing {len(ms_list)} milestones to table builder")
+            slides_data.append({
+                'type': 'milestones',
+                'data': ms_list,
+                'title': f"Milestones: {project_name}"
             })
         
-        # Clean project name for data loading
-        import re
-        clean_name = project_name.replace(
-            '.xml', '').replace('.xlsx', '').replace('.yaml', '').strip()
-        clean_name = re.sub(r'-\d+$', '', clean_name).strip()
-        
-        # Build slides data - native tables for milestones/risks/changes (editable)
-        slides_data = []
+        # Risk heat map: native table from the precomputed aggregates
+        elif '/risks/heatmap/' in view:
+            logger.info(f"📊 Creating native risk heat map")
+            slides_data.append({
+                'type': 'risk_heatmap',
+                'data': snapshot.risk_aggregates or {},
+                'title': title
+            })
         
-        for idx, (view, title) in enumerate(zip(expanded_views, generated_titles)):
-            # Milestones: native editable table
-            if '/milestones' in view:
-                logger.info(f"📊 Creating native table for milestones")
-                from repositories.project_repository import ProjectRepository
-                import os
-                
-                # Use the proper data directory (from env or fallback)
-                data_storage = os.getenv("DATA_STORAGE_PATH", str(BASE_DIR / "mock_data"))
-                repo = ProjectRepository(Path(data_storage))
-                projects = repo.load_all_projects()
-                
-                milestones = []
-                for proj in projects:
-                    if (clean_name.lower() in proj.project_name.lower() or 
-                            clean_name.lower() in proj.project_code.lower()):
-                        milestones = proj.milestones or []
-                        logger.info(f"📊 Found {len(milestones)} milestones for {proj.project_name}")
-                        break
+        # Risks: native editable table
+        elif '/risks' in view:
+            logger.info(f"📊 Creating native table for risks")
+            risks = snapshot.risks
+            
+            # Handle pagination for risks - extract both page AND per_page from URL
+            page = 1
+            per_page = 8  # Default to match expand_views_for_pagination
+            if '?page=' in view or '&page=' in view:
+                try:
+                    page = int(view.split('page=')[1].split('&')[0])
+                except:
+                    pass
+            if '?per_page=' in view or '&per_page=' in view:
+                try:
+                    per_page = int(view.split('per_page=')[1].split('&')[0])
+                except:
+                    pass
+            
+            total_risks = len(risks)
+            total_pages = (total_risks + per_page - 1) // per_page
+            start_idx = (page - 1) * per_page
+            end_idx = min(start_idx + per_page, total_risks)
+            page_risks = risks[start_idx:end_idx]
+            
+            logger.info(f"📋 Risks page {page}/{total_pages}: showing {len(page_risks)} risks ({start_idx+1}-{end_idx} of {total_risks})")
+            
+            slides_data.append({
+                'type': 'risks',
+                'data': page_risks,
+                'title': f"Risk Register: {project_name}",
+                'page_num': page,
+                'total_pages': total_pages
+            })
+            
+        # Changes: SCREENSHOT-based (nothing is edited on these slides)
+        elif '/changes' in view:
+            logger.info(f"📸 Creating screenshot slides for schedule changes")
+            changes = snapshot.changes
+            
+            total_changes = len(changes) if changes else 0
+            changes_per_page = 10
+            
+            if total_changes > 0:
+                # Calculate pagination
+                total_pages = (total_changes + changes_per_page - 1) // changes_per_page
+                logger.info(f"📋 Changes: {total_changes} changes across {total_pages} pages")
                 
-                # Convert to dicts if needed
-                ms_list = []
-                for m in milestones:
-                    if hasattr(m, '__dict__'):
-                        ms_list.append({
-                            'name': m.name,
-                            'target_date': m.target_date,
-                            'status': m.status,
-                            'resources': m.resources,
-                            'completion_percentage': m.completion_percentage
+                # Capture screenshot of each page
+                for page in range(1, total_pages + 1):
+                    page_view = f"/dashboard/changes/table/{clean_name}?page={page}&per_page={changes_per_page}&ppt_export=true"
+                    page_url = f"{base_url}{page_view}"
+                    
+                    try:
+                        spooled = await capture_to_spool(page_url, page_view, hide_navigation=True)
+                        
+                        page_indicator = f" ({page}/{total_pages})" if total_pages > 1 else ""
+                        slides_data.append({
+                            'type': 'screenshot',
+                            'path': spooled,
+                            'title': f"Schedule Changes: {project_name}{page_indicator}"
                         })
-                    else:
-                        ms_list.append(m)
+                        logger.info(f"✅ Captured changes screenshot page {page}/{total_pages}")
+                    except Exception as e:
+                        logger.error(f"❌ Failed to capture changes page {page}: {e}")
+            else:
+                logger.info("📋 No changes to include")
+
+        # Gantt: native shapes built from project milestones (no browser)
+        elif '/gantt' in view:
+            logger.info(f"📊 Creating native Gantt chart")
+            from services.chart_formatter import ChartFormatterService
+            matched = [snapshot.project] if snapshot.project else []
+            tasks = ChartFormatterService.format_gantt_data(matched)
+            logger.info(f"📊 Passing {len(tasks)} tasks to Gantt builder")
+            slides_data.append({
+                'type': 'gantt',
+                'data': tasks,
+                'title': title
+            })
+
+        # Metric trends: native line chart from the custom metrics store
+        elif '/metrics/trend/' in view:
+            logger.info(f"📈 Creating native metric trend chart")
+            from urllib.parse import unquote
+            import json
+            metric_name = unquote(view.split('?')[0].split('/metrics/trend/')[-1])
+
+            metric = None
+            view_query = parse_qs(urlparse(view).query)
+            if 'metricData' in view_query:
+                try:
+                    metric = json.loads(view_query['metricData'][0])
+                except ValueError as e:
+                    logger.warning(f"⚠️ Could not parse metricData for {metric_name}: {e}")
+
+            if metric is None:
+                metric = snapshot.get_metric(metric_name)
+
+            if metric is None:
+                logger.warning(f"⚠️ Metric '{metric_name}' not found for {project_name}")
+                metric = {'name': metric_name}
+
+            slides_data.append({
+                'type': 'metric_trend',
+                'data': metric,
+                'title': title
+            })
+
+        else:
+            # Other views: capture screenshot
+            # Add ppt_export=true for charts to hide controls and enable dual Y-axis
+            separator = '&' if '?' in view else '?'
+            url = f"{base_url}{view}{separator}ppt_export=true"
+            logger.info(f"📸 Capturing with ppt_export: {url}")
+            try:
+                # Canvas editor crop/scale for this view (views pass through unexpanded)
+                transform = None
+                if export_request.slide_transforms and view in export_request.views:
+                    view_idx = export_request.views.index(view)
+                    if view_idx < len(export_request.slide_transforms):
+                        if export_request.slide_transforms[view_idx]:
+                            transform = export_request.slide_transforms[view_idx].dict()
                 
-                logger.info(f"📊 Passing {len(ms_list)} milestones to table builder")
+                # The transform is applied while the capture is encoded
                 slides_data.append({
-                    'type': 'milestones',
-                    'data': ms_list,
-                    'title': f"Milestones: {project_name}"
+                    'type': 'screenshot',
+                    'path': await capture_to_spool(
+                        url, view, export_request.hide_navigation, transform
+                    ),
+                    'title': title
                 })
-            
-            # Risks: native editable table
-            elif '/risks' in view:
-                logger.info(f"📊 Creating native table for risks")
-                risks = risk_repo.load_risks(clean_name) or []
-                
-                # Handle pagination for risks - extract both page AND per_page from URL
-                page = 1
-                per_page = 8  # Default to match expand_views_for_pagination
-                if '?page=' in view or '&page=' in view:
-                    try:
-                        page = int(view.split('page=')[1].split('&')[0])
-                    except:
-                        pass
-                if '?per_page=' in view or '&per_page=' in view:
-                    try:
-                        per_page = int(view.split('per_page=')[1].split('&')[0])
-                    except:
-                        pass
-                
-                total_risks = len(risks)
-                total_pages = (total_risks + per_page - 1) // per_page
-                start_idx = (page - 1) * per_page
-                end_idx = min(start_idx + per_page, total_risks)
-                page_risks = risks[start_idx:end_idx]
-                
-                logger.info(f"📋 Risks page {page}/{total_pages}: showing {len(page_risks)} risks ({start_idx+1}-{end_idx} of {total_risks})")
-                
+                logger.info(f"✅ Captured screenshot: {url}")
+            except Exception as e:
+                logger.error(f"❌ Failed to capture {url}: {e}")
                 slides_data.append({
-                    'type': 'risks',
-                    'data': page_risks,
-                    'title': f"Risk Register: {project_name}",
-                    'page_num': page,
-                    'total_pages': total_pages
+                    'type': 'screenshot',
+                    'path': _spool_image(spool_dir, screenshot_service._create_placeholder_image(
+                        (export_request.viewport_width, 
+                         export_request.viewport_height)
+                    )),
+                    'title': title
                 })
-                
-            # Changes: SCREENSHOT-based (nothing is edited on these slides)
-            elif '/changes' in view:
-                logger.info(f"📸 Creating screenshot slides for schedule changes")
-                from repositories.project_repository import ProjectRepository
-                import os
-                data_storage = os.getenv("DATA_STORAGE_PATH", str(BASE_DIR / "mock_data"))
-                repo = ProjectRepository(Path(data_storage))
-                projects = repo.load_all_projects()
-                
-                changes = []
-                for proj in projects:
-                    if (clean_name.lower() in proj.project_name.lower() or 
-                            clean_name.lower() in proj.project_code.lower()):
-                        changes = proj.changes or []
-                        break
-                
-                total_changes = len(changes) if changes else 0
-                changes_per_page = 10
-                
-                if total_changes > 0:
-                    # Calculate pagination
-                    total_pages = (total_changes + changes_per_page - 1) // changes_per_page
-                    logger.info(f"📋 Changes: {total_changes} changes across {total_pages} pages")
-                    
-                    # Capture screenshot of each page
-                    for page in range(1, total_pages + 1):
-                        page_url = f"{base_url}/dashboard/changes/table/{clean_name}?page={page}&per_page={changes_per_page}&ppt_export=true"
-                        
-                        try:
-                            screenshot = await screenshot_service.capture_screenshot_async(
-                                url=page_url,
-                                hide_navigation=True,
-                                resolution=(
-                                    export_request.viewport_width, 
-                                    export_request.viewport_height
-                                ),
-                                extra_headers=extra_headers if extra_headers else None,
-                                cookies=auth_cookies if auth_cookies else None
-                            )
-                            
-                            page_indicator = f" ({page}/{total_pages})" if total_pages > 1 else ""
-                            slides_data.append({
-                                'type': 'screenshot',
-                                'data': screenshot,
-                                'title': f"Schedule Changes: {project_name}{page_indicator}"
-                            })
-                            logger.info(f"✅ Captured changes screenshot page {page}/{total_pages}")
-                        except Exception as e:
-                            logger.error(f"❌ Failed to capture changes page {page}: {e}")
-                else:
-                    logger.info("📋 No changes to include")
-                
-            else:
-                # Other views: capture screenshot
-                # Add ppt_export=true for charts to hide controls and enable dual Y-axis
-                separator = '&' if '?' in view else '?'
-                url = f"{base_url}{view}{separator}ppt_export=true"
-                logger.info(f"📸 Capturing with ppt_export: {url}")
-                try:
-                    screenshot = await screenshot_service.capture_screenshot_async(
-                        url=url,
-                        hide_navigation=export_request.hide_navigation,
-                        resolution=(
-                            export_request.viewport_width, 
-                            export_request.viewport_height
-                        ),
-                        extra_headers=extra_headers if extra_headers else None,
-                        cookies=auth_cookies if auth_cookies else None
-                    )
-                    slides_data.append({
-                        'type': 'screenshot',
-                        'data': screenshot,
-                        'title': title
-                    })
-                    logger.info(f"✅ Captured screenshot: {url}")
-                except Exception as e:
-                    logger.error(f"❌ Failed to capture {url}: {e}")
-                    slides_data.append({
-                        'type': 'screenshot',
-                        'data': screenshot_service._create_placeholder_image(
-                            (export_request.viewport_width, 
-                             export_request.viewport_height)
-                        ),
-                        'title': title
-                    })
-        
-        logger.info(f"Prepared {len(slides_data)} slides")
-        
-        # Prepare report data
-        report_data = {
-            "title": export_request.title,
-            "project_name": project_name,
-            "generated_date": datetime.now().strftime("%Y-%m-%d %H:%M"),
-            "include_title_slide": export_request.include_title_slide,
-            "slide_count": len(slides_data) + (
-                1 if export_request.include_title_slide else 0
-            )
-        }
-        
-        # Generate PowerPoint using hybrid method
-        logger.info("Building PowerPoint presentation with native tables...")
-        pptx_bytes = ppt_builder.generate_hybrid_presentation(
+    
+    logger.info(f"Prepared {len(slides_data)} slides")
+    
+    # Prepare report data
+    report_data = {
+        "title": export_request.title,
+        "project_name": project_name,
+        "generated_date": datetime.now().strftime("%Y-%m-%d %H:%M"),
+        "include_title_slide": export_request.include_title_slide,
+        "slide_count": len(slides_data) + (
+            1 if export_request.include_title_slide else 0
+        )
+    }
+    
+    # Generate PowerPoint using hybrid method
+    if progress:
+        progress("build", len(expanded_views), len(expanded_views))
+    logger.info("Building PowerPoint presentation with native tables...")
+    if not filename:
+        filename = f"{export_request.title.replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pptx"
+    temp_path = export_cache.reserve(filename)
+    
+    # CPU-bound assembly runs in the build process pool, off the event loop;
+    # the worker writes the deck straight into the export cache
+    try:
+        await build_hybrid_presentation_async(
             report_data=report_data,
             slides_data=slides_data,
-            template_path=str(template_path) if template_path else None
+            template_path=str(template_path) if template_path else None,
+            output_path=str(temp_path)
         )
+        output_path = export_cache.commit(temp_path, filename)
+    except BaseException:
+        export_cache.discard(temp_path)
+        raise
+    
+    if report_key:
+        slide_cache.commit(report_key, used_fingerprints)
+        logger.info(f"♻️ Reused {reused_count}/{len(used_fingerprints)} captured slides")
+    logger.info("✅ PowerPoint generation complete")
+    logger.info(f"💾 Saved to: {output_path}")
+    
+    return output_path
+
+
+@api_router.post("/export")
+async def export_to_powerpoint(
+    request: Request,
+    export_request: ExportRequest,
+    background_tasks: BackgroundTasks
+):
+    """
+    Export dashboard views to PowerPoint using AI-generated services
+    """
+    try:
+        context = resolve_export_context(request, export_request)
+        output_path = await run_export(
+            export_request,
+            base_url=context["base_url"],
+            project_name=context["project_name"],
+            auth_token=context["auth_token"],
+            user_id=context["user_id"],
+            is_admin=context["is_admin"]
+        )
+        filename = output_path.name
         
-        logger.info("✅ PowerPoint generation complete")
-        
-        # Save to exports directory
-        filename = f"{export_request.title.replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pptx"
-        output_path = EXPORTS_DIR / filename
-        
-        with open(output_path, 'wb') as f:
-            f.write(pptx_bytes)
-        
-        logger.info(f"💾 Saved to: {output_path}")
-        
-        # Return file for download
+        # Stream the cached file for download
         return FileResponse(
             path=str(output_path),
             media_type="application/vnd.openxmlformats-officedocument.presentationml.presentation",
@@ -562,6 +796,114 @@ async def export_to_powerpoint(
         raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
 
 
+def _get_user_job(request: Request, job_id: str) -> Dict[str, Any]:
+    """Look up a job owned by the current user (admins see all jobs)."""
+    job = export_job_manager.get(job_id)
+    user_id = getattr(request.state, "user_id", None) or "anonymous"
+    is_admin = getattr(request.state, "is_admin", False)
+    if not job or (job["user_id"] != user_id and not is_admin):
+        raise HTTPException(status_code=404, detail="Export job not found")
+    return job
+
+
+@api_router.post("/export/jobs", status_code=202)
+async def submit_export_job(request: Request, export_request: ExportRequest):
+    """
+    Queue an export to run in the background.
+    
+    Poll /export/jobs/{job_id} or subscribe to /export/jobs/{job_id}/events
+    for progress, then download from /export/jobs/{job_id}/download.
+    """
+    try:
+        context = resolve_export_context(request, export_request)
+        
+        async def runner(job_id, progress):
+            filename = (f"{export_request.title.replace(' ', '_')}_"
+                        f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{job_id[:8]}.pptx")
+            return await run_export(
+                export_request,
+                base_url=context["base_url"],
+                project_name=context["project_name"],
+                auth_token=context["auth_token"],
+                progress=progress,
+                filename=filename,
+                user_id=context["user_id"],
+                is_admin=context["is_admin"]
+            )
+        
+        # Pagination may add slides; run_export reports the expanded total
+        return export_job_manager.submit(
+            context["user_id"], runner, total=len(export_request.views)
+        )
+    except JobLimitExceeded as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except Exception as e:
+        logger.error(f"Failed to queue export: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to queue export: {str(e)}")
+
+
+@api_router.get("/export/jobs")
+async def list_export_jobs(request: Request):
+    """List the current user's export jobs"""
+    export_job_manager.cleanup_expired()
+    user_id = getattr(request.state, "user_id", None) or "anonymous"
+    jobs = sorted(
+        export_job_manager.list_jobs(user_id),
+        key=lambda j: j["created_at"],
+        reverse=True
+    )
+    return {"jobs": [export_job_manager.public_view(j) for j in jobs]}
+
+
+@api_router.get("/export/jobs/{job_id}")
+async def get_export_job(request: Request, job_id: str):
+    """Get status and progress of an export job"""
+    return export_job_manager.public_view(_get_user_job(request, job_id))
+
+
+@api_router.get("/export/jobs/{job_id}/events")
+async def stream_export_job_events(request: Request, job_id: str):
+    """Server-Sent Events stream of export job progress"""
+    _get_user_job(request, job_id)
+    return StreamingResponse(
+        export_job_manager.events(job_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@api_router.get("/export/jobs/{job_id}/download")
+async def download_export_job(request: Request, job_id: str):
+    """Download the finished .pptx of an export job"""
+    job = _get_user_job(request, job_id)
+    if job["status"] != "completed":
+        raise HTTPException(status_code=409, detail=f"Export job is {job['status']}")
+    
+    output_path = Path(job["path"])
+    if not output_path.exists():
+        raise HTTPException(status_code=410, detail="Export file has expired")
+    export_cache.touch(output_path)
+    
+    return FileResponse(
+        path=str(output_path),
+        media_type="application/vnd.openxmlformats-officedocument.presentationml.presentation",
+        filename=job["filename"],
+        headers={"Content-Disposition": f"attachment; filename=\"{job['filename']}\""}
+    )
+
+
+@api_router.delete("/export/jobs/{job_id}")
+async def cancel_export_job(request: Request, job_id: str):
+    """Cancel a queued/running export job, or delete a finished one"""
+    job = _get_user_job(request, job_id)
+    if job["status"] in export_job_manager.TERMINAL_STATES:
+        export_job_manager.remove(job_id)
+        return {"job_id": job_id, "status": "deleted"}
+    
+    export_job_manager.cancel(job_id)
+    return {"job_id": job_id, "status": "cancelling"}
+
+
 @api_router.get("/configurations")
 async def list_configurations():
     """List saved report configurations"""
@@ -695,6 +1037,12 @@ async def capture_single_screenshot(url: str, request: Request):
         )
 
 
+@api_router.get("/screenshot/diagnostics")
+async def screenshot_browser_diagnostics():
+    """Screenshot browser state and lifecycle counters"""
+    return screenshot_service.browser_manager.get_status()
+
+
 @api_router.get("/screenshot/test")
 async def test_playwright():
     """Test endpoint to verify Playwright is working"""
@@ -2,15 +2,25 @@
 Risk Upload Router
 Handles risk file uploads and management.
 """
-from fastapi import APIRouter, UploadFile, File, HTTPException, Form, Body, Query
-from fastapi.responses import JSONResponse, StreamingResponse
-from typing import Optional, Dict, Any, List
+from fastapi import APIRouter, UploadFile, File, HTTPException, Form, Body, Query, Request
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from typing import Callable, Optional, Dict, Any, List
 from pydantic import BaseModel
+from services.export_job_service import ExportJobManager, JobLimitExceeded
 from services.risk_parser import RiskParser
+from services.risk_workbook_reader import risk_workbook_reader
+from services.risk_query import RiskQueryService
+from services.risk_pdf import RiskPdfExporter
 from repositories.risk_repository import RiskRepository
 from datetime import datetime
+from pathlib import Path
+import asyncio
+import itertools
 import logging
-import io
+import os
+import shutil
+import tempfile
 import csv
 
 logger = logging.getLogger(__name__)
@@ -19,6 +29,12 @@ router = APIRouter(prefix="/risks", tags=["risks"])
 
 # Initialize repository
 risk_repo = RiskRepository()
+risk_query = RiskQueryService(risk_repo)
+risk_pdf_exporter = RiskPdfExporter(Path(risk_repo.storage_dir).parent / "risk_pdfs")
+
+# Background uploads run as jobs with the same progress/SSE API as exports
+risk_import_jobs: Dict[str, Dict[str, Any]] = {}
+risk_import_job_manager = ExportJobManager(risk_import_jobs, kind="risk import")
 
 
 def extract_program_prefix(program_name: str) -> str:
@@ -63,6 +79,189 @@ def clean_program_name(program_name: str) -> str:
     return clean
 
 
+def assign_program_ids(
+    risks: List[Dict[str, Any]],
+    prefix: str,
+    seen_ids: set,
+    counter: int
+) -> int:
+    """
+    Give risks without a unique, program-prefixed ID a new one (PREFIX-001).
+    
+    Args:
+        risks: Risks to check (updated in place)
+        prefix: Program prefix from extract_program_prefix()
+        seen_ids: IDs already taken (updated in place)
+        counter: Next number to try
+        
+    Returns:
+        Next number to try (pass it on with the next chunk of risks)
+    """
+    for risk in risks:
+        # If risk doesn't have an ID or has a duplicate/invalid ID, generate one
+        if not risk.get('id') or risk['id'] in seen_ids or not risk['id'].startswith(prefix):
+            new_id = f"{prefix}-{str(counter).zfill(3)}"
+            while new_id in seen_ids:
+                counter += 1
+                new_id = f"{prefix}-{str(counter).zfill(3)}"
+            risk['id'] = new_id
+            seen_ids.add(new_id)
+            counter += 1
+        else:
+            seen_ids.add(risk['id'])
+    return counter
+
+
+def register_program_aliases(request: Optional[Request], program_name: str, clean_prog_name: str):
+    """
+    Record the names a freshly uploaded register should be found by: the
+    name it was uploaded under plus the name and code of the matching project.
+    
+    Args:
+        request: Current request (scopes the project lookup to the user)
+        program_name: Program name as uploaded
+        clean_prog_name: Name the risks were saved under
+    """
+    from middleware.project_context import get_all_projects
+    
+    aliases = [program_name]
+    try:
+        projects = get_all_projects(request)
+    except Exception as e:
+        logger.warning(f"Could not load projects for risk aliases: {str(e)}")
+        projects = []
+    for project in projects:
+        if (clean_program_name(project.project_name) == clean_prog_name or
+                project.project_code in (program_name, clean_prog_name)):
+            aliases.extend([project.project_name, project.project_code])
+    risk_repo.add_aliases(clean_prog_name, aliases)
+
+
+def import_risk_file(
+    source,
+    filename: str,
+    program_name: str,
+    sheet: Optional[str] = None,
+    progress: Optional[Callable[[int, float], None]] = None
+) -> Dict[str, Any]:
+    """
+    Stream a risk register (Excel workbook or CSV) into the repository
+    chunk by chunk, reporting progress as chunks are written.
+    
+    Args:
+        source: Path or binary file object of the upload
+        filename: Upload file name (picks the reader)
+        program_name: Cleaned program name
+        sheet: Excel only - sheet name or pattern (first sheet with a risk
+            header if omitted)
+        progress: Called after each chunk with the number of risks imported
+            so far and the share of the file read (0-1)
+        
+    Returns:
+        Dict with filepath, risk_count and severity_counts
+    """
+    read_share = 0.0
+    
+    def track(share: float):
+        nonlocal read_share
+        read_share = share
+    
+    is_csv = filename.lower().endswith('.csv')
+    if is_csv:
+        chunks_source = risk_workbook_reader.iter_csv_chunks(source, progress=track)
+    else:
+        chunks_source = risk_workbook_reader.iter_chunks(source, sheet=sheet, progress=track)
+    
+    prefix = extract_program_prefix(program_name)
+    seen_ids = risk_repo.get_risk_ids(program_name)
+    counter = len(seen_ids) + 1
+    
+    def prefixed_chunks():
+        nonlocal counter
+        imported = 0
+        for chunk in chunks_source:
+            counter = assign_program_ids(chunk, prefix, seen_ids, counter)
+            imported += len(chunk)
+            logger.info(f"📥 {program_name}: {imported} risks imported ({read_share:.0%})")
+            if progress is not None:
+                progress(imported, read_share)
+            yield chunk
+    
+    # Don't replace the program's risks with an empty register
+    chunks = prefixed_chunks()
+    first_chunk = next((chunk for chunk in chunks if chunk), None)
+    if first_chunk is None:
+        raise ValueError(f"No valid risks found in {'CSV' if is_csv else 'Excel'} file")
+    
+    return risk_repo.save_risks_stream(program_name, itertools.chain([first_chunk], chunks))
+
+
+async def submit_risk_import(
+    request: Request,
+    file: UploadFile,
+    program_name: str,
+    clean_prog_name: str,
+    sheet: Optional[str] = None
+) -> JSONResponse:
+    """
+    Queue a streamed upload as a background job.
+    
+    The upload is spooled to a temporary file (the request's copy is gone
+    once the response is sent) and imported in a worker thread; progress is
+    the share of the file read, in percent.
+    
+    Returns:
+        202 response with the job and its events URL
+    """
+    fd, upload_path = tempfile.mkstemp(suffix=Path(file.filename).suffix)
+    with open(fd, 'wb') as f:
+        await asyncio.to_thread(shutil.copyfileobj, file.file, f)
+    filename = file.filename
+    
+    async def runner(job_id, progress):
+        loop = asyncio.get_running_loop()
+        
+        def report(imported: int, share: float):
+            # Called from the import thread
+            loop.call_soon_threadsafe(progress, "import", int(share * 100), 100)
+        
+        try:
+            result = await asyncio.to_thread(
+                import_risk_file, upload_path, filename, clean_prog_name, sheet, report
+            )
+        finally:
+            os.remove(upload_path)
+        register_program_aliases(request, program_name, clean_prog_name)
+        logger.info(f"Successfully streamed and saved {result['risk_count']} risks to {result['filepath']}")
+        return {
+            'program_name': program_name,
+            'risk_count': result['risk_count'],
+            'severity_counts': result['severity_counts']
+        }
+    
+    user_id = getattr(request.state, "user_id", None) or "anonymous"
+    try:
+        job = risk_import_job_manager.submit(user_id, runner, total=100)
+    except JobLimitExceeded as e:
+        os.remove(upload_path)
+        raise HTTPException(status_code=429, detail=str(e))
+    
+    return JSONResponse(status_code=202, content={
+        **job,
+        'events_url': f"/risks/import/jobs/{job['job_id']}/events"
+    })
+
+
+def _get_import_job(request: Request, job_id: str) -> Dict[str, Any]:
+    """Look up an import job owned by the current user (admins see all jobs)."""
+    job = risk_import_job_manager.get(job_id)
+    user_id = getattr(request.state, "user_id", None) or "anonymous"
+    is_admin = getattr(request.state, "is_admin", False)
+    if not job or (job["user_id"] != user_id and not is_admin):
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job
+
+
 # Pydantic models for request/response
 class RiskCreate(BaseModel):
     program_name: str
@@ -105,32 +304,9 @@ async def create_risk(risk: RiskCreate):
         # Clean program name (remove extensions)
         clean_prog_name = clean_program_name(risk.program_name)
         
-        # Load existing risks for the program
-        existing_risks = risk_repo.load_risks(clean_prog_name) or []
-        
         # Get program prefix for risk IDs
         prefix = extract_program_prefix(clean_prog_name)
         
-        # Auto-generate unique risk ID if not provided or if duplicate exists
-        risk_id = risk.id
-        if not risk_id or any(r['id'] == risk_id for r in existing_risks):
-            # Find highest existing numeric ID with this prefix (ZDP-001, ZDP-002, etc.)
-            max_num = 0
-            for r in existing_risks:
-                rid = r['id']
-                # Check if ID matches our prefix pattern
-                if rid.startswith(prefix + '-') and rid[len(prefix)+1:].isdigit():
-                    num = int(rid[len(prefix)+1:])
-                    max_num = max(max_num, num)
-            
-            # Generate next ID
-            risk_id = f"{prefix}-{str(max_num + 1).zfill(3)}"
-            logger.info(f"Auto-generated risk ID: {risk_id}")
-        
-        # Validate no duplicate ID
-        if any(r['id'] == risk_id for r in existing_risks):
-            raise HTTPException(status_code=409, detail=f"Risk ID {risk_id} already exists")
-        
         # Calculate severity from likelihood and impact
         severity_score = risk.likelihood + risk.impact
         if severity_score >= 9:
@@ -144,7 +320,7 @@ async def create_risk(risk: RiskCreate):
         
         # Create new risk object
         new_risk = {
-            'id': risk_id,  # Use auto-generated or validated ID
+            'id': risk.id,
             'title': risk.title,
             'description': risk.description,
             'project': risk.project,
@@ -158,13 +334,13 @@ async def create_risk(risk: RiskCreate):
             'date_identified': datetime.now().strftime('%Y-%m-%d')
         }
         
-        # Add to existing risks
-        existing_risks.append(new_risk)
+        # Store it, auto-generating the next PREFIX-### ID if not provided or
+        # if a risk with this ID already exists
+        new_risk = risk_repo.create_risk(clean_prog_name, new_risk, prefix)
+        if new_risk['id'] != risk.id:
+            logger.info(f"Auto-generated risk ID: {new_risk['id']}")
         
-        # Save back to repository (use cleaned name)
-        risk_repo.save_risks(clean_prog_name, existing_risks)
-        
-        logger.info(f"Created new risk {risk_id} for program {clean_prog_name}")
+        logger.info(f"Created new risk {new_risk['id']} for program {clean_prog_name}")
         
         return JSONResponse(content={
             'success': True,
@@ -196,43 +372,36 @@ async def update_risk(program_name: str, risk_id: str, updates: RiskUpdate):
         # Clean program name
         clean_prog_name = clean_program_name(program_name)
         
-        # Load existing risks
-        risks = risk_repo.load_risks(clean_prog_name)
-        
-        if not risks:
+        if not risk_repo.has_risks(clean_prog_name):
             raise HTTPException(status_code=404, detail=f"No risks found for program: {clean_prog_name}")
         
-        # Find the risk to update
-        risk_index = None
-        for i, r in enumerate(risks):
-            if r['id'] == risk_id:
-                risk_index = i
-                break
-        
-        if risk_index is None:
-            raise HTTPException(status_code=404, detail=f"Risk {risk_id} not found")
-        
-        # Update fields
-        risk = risks[risk_index]
         update_data = updates.dict(exclude_unset=True)
         
-        for field, value in update_data.items():
-            risk[field] = value
+        def apply_updates(risk):
+            # Update fields
+            for field, value in update_data.items():
+                risk[field] = value
+            
+            # Recalculate severity if likelihood or impact changed
+            if 'likelihood' in update_data or 'impact' in update_data:
+                severity_score = risk['likelihood'] + risk['impact']
+                if severity_score >= 9:
+                    risk['severity_normalized'] = 'critical'
+                elif severity_score >= 7:
+                    risk['severity_normalized'] = 'high'
+                elif severity_score >= 4:
+                    risk['severity_normalized'] = 'medium'
+                else:
+                    risk['severity_normalized'] = 'low'
         
-        # Recalculate severity if likelihood or impact changed
-        if 'likelihood' in update_data or 'impact' in update_data:
-            severity_score = risk['likelihood'] + risk['impact']
-            if severity_score >= 9:
-                risk['severity_normalized'] = 'critical'
-            elif severity_score >= 7:
-                risk['severity_normalized'] = 'high'
-            elif severity_score >= 4:
-                risk['severity_normalized'] = 'medium'
-            else:
-                risk['severity_normalized'] = 'low'
+        # Read-modify-write under the program's lock
+        risk = risk_repo.update_risk(clean_prog_name, risk_id, apply_updates)
         
-        # Save back to repository
-        risk_repo.save_risks(clean_prog_name, risks)
+        if risk is None:
+            raise HTTPException(status_code=404, detail=f"Risk {risk_id} not found")
+        
+        if 'owner' not in update_data:
+            risk = risk_repo.anonymize_owner(clean_prog_name, risk)
         
         logger.info(f"Updated risk {risk_id} for program {clean_prog_name}")
         
@@ -265,22 +434,12 @@ async def delete_risk(program_name: str, risk_id: str):
         # Clean program name
         clean_prog_name = clean_program_name(program_name)
         
-        # Load existing risks
-        risks = risk_repo.load_risks(clean_prog_name)
-        
-        if not risks:
+        if not risk_repo.has_risks(clean_prog_name):
             raise HTTPException(status_code=404, detail=f"No risks found for program: {clean_prog_name}")
         
-        # Filter out the risk to delete
-        original_count = len(risks)
-        risks = [r for r in risks if r['id'] != risk_id]
-        
-        if len(risks) == original_count:
+        if not risk_repo.delete_risk(clean_prog_name, risk_id):
             raise HTTPException(status_code=404, detail=f"Risk {risk_id} not found")
         
-        # Save back to repository
-        risk_repo.save_risks(clean_prog_name, risks)
-        
         logger.info(f"Deleted risk {risk_id} from program {clean_prog_name}")
         
         return JSONResponse(content={
@@ -311,14 +470,11 @@ async def get_risk_detail(program_name: str, risk_id: str):
         # Clean program name
         clean_prog_name = clean_program_name(program_name)
         
-        # Load risks
-        risks = risk_repo.load_risks(clean_prog_name)
-        
-        if not risks:
+        if not risk_repo.has_risks(clean_prog_name):
             raise HTTPException(status_code=404, detail=f"No risks found for program: {clean_prog_name}")
         
         # Find the risk
-        risk = next((r for r in risks if r['id'] == risk_id), None)
+        risk = risk_repo.get_risk(clean_prog_name, risk_id)
         
         if not risk:
             raise HTTPException(status_code=404, detail=f"Risk {risk_id} not found")
@@ -334,23 +490,31 @@ async def get_risk_detail(program_name: str, risk_id: str):
 
 @router.post("/upload")
 async def upload_risks(
+    request: Request,
     file: UploadFile = File(...),
-    program_name: Optional[str] = Form(None)
+    program_name: Optional[str] = Form(None),
+    sheet: Optional[str] = Form(None),
+    background: bool = Form(False)
 ):
     """
-    Upload and parse risk file (YAML or Excel).
+    Upload and parse risk file (YAML, Excel or CSV).
+    
+    Excel workbooks and CSV files are streamed: rows are read lazily and
+    saved in chunks, so the response carries the counts but not the risks
+    themselves.
     
     Args:
-        file: Risk file (YAML or Excel format)
+        file: Risk file (YAML, Excel or CSV format)
         program_name: Optional program name (extracted from filename if not provided)
+        sheet: Excel only - sheet name or pattern such as "Risks*" ("*" reads
+            every sheet); defaults to the first sheet with a risk header
+        background: Excel/CSV only - import as a job and answer 202 right
+            away; follow /risks/import/jobs/{job_id}/events for progress
         
     Returns:
         JSON response with parsed risks and metadata
     """
     try:
-        # Read file content
-        content = await file.read()
-        
         # Determine program name
         if not program_name:
             # Extract from filename (remove extension and _risks suffix)
@@ -361,6 +525,30 @@ async def upload_risks(
         
         logger.info(f"Uploading risks for program: {clean_prog_name} (original: {program_name}), file: {file.filename}")
         
+        if file.filename.lower().endswith(('.xlsx', '.xlsm', '.csv')):
+            if background:
+                return await submit_risk_import(request, file, program_name, clean_prog_name, sheet)
+            try:
+                result = await asyncio.to_thread(
+                    import_risk_file, file.file, file.filename, clean_prog_name, sheet
+                )
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            register_program_aliases(request, program_name, clean_prog_name)
+            
+            logger.info(f"Successfully streamed and saved {result['risk_count']} risks to {result['filepath']}")
+            
+            return JSONResponse(content={
+                'success': True,
+                'message': f"Successfully uploaded {result['risk_count']} risks",
+                'program_name': program_name,
+                'risk_count': result['risk_count'],
+                'severity_counts': result['severity_counts']
+            })
+        
+        # Read file content
+        content = await file.read()
+        
         # Parse file
         try:
             risks = RiskParser.parse_file(content, file.filename)
@@ -371,25 +559,12 @@ async def upload_risks(
         prefix = extract_program_prefix(clean_prog_name)
         
         # Ensure all risks have unique IDs with program prefix
-        existing_risks = risk_repo.load_risks(clean_prog_name) or []
-        seen_ids = {r['id'] for r in existing_risks}
-        counter = len(existing_risks) + 1
-        
-        for risk in risks:
-            # If risk doesn't have an ID or has a duplicate/invalid ID, generate one
-            if not risk.get('id') or risk['id'] in seen_ids or not risk['id'].startswith(prefix):
-                new_id = f"{prefix}-{str(counter).zfill(3)}"
-                while new_id in seen_ids:
-                    counter += 1
-                    new_id = f"{prefix}-{str(counter).zfill(3)}"
-                risk['id'] = new_id
-                seen_ids.add(new_id)
-                counter += 1
-            else:
-                seen_ids.add(risk['id'])
+        seen_ids = risk_repo.get_risk_ids(clean_prog_name)
+        assign_program_ids(risks, prefix, seen_ids, len(seen_ids) + 1)
         
         # Save to repository (use cleaned name)
         filepath = risk_repo.save_risks(clean_prog_name, risks)
+        register_program_aliases(request, program_name, clean_prog_name)
         
         logger.info(f"Successfully parsed and saved {len(risks)} risks to {filepath}")
         
@@ -417,26 +592,128 @@ async def upload_risks(
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@router.get("/import/jobs/{job_id}")
+async def get_risk_import_job(request: Request, job_id: str):
+    """Get status, progress (percent of the file read) and result of a background upload"""
+    return risk_import_job_manager.public_view(_get_import_job(request, job_id))
+
+
+@router.get("/import/jobs/{job_id}/events")
+async def stream_risk_import_job_events(request: Request, job_id: str):
+    """Server-Sent Events stream of a background upload's progress"""
+    _get_import_job(request, job_id)
+    return StreamingResponse(
+        risk_import_job_manager.events(job_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/programs")
 async def get_programs_with_risks():
     """
     Get list of all programs that have risk data.
     
+    Served from the risk manifest; no risk register is opened.
+    
     Returns:
-        JSON response with list of program names
+        JSON response with list of program names and their summaries
+        (risk count, severity counts, last updated)
     """
     try:
-        programs = risk_repo.get_all_programs_with_risks()
+        summaries = risk_repo.get_program_summaries()
         return JSONResponse(content={
             'success': True,
-            'programs': programs,
-            'count': len(programs)
+            'programs': [summary['program_name'] for summary in summaries],
+            'summaries': summaries,
+            'count': len(summaries)
         })
     except Exception as e:
         logger.error(f"Error getting programs: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+def split_query_values(values: Optional[List[str]]) -> List[str]:
+    """Query values given repeated (?status=open&status=closed) or comma-separated."""
+    return [v.strip() for value in values or [] for v in value.split(',') if v.strip()]
+
+
+@router.get("/query/{program_name}")
+async def query_risks(
+    program_name: str,
+    severity: Optional[List[str]] = Query(None),
+    status: Optional[List[str]] = Query(None),
+    owner: Optional[List[str]] = Query(None),
+    category: Optional[List[str]] = Query(None),
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    sort: str = 'position',
+    order: str = 'asc',
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None
+):
+    """
+    Filtered, sorted, paginated view of a program's risks.
+    
+    Args:
+        program_name: Name of the program
+        severity: critical/high/medium/low (repeat or comma-separate for several)
+        status: e.g. open, closed
+        owner: Owner label as shown (owners are anonymized)
+        category: Risk category
+        date_from: Earliest date identified (YYYY-MM-DD)
+        date_to: Latest date identified (YYYY-MM-DD)
+        sort: position (register order), id, title, severity, likelihood,
+            impact, status, owner, category or date_identified
+        order: asc or desc
+        limit: Page size (max 500)
+        cursor: next_cursor from the previous page
+        fields: Comma-separated risk fields to return (id is always included)
+        
+    Returns:
+        JSON response with the page of risks, the number of matches and
+        the cursor of the next page (null on the last page)
+    """
+    try:
+        filters = {
+            'severity': split_query_values(severity),
+            'status': split_query_values(status),
+            'owner': split_query_values(owner),
+            'category': split_query_values(category)
+        }
+        try:
+            result = await asyncio.to_thread(
+                risk_query.query,
+                program_name,
+                filters=filters,
+                date_from=date_from,
+                date_to=date_to,
+                sort=sort,
+                order=order,
+                limit=limit,
+                cursor=cursor,
+                fields=split_query_values([fields]) if fields else None
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        if result is None:
+            raise HTTPException(status_code=404, detail=f"No risks found for program: {clean_program_name(program_name)}")
+        
+        return JSONResponse(content={
+            'success': True,
+            'program_name': program_name,
+            **result
+        })
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error querying risks: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
 @router.get("/{program_name}")
 async def get_risks(program_name: str):
     """
@@ -519,10 +796,7 @@ async def normalize_risk_ids(program_name: str):
         # Clean program name
         clean_prog_name = clean_program_name(program_name)
         
-        # Load existing risks
-        risks = risk_repo.load_risks(clean_prog_name)
-        
-        if not risks:
+        if not risk_repo.has_risks(clean_prog_name):
             raise HTTPException(status_code=404, detail=f"No risks found for program: {clean_prog_name}")
         
         # Get program prefix
@@ -530,20 +804,20 @@ async def normalize_risk_ids(program_name: str):
         
         # Track ID changes for response
         id_mapping = {}
-        counter = 1
         
-        # Normalize each risk ID to PREFIX-### format
-        for risk in risks:
-            old_id = risk['id']
-            new_id = f"{prefix}-{str(counter).zfill(3)}"
-            
-            # Update the risk ID
-            risk['id'] = new_id
-            id_mapping[old_id] = new_id
-            counter += 1
+        def renumber(risks):
+            # Normalize each risk ID to PREFIX-### format
+            for counter, risk in enumerate(risks, start=1):
+                old_id = risk['id']
+                new_id = f"{prefix}-{str(counter).zfill(3)}"
+                
+                # Update the risk ID
+                risk['id'] = new_id
+                id_mapping[old_id] = new_id
+            return risks
         
-        # Save normalized risks
-        risk_repo.save_risks(clean_prog_name, risks)
+        # Renumber and save in one step
+        risks = risk_repo.rewrite_risks(clean_prog_name, renumber) or []
         
         logger.info(f"Normalized {len(risks)} risk IDs for {clean_prog_name} using prefix {prefix}")
         
@@ -561,6 +835,93 @@ async def normalize_risk_ids(program_name: str):
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@router.get("/aggregates/{program_name}")
+async def get_risk_aggregates(program_name: str):
+    """
+    Precomputed counts of a program's risks: likelihood x impact matrix,
+    severity, status, owner and category breakdowns.
+    
+    Args:
+        program_name: Name of the program
+        
+    Returns:
+        JSON response with the aggregates and heat-map rows
+    """
+    from services.chart_formatter import ChartFormatterService
+    
+    aggregates = risk_repo.get_aggregates(program_name)
+    if aggregates is None:
+        raise HTTPException(status_code=404, detail=f"No risks found for program: {clean_program_name(program_name)}")
+    
+    return JSONResponse(content={
+        'success': True,
+        'program_name': program_name,
+        'aggregates': aggregates,
+        'heatmap': ChartFormatterService.format_risk_heatmap(aggregates)
+    })
+
+
+@router.get("/heatmap/{program_name}")
+async def risks_heatmap_view(program_name: str):
+    """
+    Print-friendly likelihood x impact heat map (canvas preview of the
+    risk heat-map slide).
+    
+    Args:
+        program_name: The program/project name
+    """
+    from fastapi.responses import HTMLResponse
+    from services.chart_formatter import ChartFormatterService
+    import html as html_lib
+    
+    clean_name = clean_program_name(program_name)
+    aggregates = risk_repo.get_aggregates(program_name)
+    if not aggregates:
+        return HTMLResponse(
+            content=f"<html><body><h1>No risks found for: {html_lib.escape(clean_name)}</h1></body></html>",
+            status_code=200
+        )
+    
+    colors = {'critical': '#DDD6FE', 'high': '#FECACA', 'medium': '#FEF3C7', 'low': '#DCFCE7'}
+    heatmap = ChartFormatterService.format_risk_heatmap(aggregates)
+    rows = []
+    for row in heatmap:
+        cells = ''.join(
+            f'<td style="background: {colors[cell["severity"]]}">{cell["count"]}</td>'
+            for cell in row['cells']
+        )
+        rows.append(f'<tr><th>{row["likelihood"].upper()}</th>{cells}</tr>')
+    impact_labels = ''.join(f'<th>{cell["impact"].upper()}</th>' for cell in heatmap[0]['cells'])
+    
+    html = f'''<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <style>
+        * {{ box-sizing: border-box; margin: 0; padding: 0; }}
+        body {{ font-family: Arial, sans-serif; background: white; padding: 20px 30px; }}
+        .slide-title {{ color: #7F7F7F; font-size: 32px; margin-bottom: 24px; font-weight: normal; }}
+        table {{ border-collapse: separate; border-spacing: 6px; margin: 0 auto; }}
+        td {{ width: 180px; height: 110px; text-align: center; font-size: 40px; font-weight: bold; color: #1F2937; border-radius: 6px; }}
+        th {{ color: #6B7280; font-size: 14px; padding: 6px 10px; }}
+        .axis {{ text-align: center; color: #6B7280; font-size: 14px; font-weight: bold; letter-spacing: 1px; }}
+        .summary {{ text-align: center; color: #6B7280; font-size: 14px; margin-top: 16px; }}
+    </style>
+</head>
+<body>
+    <h1 class="slide-title">Type: Project | {html_lib.escape(clean_name)} - Risk Heat Map</h1>
+    <div class="axis">LIKELIHOOD &uarr;</div>
+    <table>
+        {''.join(rows)}
+        <tr><th></th>{impact_labels}</tr>
+    </table>
+    <div class="axis">IMPACT &rarr;</div>
+    <div class="summary">{aggregates['total']} risks &middot; {aggregates['open']} open &middot; {aggregates['closed']} closed</div>
+</body>
+</html>'''
+    return HTMLResponse(content=html)
+
+
 @router.get("/print/{program_name}")
 async def risks_print_view(
     program_name: str, 
@@ -584,17 +945,16 @@ async def risks_print_view(
     # Clean program name
     clean_name = clean_program_name(program_name)
     
-    # Get risks
-    risks = risk_repo.load_risks(clean_name)
+    # Count risks (from the manifest; only this page's risks are fetched)
+    total_risks = risk_repo.count_risks(clean_name)
     
-    if not risks:
+    if not total_risks:
         return HTMLResponse(
             content=f"<html><body><h1>No risks found for: {clean_name}</h1></body></html>",
             status_code=200
         )
     
     # Calculate pagination
-    total_risks = len(risks)
     total_pages = (total_risks + per_page - 1) // per_page  # Ceiling division
     
     # Ensure page is within bounds
@@ -602,8 +962,8 @@ async def risks_print_view(
     
     # Get risks for this page
     start_idx = (page - 1) * per_page
-    end_idx = min(start_idx + per_page, total_risks)
-    page_risks = risks[start_idx:end_idx]
+    result = risk_query.query(clean_name, limit=per_page, offset=start_idx)
+    page_risks = result['risks'] if result else []
     
     # Page indicator for title
     page_indicator = f" (Page {page}/{total_pages})" if total_pages > 1 else ""
@@ -771,190 +1131,88 @@ async def risks_print_view(
     return HTMLResponse(content=''.join(html_parts))
 
 
-@router.get("/export/{program_name}")
-async def export_risks_pdf(program_name: str):
-    """Export risks to PDF in landscape format with multiple risks per page"""
+@router.get("/export/{program_name}.xlsx")
+async def export_risks_xlsx(program_name: str):
+    """
+    Export a program's risks as an Excel workbook (re-importable through
+    /risks/upload).
+    
+    Registered before the PDF export so the .xlsx suffix is not taken as
+    part of the program name.
+    
+    Args:
+        program_name: Name of the program
+    """
+    from services.risk_xlsx import write_risk_xlsx
+    
+    clean_name = clean_program_name(program_name)
+    risks = risk_repo.iter_risks(program_name)
+    if risks is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No risks found for program: {clean_name}"
+        )
+    
+    fd, xlsx_path = tempfile.mkstemp(prefix="risks_", suffix=".xlsx")
+    os.close(fd)
     try:
-        from reportlab.lib import colors
-        from reportlab.lib.pagesizes import letter, landscape
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.lib.units import inch
-        from reportlab.platypus import (
-            SimpleDocTemplate, Table, TableStyle, 
-            Paragraph, Spacer, PageBreak, KeepTogether
+        await asyncio.to_thread(write_risk_xlsx, risks, clean_name, xlsx_path)
+    except Exception as e:
+        os.remove(xlsx_path)
+        logger.error(f"Error exporting risks to XLSX: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error generating XLSX: {str(e)}"
         )
-        from reportlab.lib.enums import TA_CENTER
-        
-        # Clean program name
-        clean_name = program_name.replace('.xml', '').replace(
-            '.xlsx', '').replace('.yaml', '').strip()
-        clean_name = (clean_name.split('-')[0].strip() 
-                     if '-' in clean_name else clean_name)
+    
+    filename = (f"risks_{clean_name.replace(' ', '_')}_"
+               f"{datetime.now().strftime('%Y%m%d')}.xlsx")
+    
+    # Streamed from disk, then the temporary file is removed
+    return FileResponse(
+        xlsx_path,
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}"
+        },
+        background=BackgroundTask(os.remove, xlsx_path)
+    )
+
+
+@router.get("/export/{program_name}")
+async def export_risks_pdf(program_name: str, layout: str = 'landscape'):
+    """
+    Export risks to PDF with multiple risks per page.
+    
+    The PDF is rendered in the build pool and cached until the program's
+    risks change, then streamed from disk.
+    
+    Args:
+        program_name: Name of the program
+        layout: 'landscape' (default) or 'portrait'
+    """
+    try:
+        clean_name = clean_program_name(program_name)
         
-        # Get risks
-        risks = risk_repo.load_risks(clean_name)
+        try:
+            # Like the PDF export always has, "ABC-Phase 2" falls back to ABC
+            program = risk_repo.resolve_program(program_name, prefix=True) or program_name
+            pdf_path = await risk_pdf_exporter.get_pdf(risk_repo, program, layout)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         
-        if not risks:
+        if pdf_path is None:
             raise HTTPException(
                 status_code=404, 
                 detail=f"No risks found for program: {clean_name}"
             )
         
-        # Create PDF in memory - LANDSCAPE orientation
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(
-            buffer, 
-            pagesize=landscape(letter),
-            topMargin=0.5*inch, 
-            bottomMargin=0.5*inch,
-            leftMargin=0.5*inch,
-            rightMargin=0.5*inch
-        )
-        
-        # Container for PDF elements
-        elements = []
-        
-        # Styles
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=16,
-            textColor=colors.HexColor('#1e40af'),
-            spaceAfter=6,
-            alignment=TA_CENTER
-        )
-        risk_title_style = ParagraphStyle(
-            'RiskTitle',
-            parent=styles['Heading2'],
-            fontSize=10,
-            textColor=colors.HexColor('#1e40af'),
-            spaceAfter=2,
-            spaceBefore=4
-        )
-        normal_style = styles['Normal']
-        normal_style.fontSize = 8
-        small_style = ParagraphStyle(
-            'Small',
-            parent=styles['Normal'],
-            fontSize=7
-        )
-        
-        # Title
-        elements.append(Paragraph(
-            f"Risk Register: {clean_name}", title_style))
-        elements.append(Paragraph(
-            f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}", 
-            small_style
-        ))
-        elements.append(Spacer(1, 0.15*inch))
-        
-        # Process risks - 3-4 per page in landscape
-        for i, risk in enumerate(risks):
-            risk_elements = []
-            
-            # Compact risk title with ID
-            risk_elements.append(Paragraph(
-                f"<b>{risk.get('id', 'N/A')}: "
-                f"{risk.get('title', 'Untitled Risk')}</b>", 
-                risk_title_style
-            ))
-            
-            # Very compact single-row header
-            severity = risk.get('severity_normalized', 'N/A').upper()
-            status = risk.get('status', 'N/A')
-            owner = risk.get('owner', 'N/A')
-            likelihood = risk.get('likelihood', 'N/A')
-            impact = risk.get('impact', 'N/A')
-            
-            header_data = [[
-                f"Sev: {severity}",
-                f"Status: {status}",
-                f"Owner: {owner}",
-                f"L: {likelihood}",
-                f"I: {impact}"
-            ]]
-            
-            header_table = Table(header_data, colWidths=[
-                1.4*inch, 1.5*inch, 2.2*inch, 1.2*inch, 1.2*inch
-            ])
-            header_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, -1), 
-                 colors.HexColor('#f3f4f6')),
-                ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTSIZE', (0, 0), (-1, -1), 7),
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('TOPPADDING', (0, 0), (-1, -1), 2),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
-            ]))
-            
-            risk_elements.append(header_table)
-            risk_elements.append(Spacer(1, 0.05*inch))
-            
-            # Description and Mitigations in 2 columns
-            desc_text = risk.get('description', 'No description')
-            desc_para = Paragraph(
-                f"<b>Description:</b> {desc_text}",
-                small_style
-            )
-            
-            # Mitigations
-            mitigations = risk.get('mitigations', [])
-            if mitigations:
-                if isinstance(mitigations, list):
-                    miti_text = "; ".join([
-                        f"{idx}. {m}"
-                        for idx, m in enumerate(mitigations, 1)
-                    ])
-                else:
-                    miti_text = str(mitigations)
-                miti_para = Paragraph(
-                    f"<b>Mitigations:</b> {miti_text}",
-                    small_style
-                )
-            else:
-                miti_para = Paragraph(
-                    "<b>Mitigations:</b> None",
-                    small_style
-                )
-            
-            desc_miti_data = [[desc_para, miti_para]]
-            
-            desc_miti_table = Table(
-                desc_miti_data,
-                colWidths=[4.5*inch, 4*inch]
-            )
-            desc_miti_table.setStyle(TableStyle([
-                ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                ('TOPPADDING', (0, 0), (-1, -1), 1),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 1),
-            ]))
-            
-            risk_elements.append(desc_miti_table)
-            
-            # Keep risk together
-            elements.append(KeepTogether(risk_elements))
-            
-            # Minimal spacing between risks
-            if i < len(risks) - 1:
-                elements.append(Spacer(1, 0.12*inch))
-        
-        # Build PDF
-        doc.build(elements)
-        
-        # Get PDF data
-        buffer.seek(0)
-        pdf_data = buffer.getvalue()
-        buffer.close()
-        
         # Return as download
         filename = (f"risks_{clean_name.replace(' ', '_')}_"
                    f"{datetime.now().strftime('%Y%m%d')}.pdf")
         
-        return StreamingResponse(
-            io.BytesIO(pdf_data),
+        return FileResponse(
+            pdf_path,
             media_type="application/pdf",
             headers={
                 "Content-Disposition": f"attachment; filename={filename}"
@@ -994,10 +1252,10 @@ async def risks_table_preview(
     # Clean program name
     clean_name = clean_program_name(program_name)
     
-    # Get risks
-    risks = risk_repo.load_risks(clean_name)
+    # Count risks (from the manifest; only this page's risks are fetched)
+    total_risks = risk_repo.count_risks(clean_name)
     
-    if not risks:
+    if not total_risks:
         return HTMLResponse(
             content=f'''<!DOCTYPE html>
 <html><head><meta charset="UTF-8">
@@ -1007,13 +1265,12 @@ async def risks_table_preview(
         )
     
     # Calculate pagination
-    total_risks = len(risks)
     total_pages = (total_risks + per_page - 1) // per_page
     page = max(1, min(page, total_pages))
     
     start_idx = (page - 1) * per_page
-    end_idx = min(start_idx + per_page, total_risks)
-    page_risks = risks[start_idx:end_idx]
+    result = risk_query.query(clean_name, limit=per_page, offset=start_idx)
+    page_risks = result['risks'] if result else []
     
     # Page indicator
     page_indicator = f" (Page {page}/{total_pages})" if total_pages > 1 else ""
@@ -1,20 +1,25 @@
 """
 Upload Router - Handles XML file uploads and change management
 """
-from fastapi import APIRouter, Request, UploadFile, File, Form, Depends
+from fastapi import APIRouter, Request, UploadFile, File, Form, Depends, BackgroundTasks
 from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
 from pathlib import Path
 import yaml
 import os
+import asyncio
+import hashlib
 import logging
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
 from services.xml_parser import MSProjectXMLParser
 from services.change_detection import ChangeDetectionService
 from services.subscription_service import SubscriptionService
 from repositories.project_repository import ProjectRepository
+from services.template_cache import template_cache
+from services.template_preview import TemplatePreviewService, PREVIEW_SIZES, ASSET_NAME_PATTERN
+from services.template_normalizer import template_normalizer, normalized_path
 from middleware.subscription import (
     get_user_or_create_anonymous, get_subscription_service, 
     enforce_upload_limits, SubscriptionError
@@ -41,6 +46,7 @@ project_repo = ProjectRepository(data_dir=DATA_DIR)
 xml_parser = MSProjectXMLParser()
 change_detector = ChangeDetectionService()
 templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
+template_previews = TemplatePreviewService(POWERPOINT_TEMPLATES_DIR / "previews")
 
 
 @router.get("/upload", response_class=HTMLResponse)
@@ -775,8 +781,75 @@ async def clear_project_cache(project_code: str):
 
 # ===== PowerPoint Template Management =====
 
+def _load_template_metadata(template_id: str) -> dict:
+    """Load a template's metadata YAML (empty dict if missing)."""
+    metadata_path = POWERPOINT_TEMPLATES_DIR / f"{template_id}.yaml"
+    if not metadata_path.exists():
+        return {}
+    with open(metadata_path, 'r') as f:
+        return yaml.safe_load(f) or {}
+
+
+def _template_content_hash(template_id: str, metadata: dict) -> str:
+    """SHA-256 of the template file (stored at upload, computed for older templates)."""
+    return metadata.get('content_hash') or template_cache.file_hash(
+        POWERPOINT_TEMPLATES_DIR / f"{template_id}.pptx"
+    )
+
+
+def _find_template_by_hash(hash_prefix: str):
+    """Find a stored template whose content hash starts with hash_prefix.
+    
+    Returns:
+        Tuple of (template_id, metadata), or (None, None)
+    """
+    for metadata_file in POWERPOINT_TEMPLATES_DIR.glob("template_*.yaml"):
+        template_id = metadata_file.stem
+        try:
+            metadata = _load_template_metadata(template_id)
+            if ((POWERPOINT_TEMPLATES_DIR / f"{template_id}.pptx").exists() and
+                    _template_content_hash(template_id, metadata).startswith(hash_prefix)):
+                return template_id, metadata
+        except Exception:
+            continue
+    return None, None
+
+
+def _content_hash_in_use(content_hash: str) -> bool:
+    """Whether any remaining template has this content hash."""
+    return _find_template_by_hash(content_hash)[0] is not None
+
+
+def _template_preview_source(template_id: str) -> Path:
+    """File previews are rendered from: the normalized copy exports use, if any."""
+    template_path = POWERPOINT_TEMPLATES_DIR / f"{template_id}.pptx"
+    normalized_file = normalized_path(template_path)
+    return normalized_file if normalized_file.exists() else template_path
+
+
+def _template_preview_layout(template_id: str, metadata: dict) -> int:
+    """Layout shown as the template's main preview (stored at upload, computed for older templates)."""
+    preview_layout = metadata.get('preview_layout')
+    if preview_layout is None:
+        preview_layout = template_previews.default_layout(
+            _template_preview_source(template_id),
+            _template_content_hash(template_id, metadata)
+        )
+    return preview_layout
+
+
+def _preview_urls(content_hash: str, layout_index: int) -> dict:
+    """Immutable preview URLs for each size."""
+    return {
+        size: f"/upload/powerpoint-template/previews/"
+              f"{template_previews.asset_name(content_hash, layout_index, size)}"
+        for size in PREVIEW_SIZES
+    }
+
+
 @router.post("/upload/powerpoint-template")
 async def upload_powerpoint_template(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     name: str = Form(...)
 ):
@@ -797,24 +870,49 @@ async def upload_powerpoint_template(
         content = await file.read()
         with open(template_path, 'wb') as f:
             f.write(content)
+        template_cache.invalidate(template_id)
+        
+        # Store a slimmed-down copy next to the original for exports
+        normalization = None
+        try:
+            normalization = await asyncio.to_thread(
+                template_normalizer.normalize, template_path, normalized_path(template_path)
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Template normalization failed, exports use the original: {e}")
         
         # Save metadata
+        content_hash = hashlib.sha256(content).hexdigest()
+        preview_source = _template_preview_source(template_id)
+        preview_layout = await asyncio.to_thread(
+            template_previews.default_layout, preview_source, content_hash
+        )
         metadata = {
             'id': template_id,
             'name': name,
             'filename': file.filename,
             'uploaded_at': datetime.now().isoformat(),
-            'is_default': False
+            'is_default': False,
+            'content_hash': content_hash,
+            'preview_layout': preview_layout,
+            'normalization': normalization
         }
         
         metadata_path = POWERPOINT_TEMPLATES_DIR / f"{template_id}.yaml"
         with open(metadata_path, 'w') as f:
             yaml.dump(metadata, f)
         
+        # Render previews after the response so the picker never waits
+        # (a re-upload of the same file reuses the existing ones)
+        if not template_previews.get_path(content_hash, preview_layout).exists():
+            background_tasks.add_task(template_previews.render_all, preview_source, content_hash)
+        
         return JSONResponse({
             'success': True,
             'template_id': template_id,
-            'name': name
+            'name': name,
+            'preview_urls': _preview_urls(content_hash, preview_layout),
+            'normalization': normalization
         })
         
     except Exception as e:
@@ -840,6 +938,10 @@ async def list_powerpoint_templates():
                 # Check if template file exists
                 template_path = POWERPOINT_TEMPLATES_DIR / f"{metadata['id']}.pptx"
                 if template_path.exists():
+                    metadata['preview_urls'] = _preview_urls(
+                        _template_content_hash(metadata['id'], metadata),
+                        _template_preview_layout(metadata['id'], metadata)
+                    )
                     templates.append(metadata)
             except Exception as e:
                 logger.warning(f"Failed to load template metadata {metadata_file}: {e}")
@@ -870,15 +972,21 @@ async def delete_powerpoint_template(template_id: str):
                 'detail': 'Template not found'
             }, status_code=404)
         
+        content_hash = _template_content_hash(template_id, _load_template_metadata(template_id))
+        
         # Delete files
         template_path.unlink()
+        normalized_path(template_path).unlink(missing_ok=True)
         if metadata_path.exists():
             metadata_path.unlink()
+        template_cache.invalidate(template_id)
         
-        # Also delete cached preview
+        # Also delete cached previews (unless another upload has the same content)
         cache_dir = POWERPOINT_TEMPLATES_DIR / "previews"
         for cached_file in cache_dir.glob(f"{template_id}_*.png"):
             cached_file.unlink()
+        if not _content_hash_in_use(content_hash):
+            template_previews.delete(content_hash)
         
         return JSONResponse({
             'success': True,
@@ -902,6 +1010,10 @@ async def clear_template_preview_cache(template_id: str):
         for cached_file in cache_dir.glob(f"{template_id}_*.png"):
             cached_file.unlink()
             deleted_count += 1
+        if (POWERPOINT_TEMPLATES_DIR / f"{template_id}.pptx").exists():
+            deleted_count += template_previews.delete(
+                _template_content_hash(template_id, _load_template_metadata(template_id))
+            )
         
         return JSONResponse({
             'success': True,
@@ -959,271 +1071,49 @@ async def set_default_template(template_id: str):
 
 
 @router.get("/upload/powerpoint-template/{template_id}/preview")
-async def get_template_preview(template_id: str, slide_index: int = 0):
-    """Get a preview image of a template slide.
-    
-    Dynamically renders all visual elements from the template including:
-    - All images (logos, graphics) at their actual positions
-    - Shape outlines and fills
-    - Placeholder areas (title, content, footer)
-    - Lines and separators
+async def get_template_preview(template_id: str, layout_index: Optional[int] = None, size: str = "full"):
+    """Get a preview image of a template layout (its main preview layout by default).
     
-    This works with any template layout.
+    Previews are pre-rendered in the background at upload; templates uploaded
+    before that (or whose render hasn't finished) are rendered on demand.
+    For long-lived caching use the content-addressed preview_urls returned
+    by /upload/powerpoint-templates.
     """
     from fastapi.responses import FileResponse
-    from pptx import Presentation
-    from pptx.util import Emu, Inches
-    from pptx.enum.shapes import MSO_SHAPE_TYPE
-    from pptx.enum.dml import MSO_THEME_COLOR
-    from PIL import Image, ImageDraw, ImageFont
-    from io import BytesIO
-    import zipfile
-    import re
     
     try:
         template_path = POWERPOINT_TEMPLATES_DIR / f"{template_id}.pptx"
-        metadata_path = POWERPOINT_TEMPLATES_DIR / f"{template_id}.yaml"
         
         if not template_path.exists():
             return JSONResponse({
                 'success': False,
                 'detail': 'Template not found'
             }, status_code=404)
+        if size not in PREVIEW_SIZES:
+            return JSONResponse({
+                'success': False,
+                'detail': f"Unknown preview size '{size}'"
+            }, status_code=400)
         
-        # Load metadata for template name
-        template_name = template_id
-        if metadata_path.exists():
-            with open(metadata_path, 'r') as f:
-                metadata = yaml.safe_load(f)
-                template_name = metadata.get('name', template_id)
-        
-        # Check if cached preview exists (v4 = full dynamic rendering)
-        cache_dir = POWERPOINT_TEMPLATES_DIR / "previews"
-        cache_dir.mkdir(exist_ok=True)
-        cached_preview = cache_dir / f"{template_id}_slide{slide_index}_v4.png"
-        
-        if cached_preview.exists():
-            return FileResponse(cached_preview, media_type="image/png")
+        metadata = _load_template_metadata(template_id)
+        content_hash = _template_content_hash(template_id, metadata)
+        preview_layout = _template_preview_layout(template_id, metadata)
+        default_path = template_previews.get_path(content_hash, preview_layout, size)
+        preview_path = default_path if layout_index is None else template_previews.get_path(
+            content_hash, layout_index, size
+        )
         
-        # Create template preview by rendering all elements
-        try:
-            prs = Presentation(template_path)
-            
-            # Scale factors: slide EMU to 1920x1080 pixels
-            px_per_emu_x = 1920 / prs.slide_width
-            px_per_emu_y = 1080 / prs.slide_height
-            
-            def to_px(left, top, width, height):
-                return (
-                    int(left * px_per_emu_x),
-                    int(top * px_per_emu_y),
-                    int(width * px_per_emu_x),
-                    int(height * px_per_emu_y)
+        if not preview_path.exists():
+            # Previews not rendered yet (a rendered set lacking this layout
+            # means the index is past the template's layouts)
+            if not default_path.exists():
+                await asyncio.to_thread(
+                    template_previews.render_all, _template_preview_source(template_id), content_hash
                 )
-            
-            # Create white base image
-            img = Image.new('RGBA', (1920, 1080), color=(255, 255, 255, 255))
-            draw = ImageDraw.Draw(img)
-            
-            # Load all images from the PPTX media folder
-            media_images = {}
-            with zipfile.ZipFile(template_path, 'r') as zf:
-                for name in zf.namelist():
-                    if name.startswith('ppt/media/') and any(name.endswith(ext) for ext in ['.png', '.jpg', '.jpeg', '.gif']):
-                        try:
-                            with zf.open(name) as f:
-                                media_images[name.split('/')[-1]] = Image.open(BytesIO(f.read())).copy()
-                        except:
-                            pass
-            
-            logger.info(f"Loaded {len(media_images)} media images from template")
-            
-            # Get fonts
-            try:
-                font_title = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 28)
-                font_normal = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 16)
-                font_small = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 12)
-            except:
-                font_title = font_normal = font_small = ImageFont.load_default()
-            
-            # Function to render shapes from a shape collection
-            def render_shapes(shapes, is_master=False):
-                for shape in shapes:
-                    left_px, top_px, width_px, height_px = to_px(
-                        shape.left, shape.top, shape.width, shape.height
-                    )
-                    
-                    # Skip off-screen elements
-                    if left_px > 1920 or top_px > 1080:
-                        continue
-                    if width_px < 2 or height_px < 2:
-                        continue
-                    
-                    shape_type = shape.shape_type
-                    name = shape.name.lower()
-                    
-                    # Render PICTURES (logos, graphics)
-                    if shape_type == MSO_SHAPE_TYPE.PICTURE:
-                        try:
-                            # Try to get the image blob
-                            if hasattr(shape, 'image') and shape.image:
-                                pic_data = shape.image.blob
-                                pic_img = Image.open(BytesIO(pic_data))
-                                
-                                # Resize to match shape dimensions
-                                pic_img = pic_img.resize((max(1, width_px), max(1, height_px)), Image.Resampling.LANCZOS)
-                                
-                                if pic_img.mode != 'RGBA':
-                                    pic_img = pic_img.convert('RGBA')
-                                
-                                # Paste with alpha if available
-                                img.paste(pic_img, (left_px, top_px), pic_img)
-                                logger.info(f"Rendered picture: {shape.name} at ({left_px}, {top_px})")
-                        except Exception as e:
-                            # Draw placeholder for failed images
-                            draw.rectangle([(left_px, top_px), (left_px + width_px, top_px + height_px)],
-                                          outline=(200, 200, 210), width=1)
-                    
-                    # Render LINES
-                    elif shape_type == MSO_SHAPE_TYPE.LINE:
-                        draw.line([(left_px, top_px), (left_px + width_px, top_px + height_px)],
-                                 fill=(180, 185, 195), width=2)
-                    
-                    # Render AUTO_SHAPES (rectangles, etc.)
-                    elif shape_type == MSO_SHAPE_TYPE.AUTO_SHAPE:
-                        # Check for fill
-                        fill_color = None
-                        try:
-                            if hasattr(shape, 'fill') and shape.fill.type is not None:
-                                if hasattr(shape.fill, 'fore_color') and shape.fill.fore_color:
-                                    rgb = shape.fill.fore_color.rgb
-                                    if rgb:
-                                        fill_color = (rgb[0], rgb[1], rgb[2], 50)  # Semi-transparent
-                        except:
-                            pass
-                        
-                        if fill_color:
-                            overlay = Image.new('RGBA', (width_px, height_px), fill_color)
-                            img.paste(overlay, (left_px, top_px), overlay)
-                        
-                        # Draw outline
-                        draw.rectangle([(left_px, top_px), (left_px + width_px, top_px + height_px)],
-                                      outline=(210, 215, 225), width=1)
-                    
-                    # Render PLACEHOLDERS (title, content, footer areas)
-                    elif shape_type == MSO_SHAPE_TYPE.PLACEHOLDER:
-                        # Determine placeholder type from name
-                        is_title = 'titre' in name or 'title' in name
-                        is_content = 'texte' in name or 'content' in name or 'text' in name
-                        is_footer = 'pied' in name or 'footer' in name
-                        
-                        if is_title:
-                            # Title area - light blue tint
-                            overlay = Image.new('RGBA', (width_px, height_px), (230, 240, 255, 80))
-                            img.paste(overlay, (left_px, top_px), overlay)
-                            draw.rectangle([(left_px, top_px), (left_px + width_px, top_px + height_px)],
-                                          outline=(150, 180, 220), width=2)
-                            draw.text((left_px + 10, top_px + 5), "TITLE AREA", fill=(120, 150, 190), font=font_small)
-                        
-                        elif is_content and height_px > 200:
-                            # Content area - dashed border
-                            for i in range(left_px, left_px + width_px, 15):
-                                draw.line([(i, top_px), (min(i+8, left_px + width_px), top_px)], fill=(200, 210, 225), width=1)
-                                draw.line([(i, top_px + height_px), (min(i+8, left_px + width_px), top_px + height_px)], fill=(200, 210, 225), width=1)
-                            for i in range(top_px, top_px + height_px, 15):
-                                draw.line([(left_px, i), (left_px, min(i+8, top_px + height_px))], fill=(200, 210, 225), width=1)
-                                draw.line([(left_px + width_px, i), (left_px + width_px, min(i+8, top_px + height_px))], fill=(200, 210, 225), width=1)
-                            # Label
-                            label = "CONTENT AREA - Place your screenshot here"
-                            bbox = draw.textbbox((0, 0), label, font=font_normal)
-                            lx = left_px + (width_px - (bbox[2] - bbox[0])) // 2
-                            ly = top_px + (height_px - (bbox[3] - bbox[1])) // 2
-                            draw.text((lx, ly), label, fill=(180, 190, 210), font=font_normal)
-                        
-                        elif is_footer:
-                            # Footer area - subtle gray
-                            overlay = Image.new('RGBA', (width_px, height_px), (245, 245, 250, 100))
-                            img.paste(overlay, (left_px, top_px), overlay)
-                            draw.line([(left_px, top_px), (left_px + width_px, top_px)], fill=(220, 225, 235), width=1)
-                    
-                    # Render GROUPS (may contain multiple elements)
-                    elif shape_type == MSO_SHAPE_TYPE.GROUP:
-                        # Draw group boundary
-                        draw.rectangle([(left_px, top_px), (left_px + width_px, top_px + height_px)],
-                                      outline=(190, 200, 215), width=1)
-                    
-                    # Render TEXT_BOX
-                    elif shape_type == MSO_SHAPE_TYPE.TEXT_BOX:
-                        if hasattr(shape, 'text') and shape.text.strip():
-                            # Small text boxes with content (like confidentiality marks)
-                            draw.rectangle([(left_px, top_px), (left_px + width_px, top_px + height_px)],
-                                          fill=(250, 250, 252), outline=(230, 235, 245), width=1)
-            
-            # Render slide master elements (persistent across all slides)
-            logger.info("Rendering slide master elements...")
-            render_shapes(prs.slide_master.shapes, is_master=True)
-            
-            # Render the specified slide layout (or first content layout)
-            layout_idx = min(slide_index, len(prs.slide_layouts) - 1)
-            # Try to find a good content layout (skip cover pages)
-            for i, layout in enumerate(prs.slide_layouts):
-                if any(x in layout.name.lower() for x in ['content', 'text', 'title_text', 'white']):
-                    layout_idx = i
-                    break
-            
-            if layout_idx < len(prs.slide_layouts):
-                logger.info(f"Rendering slide layout: {prs.slide_layouts[layout_idx].name}")
-                render_shapes(prs.slide_layouts[layout_idx].shapes)
-            
-            # Add template name at bottom
-            draw.text((20, 1055), f"Template: {template_name}", fill=(150, 155, 170), font=font_small)
-            
-            # Convert to RGB for PNG saving
-            img = img.convert('RGB')
-            
-            # Save to cache
-            img.save(cached_preview, 'PNG')
-            logger.info(f"Generated template preview v4: {cached_preview}")
-            
-            return FileResponse(cached_preview, media_type="image/png")
-            
-        except Exception as e:
-            logger.error(f"Failed to generate preview from PPTX: {e}")
-            # Fall through to placeholder
+            if not preview_path.exists():
+                preview_path = default_path
         
-        # Fallback: Generate a styled placeholder
-        img = Image.new('RGB', (1920, 1080), color=(250, 250, 252))
-        draw = ImageDraw.Draw(img)
-        
-        try:
-            font_large = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 36)
-            font_small = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 24)
-        except:
-            font_large = ImageFont.load_default()
-            font_small = ImageFont.load_default()
-        
-        # Draw a subtle header area
-        draw.rectangle([(0, 0), (1920, 80)], fill=(245, 245, 250))
-        draw.line([(0, 80), (1920, 80)], fill=(220, 220, 225), width=1)
-        
-        # Draw template name in header
-        draw.text((30, 25), template_name, fill=(60, 60, 70), font=font_large)
-        
-        # Draw content area placeholder with dashed border
-        for i in range(0, 1840, 20):
-            draw.line([(40 + i, 100), (min(50 + i, 1880), 100)], fill=(200, 200, 210), width=1)
-            draw.line([(40 + i, 1040), (min(50 + i, 1880), 1040)], fill=(200, 200, 210), width=1)
-        
-        # Draw "Content Area" text
-        text = "Drag your content here"
-        bbox = draw.textbbox((0, 0), text, font=font_small)
-        x = (1920 - (bbox[2] - bbox[0])) // 2
-        draw.text((x, 560), text, fill=(180, 180, 180), font=font_small)
-        
-        # Save to cache
-        img.save(cached_preview, 'PNG')
-        
-        return FileResponse(cached_preview, media_type="image/png")
+        return FileResponse(preview_path, media_type="image/png")
         
     except Exception as e:
         logger.error(f"❌ Failed to get template preview: {e}")
@@ -1233,5 +1123,43 @@ async def get_template_preview(template_id: str, slide_index: int = 0):
         }, status_code=500)
 
 
+@router.get("/upload/powerpoint-template/previews/{asset_name}")
+async def get_template_preview_asset(asset_name: str):
+    """Serve a pre-rendered preview by its content-addressed name.
+    
+    The name embeds the template's content hash, so the response never
+    changes and browsers may cache it forever.
+    """
+    from fastapi.responses import FileResponse
+    
+    if not ASSET_NAME_PATTERN.match(asset_name):
+        return JSONResponse({
+            'success': False,
+            'detail': 'Preview not found'
+        }, status_code=404)
+    
+    preview_path = template_previews.preview_dir / asset_name
+    if not preview_path.exists():
+        # Templates uploaded before background rendering existed
+        template_id, metadata = _find_template_by_hash(asset_name.split('_')[0])
+        if template_id:
+            await asyncio.to_thread(
+                template_previews.render_all,
+                _template_preview_source(template_id),
+                _template_content_hash(template_id, metadata)
+            )
+        if not preview_path.exists():
+            return JSONResponse({
+                'success': False,
+                'detail': 'Preview not found'
+            }, status_code=404)
+    
+    return FileResponse(
+        preview_path,
+        media_type="image/png",
+        headers={"Cache-Control": "public, max-age=31536000, immutable"}
+    )
+
+
 
 
@@ -0,0 +1,297 @@
+"""
+Browser Manager Service
+Supervises the shared Playwright Chromium instance used for screenshots:
+optional warm start, recycling after capture/memory thresholds and
+transparent restart after a crash.
+"""
+import asyncio
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+import logging
+import os
+import time
+
+from playwright.async_api import async_playwright, Browser
+
+logger = logging.getLogger(__name__)
+
+BROWSER_ARGS = [
+    '--no-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-gpu'
+]
+
+
+class BrowserManager:
+    """Owns the Chromium lifecycle and exposes counters for diagnostics."""
+
+    # Memory is sampled from /proc every N captures rather than on each one
+    RSS_CHECK_INTERVAL = 10
+
+    def __init__(
+        self,
+        max_captures: Optional[int] = None,
+        max_rss_mb: Optional[int] = None,
+        prelaunch: Optional[bool] = None
+    ):
+        """
+        Initialize the manager.
+
+        Args:
+            max_captures: Recycle after this many captures
+                (BROWSER_MAX_CAPTURES, default 200; 0 disables)
+            max_rss_mb: Recycle when the Playwright driver's process tree
+                exceeds this resident size in MB (BROWSER_MAX_RSS_MB, default 1024; 0 disables)
+            prelaunch: Launch at app startup instead of on first capture
+                (BROWSER_PRELAUNCH, default false)
+        """
+        if max_captures is None:
+            max_captures = int(os.getenv("BROWSER_MAX_CAPTURES", "200"))
+        if max_rss_mb is None:
+            max_rss_mb = int(os.getenv("BROWSER_MAX_RSS_MB", "1024"))
+        if prelaunch is None:
+            prelaunch = os.getenv("BROWSER_PRELAUNCH", "false").lower() in ("1", "true", "yes")
+
+        self.max_captures = max_captures
+        self.max_rss_mb = max_rss_mb
+        self.prelaunch = prelaunch
+
+        self._browser: Optional[Browser] = None
+        self._playwright = None
+        self._driver_pid: Optional[int] = None
+        # Created on first use per event loop: asyncio primitives bind to
+        # the loop they are first awaited on, and the sync capture wrappers
+        # run on private loops via asyncio.run()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock_obj: Optional[asyncio.Lock] = None
+        self._idle_obj: Optional[asyncio.Event] = None
+
+        self.state = "stopped"
+        self.launched_at: Optional[datetime] = None
+        self.active_captures = 0
+        self.captures_since_launch = 0
+        self.total_captures = 0
+        self.launches = 0
+        self.recycles = 0
+        self.crashes = 0
+        self.last_recycle_reason: Optional[str] = None
+        self.last_error: Optional[str] = None
+        self._expected_close = False
+
+    def _bind_loop(self):
+        """(Re)create the lock and idle event for the running event loop."""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            if self._loop is not None and self._loop.is_closed():
+                # A browser started on a finished loop cannot be driven
+                # (or closed) from this one; the next acquire() relaunches
+                self._browser = None
+                self._playwright = None
+                self._driver_pid = None
+                self.state = "stopped"
+            self._loop = loop
+            self._lock_obj = asyncio.Lock()
+            self._idle_obj = asyncio.Event()
+            if self.active_captures == 0:
+                self._idle_obj.set()
+
+    @property
+    def _lock(self) -> asyncio.Lock:
+        self._bind_loop()
+        return self._lock_obj
+
+    @property
+    def _idle(self) -> asyncio.Event:
+        self._bind_loop()
+        return self._idle_obj
+
+    async def start(self):
+        """Pre-launch the browser (called from app startup when enabled)."""
+        if not self.prelaunch:
+            return
+        try:
+            async with self._lock:
+                await self._launch()
+            logger.info("🌐 Browser pre-launched for screenshot capture")
+        except Exception as e:
+            self.last_error = str(e)
+            logger.warning(f"⚠️ Browser pre-launch failed, will launch on demand: {e}")
+
+    async def acquire(self) -> Browser:
+        """Get a healthy browser for one capture; pair with release()."""
+        async with self._lock:
+            reason = self._recycle_reason()
+            if reason and self._browser is not None:
+                # Let in-flight captures finish before swapping the browser
+                await self._idle.wait()
+                await self._shutdown()
+                self.recycles += 1
+                self.last_recycle_reason = reason
+                logger.info(f"♻️ Recycling browser: {reason}")
+
+            if self._browser is None or not self._browser.is_connected():
+                await self._launch()
+
+            self.active_captures += 1
+            self._idle.clear()
+            return self._browser
+
+    async def release(self):
+        """Mark a capture started with acquire() as finished."""
+        self.active_captures = max(0, self.active_captures - 1)
+        self.captures_since_launch += 1
+        self.total_captures += 1
+        if self.active_captures == 0:
+            self._idle.set()
+
+    async def close(self):
+        """Close browser and Playwright (app shutdown)."""
+        async with self._lock:
+            await self._shutdown()
+
+    def get_status(self) -> Dict[str, Any]:
+        """Current state and counters for the diagnostics endpoint."""
+        connected = self._browser is not None and self._browser.is_connected()
+        uptime = None
+        if self.launched_at and connected:
+            uptime = round((datetime.now() - self.launched_at).total_seconds(), 1)
+        return {
+            "state": self.state,
+            "connected": connected,
+            "prelaunch": self.prelaunch,
+            "launched_at": self.launched_at.isoformat() if self.launched_at else None,
+            "uptime_seconds": uptime,
+            "active_captures": self.active_captures,
+            "captures_since_launch": self.captures_since_launch,
+            "total_captures": self.total_captures,
+            "launches": self.launches,
+            "recycles": self.recycles,
+            "crashes": self.crashes,
+            "last_recycle_reason": self.last_recycle_reason,
+            "last_error": self.last_error,
+            "rss_mb": self._browser_rss_mb() if connected else None,
+            "max_captures": self.max_captures,
+            "max_rss_mb": self.max_rss_mb,
+        }
+
+    async def _launch(self):
+        """Start Playwright and Chromium (caller holds the lock)."""
+        await self._shutdown()
+        self.state = "starting"
+        started = time.time()
+        try:
+            manager = async_playwright()
+            self._playwright = await manager.start()
+            self._driver_pid = self._find_driver_pid(manager)
+            self._browser = await self._playwright.chromium.launch(
+                headless=True,
+                args=BROWSER_ARGS
+            )
+        except Exception as e:
+            await self._shutdown()
+            self.state = "failed"
+            self.last_error = str(e)
+            raise
+        self._expected_close = False
+        self._browser.on("disconnected", self._on_disconnected)
+        self.state = "running"
+        self.launched_at = datetime.now()
+        self.captures_since_launch = 0
+        self.launches += 1
+        logger.info(f"🌐 Browser launched in {time.time() - started:.2f}s")
+
+    async def _shutdown(self):
+        """Close browser and Playwright if running (caller holds the lock)."""
+        self._expected_close = True
+        if self._browser:
+            try:
+                await self._browser.close()
+            except Exception as e:
+                logger.debug(f"Browser close failed: {e}")
+            self._browser = None
+        if self._playwright:
+            try:
+                await self._playwright.stop()
+            except Exception as e:
+                logger.debug(f"Playwright stop failed: {e}")
+            self._playwright = None
+        self._driver_pid = None
+        self.state = "stopped"
+
+    def _on_disconnected(self, browser: Browser):
+        """Record unexpected browser exits; the next acquire() relaunches."""
+        if self._expected_close:
+            return
+        self.crashes += 1
+        self.state = "crashed"
+        self.last_error = "Browser disconnected unexpectedly"
+        logger.error("💥 Browser disconnected unexpectedly, will restart on next capture")
+
+    def _recycle_reason(self) -> Optional[str]:
+        """Return why the browser should be recycled, or None."""
+        if self._browser is None:
+            return None
+        if self.max_captures and self.captures_since_launch >= self.max_captures:
+            return f"{self.captures_since_launch} captures since launch"
+        if (self.max_rss_mb and self.captures_since_launch
+                and self.captures_since_launch % self.RSS_CHECK_INTERVAL == 0):
+            rss = self._browser_rss_mb()
+            if rss is not None and rss >= self.max_rss_mb:
+                return f"browser RSS {rss:.0f}MB >= {self.max_rss_mb}MB"
+        return None
+
+    @staticmethod
+    def _find_driver_pid(manager) -> Optional[int]:
+        """PID of the Playwright driver process started by manager."""
+        try:
+            return manager._connection._transport._proc.pid
+        except AttributeError:
+            pass
+        # Private attributes moved: look for our child running the driver
+        for entry in Path("/proc").glob("[0-9]*"):
+            try:
+                stat = (entry / "stat").read_text()
+                cmdline = (entry / "cmdline").read_bytes()
+            except OSError:
+                continue
+            ppid = int(stat.rsplit(")", 1)[1].split()[1])
+            if ppid == os.getpid() and b"run-driver" in cmdline:
+                return int(entry.name)
+        return None
+
+    def _browser_rss_mb(self) -> Optional[float]:
+        """Resident memory of the Playwright driver and everything under it
+        (Chromium and its helpers) read from /proc. Other children of this
+        process, such as build pool workers, are not counted. Returns None
+        where /proc or the driver PID is unavailable."""
+        proc = Path("/proc")
+        root = self._driver_pid
+        if root is None or not proc.exists():
+            return None
+        parents: Dict[int, int] = {}
+        rss_kb: Dict[int, int] = {}
+        for entry in proc.iterdir():
+            if not entry.name.isdigit():
+                continue
+            try:
+                status = (entry / "status").read_text()
+            except OSError:
+                continue
+            pid = int(entry.name)
+            for line in status.splitlines():
+                if line.startswith("PPid:"):
+                    parents[pid] = int(line.split()[1])
+                elif line.startswith("VmRSS:"):
+                    rss_kb[pid] = int(line.split()[1])
+
+        total_kb = rss_kb.get(root, 0)
+        for pid in parents:
+            ancestor = parents.get(pid)
+            depth = 0
+            while ancestor and ancestor != root and depth < 16:
+                ancestor = parents.get(ancestor)
+                depth += 1
+            if ancestor == root:
+                total_kb += rss_kb.get(pid, 0)
+        return total_kb / 1024
@@ -0,0 +1,161 @@
+"""
+Build Pool Service
+Runs CPU-bound PowerPoint assembly and image transforms in a process pool so
+exports don't block the event loop and several exports can use several cores.
+"""
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+import logging
+import multiprocessing
+import os
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _pool_size() -> int:
+    """Worker processes (BUILD_POOL_WORKERS, default CPU count; 0 = in-thread)."""
+    return int(os.getenv("BUILD_POOL_WORKERS", str(os.cpu_count() or 2)))
+
+
+def get_build_executor() -> Optional[ProcessPoolExecutor]:
+    """Get the shared process pool, creating it on first use.
+
+    Returns None when the pool is disabled, in which case work runs in a thread.
+    """
+    global _executor
+    if _executor is None and _pool_size() > 0:
+        # spawn: forking a process that runs an event loop and threads is unsafe
+        _executor = ProcessPoolExecutor(
+            max_workers=_pool_size(),
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        logger.info(f"🏭 Started PowerPoint build pool with {_pool_size()} workers")
+    return _executor
+
+
+def shutdown_build_pool():
+    """Stop the worker processes (app shutdown)."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def _build_hybrid(
+    report_data: Dict[str, Any],
+    slides_data: List[Dict[str, Any]],
+    template_path: Optional[str],
+    output_path: Optional[str] = None
+) -> Optional[bytes]:
+    """Worker entry point: build a hybrid presentation and return pptx bytes
+    (or write it to output_path)."""
+    from services.builder_service import create_builder
+    return create_builder().generate_hybrid_presentation(
+        report_data=report_data,
+        slides_data=slides_data,
+        template_path=template_path,
+        output=output_path
+    )
+
+
+def _build_risk_pdf(
+    risks: List[Dict[str, Any]],
+    program_title: str,
+    output_path: str,
+    layout: str
+) -> str:
+    """Worker entry point: render a risk register PDF to output_path."""
+    from services.risk_pdf import build_risk_pdf
+    return build_risk_pdf(risks, program_title, output_path, layout)
+
+
+def _transform_image(image_bytes: bytes, transform: Dict[str, Any]) -> bytes:
+    """Worker entry point: apply a slide transform to one image."""
+    from services.builder_service import create_builder
+    return create_builder()._apply_transform_to_image(image_bytes, transform)
+
+
+def _transform_image_file(path: str, transform: Dict[str, Any]) -> str:
+    """Worker entry point: apply a slide transform to a spooled image in place."""
+    with open(path, 'rb') as f:
+        image_bytes = f.read()
+    with open(path, 'wb') as f:
+        f.write(_transform_image(image_bytes, transform))
+    return path
+
+
+async def _run(func, *args):
+    """Run func in the build pool, or in a thread when the pool is disabled."""
+    executor = get_build_executor()
+    if executor is None:
+        return await asyncio.to_thread(func, *args)
+    return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+
+
+async def build_hybrid_presentation_async(
+    report_data: Dict[str, Any],
+    slides_data: List[Dict[str, Any]],
+    template_path: Optional[str] = None,
+    output_path: Optional[str] = None
+) -> Optional[bytes]:
+    """
+    Build a hybrid presentation off the event loop.
+
+    Screenshot slides carrying a 'transform' are transformed first, one pool
+    task per slide, then the whole deck is assembled in a single worker.
+    Screenshot slides may reference their image by 'path' instead of 'data'.
+
+    Args:
+        report_data: Dictionary containing report metadata
+        slides_data: Slide specs as accepted by generate_hybrid_presentation
+        template_path: Optional path to company template
+        output_path: Optional file the worker saves the deck to, so it is
+            never copied back through the pool as bytes
+
+    Returns:
+        Generated PPTX file as bytes, or None when written to output_path
+    """
+    pending = [
+        (idx, slide) for idx, slide in enumerate(slides_data)
+        if slide.get('transform') and (slide.get('data') or slide.get('path'))
+        and slide.get('type', 'screenshot') == 'screenshot'
+    ]
+    if pending:
+        # Spooled images are transformed on disk so only paths cross the pool
+        transformed = await asyncio.gather(*[
+            _run(_transform_image, slide['data'], slide['transform'])
+            if slide.get('data') else
+            _run(_transform_image_file, slide['path'], slide['transform'])
+            for _, slide in pending
+        ])
+        slides_data = list(slides_data)
+        for (idx, slide), result in zip(pending, transformed):
+            slides_data[idx] = {k: v for k, v in slide.items() if k != 'transform'}
+            if slide.get('data'):
+                slides_data[idx]['data'] = result
+
+    return await _run(_build_hybrid, report_data, slides_data, template_path, output_path)
+
+
+async def build_risk_pdf_async(
+    risks: List[Dict[str, Any]],
+    program_title: str,
+    output_path: str,
+    layout: str = 'landscape'
+) -> str:
+    """
+    Render a risk register PDF off the event loop.
+
+    Args:
+        risks: Risks in register order
+        program_title: Program name shown in the heading
+        output_path: File the worker writes the PDF to
+        layout: 'landscape' or 'portrait'
+
+    Returns:
+        output_path
+    """
+    return await _run(_build_risk_pdf, risks, program_title, output_path, layout)
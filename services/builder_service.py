@@ -1,15 +1,21 @@
 import os
 import time
+from copy import deepcopy
+from functools import lru_cache
 from io import BytesIO
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, BinaryIO, Union
 from datetime import datetime
 
 from pptx import Presentation
 from pptx.util import Inches, Pt
 from pptx.enum.text import PP_ALIGN
 from pptx.dml.color import RGBColor
+from pptx.oxml.ns import qn
 from PIL import Image
 
+from services.image_encoder import ImageEncoder
+from services.template_cache import template_cache
+
 
 # Template safe zone configuration (in inches from each edge)
 # These define where the image content should not encroach
@@ -20,17 +26,69 @@ TEMPLATE_SAFE_ZONES = {
 }
 
 
+def _is_plain_text(text: str) -> bool:
+    """True if python-pptx would write text as a single run (no breaks/escapes)."""
+    return bool(text) and all(ch >= ' ' or ch == '\t' for ch in text)
+
+
+class _TableCellStamper:
+    """Fast path for filling native table cells.
+    
+    The first cell of each style is formatted through python-pptx as usual and
+    kept as a prototype ``a:tc``. Later cells with the same style key are deep
+    copies of that prototype with only the ``a:t`` text swapped, which yields
+    the same XML without the per-cell text frame/font property calls.
+    """
+    
+    def __init__(self, table, enabled: bool = True):
+        self._tr_lst = table._tbl.tr_lst
+        self._prototypes: Dict[Any, Any] = {}
+        self.enabled = enabled
+    
+    def stamp(self, row_idx: int, col_idx: int, style_key: Any, text: str) -> bool:
+        """Replace the cell with a copy of its style prototype.
+        
+        Returns:
+            False if the cell must be formatted the slow way
+        """
+        if not self.enabled or not _is_plain_text(text):
+            return False
+        prototype = self._prototypes.get(style_key)
+        if prototype is None:
+            return False
+        new_tc = deepcopy(prototype)
+        new_tc.find('.//' + qn('a:t')).text = text
+        old_tc = self._tr_lst[row_idx].tc_lst[col_idx]
+        old_tc.getparent().replace(old_tc, new_tc)
+        return True
+    
+    def remember(self, row_idx: int, col_idx: int, style_key: Any, text: str):
+        """Keep a formatted cell as the prototype for its style key."""
+        if self.enabled and _is_plain_text(text) and style_key not in self._prototypes:
+            self._prototypes[style_key] = deepcopy(self._tr_lst[row_idx].tc_lst[col_idx])
+
+
 class PowerPointBuilderService:
     """Service for building PowerPoint presentations with screenshots and branding."""
     
     DEFAULT_TEMPLATE_PATH = "templates/default_template.pptx"
     MAX_GENERATION_TIME = 3.0  # seconds
+    IMAGE_DPI = 150  # Pixel density images are encoded at for the content area
+    FAST_TABLES = True  # Stamp table cells from per-style prototypes (_TableCellStamper)
     
-    def __init__(self):
-        """Initialize the PowerPoint builder service."""
+    def __init__(self, image_encoder: Optional[ImageEncoder] = None):
+        """Initialize the PowerPoint builder service.
+        
+        A builder holds the state of one presentation while it is generated,
+        so use create_builder() to get a fresh instance per export.
+        
+        Args:
+            image_encoder: Optional shared encoder for slide images
+        """
         self.presentation = None
         self.template_path = None
         self.start_time = None
+        self.image_encoder = image_encoder or ImageEncoder()
         
     def generate_presentation(
         self,
@@ -60,17 +118,13 @@ class PowerPointBuilderService:
         """
         self.start_time = time.time()
         
-        # Load template
-        self._load_template(template_path)
+        # Load template - content slides already removed by the template cache
+        # (keep only layout masters, plus the title slide if requested)
+        self._load_template(template_path, report_data.get('include_title_slide', True))
         
         # Determine if we should skip titles (branded templates have their own)
         use_template_titles = skip_slide_titles or (template_path is not None)
         
-        # If using a template, remove existing content slides (keep only layout masters)
-        # Typically slides 2+ are content slides that should be replaced
-        if template_path and self.presentation:
-            self._prepare_template_for_content(report_data.get('include_title_slide', True))
-        
         # Create title slide (only if not using template or specifically requested)
         if not use_template_titles or report_data.get('include_title_slide', True):
             self._create_title_slide(report_data)
@@ -115,31 +169,33 @@ class PowerPointBuilderService:
         report_data: Dict[str, Any],
         slides_data: List[Dict[str, Any]],
         template_path: Optional[str] = None,
-    ) -> bytes:
+        output: Optional[Union[str, BinaryIO]] = None,
+    ) -> Optional[bytes]:
         """
         Generate a PowerPoint with mix of screenshots and native tables.
         
         Args:
             report_data: Dictionary containing report metadata
             slides_data: List of slide configs, each with:
-                - type: 'screenshot', 'risks', or 'milestones'
-                - data: screenshot bytes OR list of risk/milestone dicts
+                - type: 'screenshot', 'risks', 'milestones', 'changes',
+                  'gantt' or 'metric_trend'
+                - data: screenshot bytes, list of risk/milestone/change/gantt
+                  task dicts, or a custom metric dict for 'metric_trend'
+                - path: Image file to use instead of data for screenshot slides
                 - title: Slide title
                 - page_num/total_pages: For multi-page content
+                - transform: Optional crop/scale for screenshot slides
             template_path: Optional path to company template
+            output: Optional file path or binary file to save the deck to
+                instead of returning it
             
         Returns:
-            Generated PPTX file as bytes
+            Generated PPTX file as bytes, or None when written to output
         """
         self.start_time = time.time()
         
-        # Load template
-        self._load_template(template_path)
-        
-        # Prepare template
-        if template_path and self.presentation:
-            self._prepare_template_for_content(
-                report_data.get('include_title_slide', True))
+        # Load template (cached with its content slides already removed)
+        self._load_template(template_path, report_data.get('include_title_slide', True))
         
         # Create title slide
         if report_data.get('include_title_slide', True):
@@ -177,9 +233,37 @@ class PowerPointBuilderService:
                     title=title,
                     rows_per_slide=rows_per_slide
                 )
+            elif slide_type == 'gantt':
+                # Native shapes for the Gantt chart (auto-paginates)
+                tasks = slide_config.get('data', [])
+                self.create_gantt_slides(
+                    tasks=tasks,
+                    title=title,
+                    rows_per_slide=slide_config.get('rows_per_slide', 14)
+                )
+            elif slide_type == 'risk_heatmap':
+                # Native likelihood x impact matrix
+                self.create_risk_heatmap_slide(
+                    aggregates=slide_config.get('data') or {},
+                    title=title
+                )
+            elif slide_type == 'metric_trend':
+                # Native line chart for a custom metric
+                metric = slide_config.get('data') or {}
+                self.create_metric_trend_slide(
+                    metric=metric,
+                    title=title
+                )
             else:
-                # Default: screenshot-based slide
+                # Default: screenshot-based slide; spooled captures are read
+                # only when their slide is built
                 screenshot = slide_config.get('data')
+                if screenshot is None and slide_config.get('path'):
+                    with open(slide_config['path'], 'rb') as f:
+                        screenshot = f.read()
+                if screenshot and slide_config.get('transform'):
+                    screenshot = self._apply_transform_to_image(
+                        screenshot, slide_config['transform'])
                 if screenshot:
                     self._create_content_slide(
                         screenshot,
@@ -192,33 +276,18 @@ class PowerPointBuilderService:
         elapsed = time.time() - self.start_time
         if elapsed >= self.MAX_GENERATION_TIME * 2:  # Allow more time for tables
             raise ValueError("File generation exceeded time limit")
-            
+        
+        if output is not None:
+            # Stream the zip straight to disk instead of building it in memory
+            self.presentation.save(output)
+            return None
         return self._save_to_bytes()
 
-    def _prepare_template_for_content(self, keep_title_slide: bool = True):
-        """Remove existing content slides from template, keeping only the structure.
-        
-        This allows us to use the template's styling while replacing its content.
-        """
-        if not self.presentation:
-            return
-            
-        # Count slides to remove (skip first slide if keeping title)
-        slides_to_remove = []
-        start_idx = 1 if keep_title_slide else 0
-        
-        for i in range(start_idx, len(self.presentation.slides)):
-            slides_to_remove.append(i)
-        
-        # Remove slides in reverse order to avoid index shifting
-        for idx in reversed(slides_to_remove):
-            slide_id = self.presentation.slides._sldIdLst[idx].rId
-            self.presentation.part.drop_rel(slide_id)
-            del self.presentation.slides._sldIdLst[idx]
-    
     def _apply_transform_to_image(self, image_bytes: bytes, transform: Dict[str, Any]) -> bytes:
         """Apply crop and positioning transforms to an image.
         
+        Crop, scale and re-encode happen in a single decode via ImageEncoder.
+        
         Args:
             image_bytes: Original image bytes
             transform: Dict with keys like cropTop, cropBottom, cropLeft, cropRight, scale, left, top
@@ -227,68 +296,63 @@ class PowerPointBuilderService:
             Transformed image as bytes
         """
         try:
-            img = Image.open(BytesIO(image_bytes))
-            orig_width, orig_height = img.size
-            
-            # Apply crop if specified (values are percentages)
-            crop_top = transform.get('cropTop', 0) / 100
-            crop_bottom = transform.get('cropBottom', 0) / 100
-            crop_left = transform.get('cropLeft', 0) / 100
-            crop_right = transform.get('cropRight', 0) / 100
-            
-            if any([crop_top, crop_bottom, crop_left, crop_right]):
-                left = int(orig_width * crop_left)
-                top = int(orig_height * crop_top)
-                right = int(orig_width * (1 - crop_right))
-                bottom = int(orig_height * (1 - crop_bottom))
-                img = img.crop((left, top, right, bottom))
-            
-            # Apply scale if specified
-            scale = transform.get('scale', 1.0)
-            if scale != 1.0 and scale > 0:
-                new_width = int(img.width * scale)
-                new_height = int(img.height * scale)
-                img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-            
-            # Save to bytes
-            output = BytesIO()
-            img.save(output, format='PNG')
-            output.seek(0)
-            return output.read()
-            
+            return self.image_encoder.encode(image_bytes, transform=transform)
         except Exception as e:
             # Return original on error
             import logging
             logging.warning(f"Failed to apply transform: {e}")
             return image_bytes
+    
+    def get_image_target_size(self, template_path: Optional[str] = None) -> tuple:
+        """Pixel size of the slide content area images are fitted into.
+        
+        Captures sized to this don't carry pixels PowerPoint would only
+        scale away. Slide sizes come from the template cache, and the safe
+        zone is the one _add_image_to_slide uses for the template.
         
-    def _load_template(self, template_path: Optional[str] = None):
-        """Load PowerPoint template or use default."""
+        Args:
+            template_path: Optional path to company template
+            
+        Returns:
+            Tuple of (width, height) in pixels at IMAGE_DPI
+        """
+        slide_size = None
+        if template_path:
+            try:
+                slide_size = template_cache.get_slide_size(template_path)
+            except (OSError, ValueError) as e:
+                import logging
+                logging.warning(f"Could not read template slide size: {e}")
+        if slide_size is None:
+            slide_size = _get_default_slide_size()
+        
+        safe_zone = TEMPLATE_SAFE_ZONES['branded' if template_path else 'default']
+        emu_per_inch = Inches(1)
+        width_in = slide_size[0] / emu_per_inch - safe_zone['left'] - safe_zone['right']
+        height_in = slide_size[1] / emu_per_inch - safe_zone['top'] - safe_zone['bottom']
+        return (int(width_in * self.IMAGE_DPI), int(height_in * self.IMAGE_DPI))
+        
+    def _load_template(self, template_path: Optional[str] = None, keep_title_slide: bool = True):
+        """Load PowerPoint template or use default.
+        
+        Uploaded templates come from the template cache, already validated and
+        stripped of content slides, so each export opens a cheap copy.
+        """
         if template_path:
             try:
-                self.presentation = Presentation(template_path)
+                prepared = template_cache.get_prepared(template_path, keep_title_slide)
+                self.presentation = Presentation(BytesIO(prepared))
                 self.template_path = template_path
-                self._validate_template()
             except Exception as e:
                 raise ValueError(f"Invalid template: {str(e)}")
         else:
             # Use default template or create new presentation
-            if os.path.exists(self.DEFAULT_TEMPLATE_PATH):
-                self.presentation = Presentation(self.DEFAULT_TEMPLATE_PATH)
+            default_template = _get_default_template_bytes()
+            if default_template:
+                self.presentation = Presentation(BytesIO(default_template))
             else:
                 self.presentation = Presentation()
                 
-    def _validate_template(self):
-        """Validate the loaded template."""
-        try:
-            # Check if presentation can be accessed
-            _ = self.presentation.slides
-            # Check if it has slide layouts
-            if not self.presentation.slide_layouts:
-                raise ValueError("Template has no slide layouts")
-        except Exception as e:
-            raise ValueError(f"Invalid template format: {str(e)}")
-            
     def _create_title_slide(self, report_data: Dict[str, Any]):
         """Create title slide with report metadata."""
         # Use first slide layout (title slide)
@@ -732,6 +796,7 @@ class PowerPointBuilderService:
         # ============================================================
         # DATA ROWS - Match canvas preview exactly
         # ============================================================
+        stamper = _TableCellStamper(table, enabled=self.FAST_TABLES)
         for row_idx, risk in enumerate(risks[:8], start=1):
             risk_id = risk.get('id', 'N/A')
             risk_title = risk.get('title', 'Untitled')
@@ -759,10 +824,15 @@ class PowerPointBuilderService:
             row_bg = RGBColor(0xF9, 0xFA, 0xFB) if is_even else RGBColor(0xFF, 0xFF, 0xFF)
             
             for col_idx, value in enumerate(row_data):
+                text = str(value) if value else ''
+                style_key = (col_idx, is_even, severity if col_idx == 3 else None)
+                if stamper.stamp(row_idx, col_idx, style_key, text):
+                    continue
+                
                 cell = table.cell(row_idx, col_idx)
                 
                 # No truncation - let text wrap naturally
-                cell.text = str(value) if value else ''
+                cell.text = text
                 
                 para = cell.text_frame.paragraphs[0]
                 para.font.size = Pt(8)
@@ -789,6 +859,8 @@ class PowerPointBuilderService:
                     cell.fill.fore_color.rgb = RGBColor(0xFF, 0xFE, 0xF0)  # Light yellow
                     para.font.italic = True
                     para.font.color.rgb = RGBColor(0x66, 0x66, 0x66)
+                
+                stamper.remember(row_idx, col_idx, style_key, text)
         
         # ============================================================
         # INFO BOX - Match canvas preview
@@ -1056,6 +1128,7 @@ class PowerPointBuilderService:
                 # td.date: font-size: 15px, color: #666
                 # td.resource: background: #fffef0, font-style: italic, color: #666
                 # ============================================================
+                stamper = _TableCellStamper(table, enabled=self.FAST_TABLES)
                 for row_idx, ms in enumerate(ms_list[:8], start=1):
                     name = str(get_ms_attr(ms, 'name', 'Untitled'))
                     target = str(get_ms_attr(ms, 'target_date', ''))
@@ -1077,54 +1150,50 @@ class PowerPointBuilderService:
                     # Resources - show actual or placeholder
                     resource_display = str(resources) if resources else 'Resource'
                     
-                    # --- Milestone Name Cell ---
-                    cell = table.cell(row_idx, 0)
-                    cell.text = name_display
-                    para = cell.text_frame.paragraphs[0]
-                    para.font.size = Pt(8)
-                    para.font.bold = False  # font-weight: 500 = medium
-                    para.font.color.rgb = RGBColor(0x1F, 0x29, 0x37)  # #1f2937
-                    cell.vertical_anchor = MSO_ANCHOR.MIDDLE
-                    cell.text_frame.margin_left = Inches(0.05)
-                    cell.text_frame.word_wrap = True
-                    
-                    # --- Date Cell ---
-                    cell = table.cell(row_idx, 1)
-                    cell.text = date_display
-                    para = cell.text_frame.paragraphs[0]
-                    para.font.size = Pt(8)
-                    para.font.color.rgb = RGBColor(0x66, 0x66, 0x66)  # #666
-                    cell.vertical_anchor = MSO_ANCHOR.MIDDLE
-                    
-                    # --- Status Cell ---
-                    cell = table.cell(row_idx, 2)
-                    cell.text = status_display
-                    para = cell.text_frame.paragraphs[0]
-                    para.font.size = Pt(8)
-                    color, is_bold = status_colors.get(status, status_colors['NOT_STARTED'])
-                    para.font.color.rgb = color
-                    para.font.bold = is_bold
-                    cell.vertical_anchor = MSO_ANCHOR.MIDDLE
-                    
-                    # --- Resources Cell (EDITABLE) ---
-                    # background: #fffef0, font-style: italic, color: #666
-                    cell = table.cell(row_idx, 3)
-                    cell.text = resource_display
-                    cell.fill.solid()
-                    cell.fill.fore_color.rgb = RGBColor(0xFF, 0xFE, 0xF0)  # #fffef0
-                    para = cell.text_frame.paragraphs[0]
-                    para.font.size = Pt(8)
-                    para.font.italic = True
-                    para.font.color.rgb = RGBColor(0x66, 0x66, 0x66)  # #666
-                    cell.vertical_anchor = MSO_ANCHOR.MIDDLE
-                    
-                    # Alternate row backgrounds (subtle)
-                    if row_idx % 2 == 0:
-                        for ci in range(3):  # Don't override resources column
-                            c = table.cell(row_idx, ci)
-                            if ci != 3:
-                                c.fill.solid()
-                                c.fill.fore_color.rgb = RGBColor(0xF9, 0xFA, 0xFB)
+                    cell_texts = [name_display, date_display, status_display, resource_display]
+                    is_even = row_idx % 2 == 0
+                    for col_idx, text in enumerate(cell_texts):
+                        style_key = (col_idx, is_even, status if col_idx == 2 else None)
+                        if stamper.stamp(row_idx, col_idx, style_key, text):
+                            continue
+                        
+                        cell = table.cell(row_idx, col_idx)
+                        cell.text = text
+                        para = cell.text_frame.paragraphs[0]
+                        para.font.size = Pt(8)
+                        
+                        if col_idx == 0:
+                            # --- Milestone Name Cell ---
+                            para.font.bold = False  # font-weight: 500 = medium
+                            para.font.color.rgb = RGBColor(0x1F, 0x29, 0x37)  # #1f2937
+                            cell.vertical_anchor = MSO_ANCHOR.MIDDLE
+                            cell.text_frame.margin_left = Inches(0.05)
+                            cell.text_frame.word_wrap = True
+                        elif col_idx == 1:
+                            # --- Date Cell ---
+                            para.font.color.rgb = RGBColor(0x66, 0x66, 0x66)  # #666
+                            cell.vertical_anchor = MSO_ANCHOR.MIDDLE
+                        elif col_idx == 2:
+                            # --- Status Cell ---
+                            color, is_bold = status_colors.get(status, status_colors['NOT_STARTED'])
+                            para.font.color.rgb = color
+                            para.font.bold = is_bold
+                            cell.vertical_anchor = MSO_ANCHOR.MIDDLE
+                        else:
+                            # --- Resources Cell (EDITABLE) ---
+                            # background: #fffef0, font-style: italic, color: #666
+                            cell.fill.solid()
+                            cell.fill.fore_color.rgb = RGBColor(0xFF, 0xFE, 0xF0)  # #fffef0
+                            para.font.italic = True
+                            para.font.color.rgb = RGBColor(0x66, 0x66, 0x66)  # #666
+                            cell.vertical_anchor = MSO_ANCHOR.MIDDLE
+                        
+                        # Alternate row backgrounds (subtle); resources column keeps its fill
+                        if is_even and col_idx != 3:
+                            cell.fill.solid()
+                            cell.fill.fore_color.rgb = RGBColor(0xF9, 0xFA, 0xFB)
+                        
+                        stamper.remember(row_idx, col_idx, style_key, text)
         
         # ============================================================
         # INFO BOX - Matches HTML .info-box, fits within slide
@@ -1242,6 +1311,7 @@ class PowerPointBuilderService:
                 cell.vertical_anchor = MSO_ANCHOR.MIDDLE
             
             # Data rows
+            stamper = _TableCellStamper(table, enabled=self.FAST_TABLES)
             for row_idx, change in enumerate(slide_changes, start=1):
                 # Extract change data
                 milestone = change.get('milestone_name', change.get('change_id', ''))
@@ -1257,10 +1327,15 @@ class PowerPointBuilderService:
                 row_data = [milestone, old_date, new_date, reason, contingency]
                 
                 for col_idx, value in enumerate(row_data):
+                    text = str(value) if value else ''
+                    style_key = (col_idx, row_idx % 2 == 0)
+                    if stamper.stamp(row_idx, col_idx, style_key, text):
+                        continue
+                    
                     cell = table.cell(row_idx, col_idx)
                     
                     # Set text with word wrap
-                    cell.text = str(value) if value else ''
+                    cell.text = text
                     
                     # Enable text wrapping
                     cell.text_frame.word_wrap = True
@@ -1281,9 +1356,432 @@ class PowerPointBuilderService:
                     if row_idx % 2 == 0:
                         cell.fill.solid()
                         cell.fill.fore_color.rgb = RGBColor(0xF9, 0xFA, 0xFB)
+                    
+                    stamper.remember(row_idx, col_idx, style_key, text)
         
         return num_slides
 
+    def create_gantt_slides(
+        self,
+        tasks: List[Dict[str, Any]],
+        title: str = "Gantt Chart",
+        rows_per_slide: int = 14
+    ) -> int:
+        """Create slides with a native Gantt chart built from PowerPoint shapes.
+
+        Each task is drawn as a rectangle positioned on a shared month axis,
+        so bars stay editable in PowerPoint and no browser is needed.
+
+        Args:
+            tasks: List of task dictionaries in the format produced by
+                   ChartFormatterService.format_gantt_data (Task, Start,
+                   Finish, Resource, Status)
+            title: Base slide title
+            rows_per_slide: Maximum bars per slide
+
+        Returns:
+            Number of slides created
+        """
+        from pptx.enum.text import MSO_ANCHOR
+        from pptx.enum.shapes import MSO_SHAPE, MSO_CONNECTOR
+        from datetime import timedelta
+
+        def parse_date(value):
+            try:
+                return datetime.strptime(str(value)[:10], '%Y-%m-%d')
+            except (TypeError, ValueError):
+                return None
+
+        # Keep only tasks with a usable date range, ordered by start
+        rows = []
+        for task in tasks:
+            start = parse_date(task.get('Start'))
+            finish = parse_date(task.get('Finish')) or start
+            if not start:
+                continue
+            if finish < start:
+                start, finish = finish, start
+            rows.append((task, start, finish))
+        rows.sort(key=lambda r: (r[1], r[2]))
+
+        slide_width = 10.0
+        margin = 0.25
+        clean_title = title.replace(".xml", "").replace(".xlsx", "").replace(".yaml", "")
+
+        if not rows:
+            # Keep the requested slide in the deck, like an empty heat map
+            layout_idx = 6 if len(self.presentation.slide_layouts) > 6 else 5
+            slide = self.presentation.slides.add_slide(self.presentation.slide_layouts[layout_idx])
+
+            title_box = slide.shapes.add_textbox(
+                Inches(margin), Inches(0.2), Inches(slide_width - 2 * margin), Inches(0.5))
+            title_tf = title_box.text_frame
+            title_tf.paragraphs[0].text = clean_title
+            title_tf.paragraphs[0].font.size = Pt(24)
+            title_tf.paragraphs[0].font.bold = False
+            title_tf.paragraphs[0].font.color.rgb = RGBColor(0x7F, 0x7F, 0x7F)
+
+            info_box = slide.shapes.add_textbox(
+                Inches(margin), Inches(3.2), Inches(slide_width - 2 * margin), Inches(0.5))
+            info_box.text_frame.paragraphs[0].text = "No dated tasks to show for this project"
+            info_box.text_frame.paragraphs[0].alignment = PP_ALIGN.CENTER
+            info_box.text_frame.paragraphs[0].font.size = Pt(14)
+            info_box.text_frame.paragraphs[0].font.italic = True
+            info_box.text_frame.paragraphs[0].font.color.rgb = RGBColor(0x9C, 0xA3, 0xAF)
+            return 1
+
+        # ============================================================
+        # TIME AXIS - Whole months spanning every task
+        # ============================================================
+        axis_start = min(r[1] for r in rows).replace(day=1)
+        last = max(r[2] for r in rows)
+        if last.month == 12:
+            axis_end = last.replace(year=last.year + 1, month=1, day=1)
+        else:
+            axis_end = last.replace(month=last.month + 1, day=1)
+        total_days = max((axis_end - axis_start).days, 1)
+
+        months = []
+        cursor = axis_start
+        while cursor < axis_end:
+            months.append(cursor)
+            if cursor.month == 12:
+                cursor = cursor.replace(year=cursor.year + 1, month=1)
+            else:
+                cursor = cursor.replace(month=cursor.month + 1)
+
+        # ============================================================
+        # STATUS COLORS - Match the Plotly Gantt on /dashboard/gantt
+        # ============================================================
+        status_colors = {
+            'COMPLETED': RGBColor(0x16, 0xA3, 0x4A),    # Green
+            'IN_PROGRESS': RGBColor(0x25, 0x63, 0xEB),  # Blue
+            'NOT_STARTED': RGBColor(0x9C, 0xA3, 0xAF),  # Gray
+        }
+
+        label_width = 2.6
+        chart_left = margin + label_width
+        chart_width = slide_width - chart_left - margin
+        axis_top = 0.85
+        axis_height = 0.3
+        bars_top = axis_top + axis_height + 0.05
+        row_height = min(0.4, 5.6 / rows_per_slide)
+        bar_height = row_height * 0.6
+
+        def x_for(date):
+            offset = (date - axis_start).days / total_days
+            return chart_left + chart_width * offset
+
+        num_slides = (len(rows) + rows_per_slide - 1) // rows_per_slide
+
+        for slide_num in range(num_slides):
+            slide_rows = rows[slide_num * rows_per_slide:(slide_num + 1) * rows_per_slide]
+
+            layout_idx = 6 if len(self.presentation.slide_layouts) > 6 else 5
+            slide_layout = self.presentation.slide_layouts[layout_idx]
+            slide = self.presentation.slides.add_slide(slide_layout)
+
+            # Title - standardized: Pt(24), left-justified, gray #7F7F7F
+            page_indicator = f" ({slide_num + 1}/{num_slides})" if num_slides > 1 else ""
+            title_box = slide.shapes.add_textbox(
+                Inches(margin), Inches(0.2), Inches(slide_width - 2 * margin), Inches(0.5))
+            title_tf = title_box.text_frame
+            title_tf.paragraphs[0].text = f"{clean_title}{page_indicator}"
+            title_tf.paragraphs[0].font.size = Pt(24)
+            title_tf.paragraphs[0].font.bold = False
+            title_tf.paragraphs[0].font.color.rgb = RGBColor(0x7F, 0x7F, 0x7F)
+
+            # Month header cells and light gridlines
+            grid_height = bars_top - axis_top + row_height * len(slide_rows)
+            for month in months:
+                if month.month == 12:
+                    month_end = month.replace(year=month.year + 1, month=1)
+                else:
+                    month_end = month.replace(month=month.month + 1)
+                left = x_for(month)
+                width = x_for(month_end) - left
+
+                header = slide.shapes.add_shape(
+                    MSO_SHAPE.RECTANGLE, Inches(left), Inches(axis_top),
+                    Inches(width), Inches(axis_height))
+                header.fill.solid()
+                header.fill.fore_color.rgb = RGBColor(0xF3, 0xF4, 0xF6)
+                header.line.color.rgb = RGBColor(0xE5, 0xE7, 0xEB)
+                header_tf = header.text_frame
+                header_tf.margin_left = header_tf.margin_right = Inches(0.01)
+                header_tf.vertical_anchor = MSO_ANCHOR.MIDDLE
+                p = header_tf.paragraphs[0]
+                p.text = month.strftime('%b %y') if width >= 0.45 else month.strftime('%b')[0]
+                p.alignment = PP_ALIGN.CENTER
+                p.font.size = Pt(7)
+                p.font.color.rgb = RGBColor(0x37, 0x41, 0x51)
+
+                gridline = slide.shapes.add_connector(
+                    MSO_CONNECTOR.STRAIGHT, Inches(left), Inches(axis_top + axis_height),
+                    Inches(left), Inches(axis_top + grid_height))
+                gridline.line.color.rgb = RGBColor(0xE5, 0xE7, 0xEB)
+                gridline.line.width = Pt(0.5)
+
+            # Task labels and bars
+            for row_idx, (task, start, finish) in enumerate(slide_rows):
+                row_top = bars_top + row_idx * row_height
+
+                label = slide.shapes.add_textbox(
+                    Inches(margin), Inches(row_top), Inches(label_width - 0.05), Inches(row_height))
+                label_tf = label.text_frame
+                label_tf.word_wrap = True
+                label_tf.margin_top = label_tf.margin_bottom = 0
+                label_tf.vertical_anchor = MSO_ANCHOR.MIDDLE
+                p = label_tf.paragraphs[0]
+                name = str(task.get('Task', 'Untitled'))
+                p.text = name[:45] + ('...' if len(name) > 45 else '')
+                p.font.size = Pt(8)
+                p.font.color.rgb = RGBColor(0x1F, 0x29, 0x37)
+
+                # Guarantee a visible bar for single-day tasks
+                bar_left = x_for(start)
+                bar_width = max(x_for(finish + timedelta(days=1)) - bar_left, 0.06)
+                bar = slide.shapes.add_shape(
+                    MSO_SHAPE.ROUNDED_RECTANGLE,
+                    Inches(bar_left), Inches(row_top + (row_height - bar_height) / 2),
+                    Inches(bar_width), Inches(bar_height))
+                status = str(task.get('Status', 'NOT_STARTED')).upper()
+                bar.fill.solid()
+                bar.fill.fore_color.rgb = status_colors.get(status, status_colors['NOT_STARTED'])
+                bar.line.fill.background()
+                bar.adjustments[0] = 0.2
+                bar.name = f"Gantt: {name[:60]}"
+
+            # Legend
+            legend_top = bars_top + row_height * len(slide_rows) + 0.15
+            legend_left = chart_left
+            for status, color in status_colors.items():
+                swatch = slide.shapes.add_shape(
+                    MSO_SHAPE.RECTANGLE, Inches(legend_left), Inches(legend_top + 0.05),
+                    Inches(0.15), Inches(0.12))
+                swatch.fill.solid()
+                swatch.fill.fore_color.rgb = color
+                swatch.line.fill.background()
+
+                legend_label = slide.shapes.add_textbox(
+                    Inches(legend_left + 0.18), Inches(legend_top), Inches(1.2), Inches(0.22))
+                legend_tf = legend_label.text_frame
+                legend_tf.margin_top = legend_tf.margin_left = 0
+                legend_tf.paragraphs[0].text = status.replace('_', ' ').title()
+                legend_tf.paragraphs[0].font.size = Pt(8)
+                legend_tf.paragraphs[0].font.color.rgb = RGBColor(0x66, 0x66, 0x66)
+                legend_left += 1.4
+
+        return num_slides
+
+    def create_metric_trend_slide(
+        self,
+        metric: Dict[str, Any],
+        title: str = "Metric Trend"
+    ):
+        """Create a slide with a custom metric rendered as a native line chart.
+
+        Uses the metric's named ``series`` when present, otherwise its
+        ``history``. A constant target line is added when the metric has a target.
+
+        Args:
+            metric: Custom metric dictionary as stored by CustomMetricsRepository
+            title: Slide title
+        """
+        from pptx.chart.data import CategoryChartData
+        from pptx.enum.chart import XL_CHART_TYPE, XL_LEGEND_POSITION, XL_MARKER_STYLE
+        from pptx.enum.dml import MSO_LINE_DASH_STYLE
+
+        layout_idx = 6 if len(self.presentation.slide_layouts) > 6 else 5
+        slide_layout = self.presentation.slide_layouts[layout_idx]
+        slide = self.presentation.slides.add_slide(slide_layout)
+
+        slide_width = 10.0
+        margin = 0.25
+
+        # Title - standardized: Pt(24), left-justified, gray #7F7F7F
+        clean_title = title.replace(".xml", "").replace(".xlsx", "").replace(".yaml", "")
+        title_box = slide.shapes.add_textbox(
+            Inches(margin), Inches(0.2), Inches(slide_width - 2 * margin), Inches(0.5))
+        title_tf = title_box.text_frame
+        title_tf.paragraphs[0].text = clean_title
+        title_tf.paragraphs[0].font.size = Pt(24)
+        title_tf.paragraphs[0].font.bold = False
+        title_tf.paragraphs[0].font.color.rgb = RGBColor(0x7F, 0x7F, 0x7F)
+
+        # Collect points per series keyed by day (dates are stored as ISO strings)
+        raw_series = metric.get('series') or {}
+        if not raw_series:
+            raw_series = {metric.get('name', 'Value'): metric.get('history') or []}
+
+        series_points = {}
+        for series_name, points in raw_series.items():
+            values = {}
+            for point in points or []:
+                date = str(point.get('date', ''))[:10]
+                if date:
+                    values[date] = point.get('value')
+            series_points[series_name] = values
+
+        categories = sorted({d for values in series_points.values() for d in values})
+        if not categories:
+            info_box = slide.shapes.add_textbox(
+                Inches(margin), Inches(3.2), Inches(slide_width - 2 * margin), Inches(0.5))
+            info_box.text_frame.paragraphs[0].text = "No data recorded for this metric"
+            info_box.text_frame.paragraphs[0].alignment = PP_ALIGN.CENTER
+            info_box.text_frame.paragraphs[0].font.size = Pt(14)
+            info_box.text_frame.paragraphs[0].font.italic = True
+            info_box.text_frame.paragraphs[0].font.color.rgb = RGBColor(0x9C, 0xA3, 0xAF)
+            return
+
+        chart_data = CategoryChartData()
+        chart_data.categories = categories
+        for series_name, values in series_points.items():
+            chart_data.add_series(series_name, [values.get(d) for d in categories])
+
+        target = metric.get('target')
+        if isinstance(target, (int, float)):
+            chart_data.add_series('Target', [target] * len(categories))
+
+        graphic_frame = slide.shapes.add_chart(
+            XL_CHART_TYPE.LINE_MARKERS,
+            Inches(margin), Inches(0.8),
+            Inches(slide_width - 2 * margin), Inches(6.2),
+            chart_data
+        )
+        chart = graphic_frame.chart
+        chart.has_legend = len(chart.plots[0].series) > 1
+        if chart.has_legend:
+            chart.legend.position = XL_LEGEND_POSITION.BOTTOM
+            chart.legend.include_in_layout = False
+            chart.legend.font.size = Pt(9)
+        chart.category_axis.tick_labels.font.size = Pt(8)
+        chart.value_axis.tick_labels.font.size = Pt(8)
+        chart.value_axis.major_gridlines.format.line.color.rgb = RGBColor(0xE5, 0xE7, 0xEB)
+
+        unit = metric.get('unit')
+        if unit:
+            chart.value_axis.has_title = True
+            chart.value_axis.axis_title.text_frame.text = str(unit)
+            chart.value_axis.axis_title.text_frame.paragraphs[0].font.size = Pt(9)
+
+        for series in chart.plots[0].series:
+            series.smooth = False
+            if series.name == 'Target':
+                series.format.line.dash_style = MSO_LINE_DASH_STYLE.DASH
+                series.format.line.color.rgb = RGBColor(0xDC, 0x26, 0x26)
+                series.marker.style = XL_MARKER_STYLE.NONE
+
+    def create_risk_heatmap_slide(
+        self,
+        aggregates: Dict[str, Any],
+        title: str = "Risk Heat Map"
+    ):
+        """Create a slide with the likelihood x impact matrix as a native table.
+
+        Cells hold risk counts and are colored by the severity their
+        likelihood/impact combination maps to.
+
+        Args:
+            aggregates: RiskRepository.get_aggregates() result
+            title: Slide title
+        """
+        from pptx.enum.text import MSO_ANCHOR
+        from services.chart_formatter import ChartFormatterService
+
+        layout_idx = 6 if len(self.presentation.slide_layouts) > 6 else 5
+        slide_layout = self.presentation.slide_layouts[layout_idx]
+        slide = self.presentation.slides.add_slide(slide_layout)
+
+        slide_width = 10.0
+        margin = 0.25
+
+        # Title - standardized: Pt(24), left-justified, gray #7F7F7F
+        clean_title = title.replace("Risk Heat Map: ", "").replace(".xml", "").replace(".xlsx", "").replace(".yaml", "")
+        title_box = slide.shapes.add_textbox(
+            Inches(margin), Inches(0.2), Inches(slide_width - 2 * margin), Inches(0.5))
+        title_tf = title_box.text_frame
+        title_tf.paragraphs[0].text = f"Type: Project | {clean_title} - Risk Heat Map"
+        title_tf.paragraphs[0].font.size = Pt(24)
+        title_tf.paragraphs[0].font.bold = False
+        title_tf.paragraphs[0].font.color.rgb = RGBColor(0x7F, 0x7F, 0x7F)
+
+        if not aggregates.get('total'):
+            info_box = slide.shapes.add_textbox(
+                Inches(margin), Inches(3.2), Inches(slide_width - 2 * margin), Inches(0.5))
+            info_box.text_frame.paragraphs[0].text = "No risks recorded for this project"
+            info_box.text_frame.paragraphs[0].alignment = PP_ALIGN.CENTER
+            info_box.text_frame.paragraphs[0].font.size = Pt(14)
+            info_box.text_frame.paragraphs[0].font.italic = True
+            info_box.text_frame.paragraphs[0].font.color.rgb = RGBColor(0x9C, 0xA3, 0xAF)
+            return
+
+        severity_colors = {
+            'critical': RGBColor(0xDD, 0xD6, 0xFE),
+            'high': RGBColor(0xFE, 0xCA, 0xCA),
+            'medium': RGBColor(0xFE, 0xF3, 0xC7),
+            'low': RGBColor(0xDC, 0xFC, 0xE7)
+        }
+        label_color = RGBColor(0x6B, 0x72, 0x80)
+        heatmap = ChartFormatterService.format_risk_heatmap(aggregates)
+
+        # Rows: likelihood high -> low, then the impact labels;
+        # columns: likelihood labels, then impact low -> high
+        num_rows = len(heatmap) + 1
+        num_cols = len(heatmap[0]['cells']) + 1
+        label_width, cell_width, cell_height = 1.4, 2.2, 1.35
+        table_width = label_width + cell_width * (num_cols - 1)
+        table_left = (slide_width - table_width) / 2
+        table = slide.shapes.add_table(
+            num_rows, num_cols,
+            Inches(table_left), Inches(1.1),
+            Inches(table_width), Inches(cell_height * (num_rows - 1) + 0.4)
+        ).table
+        table.first_row = False
+        table.horz_banding = False
+        table.columns[0].width = Inches(label_width)
+        for col in range(1, num_cols):
+            table.columns[col].width = Inches(cell_width)
+        for row in range(num_rows - 1):
+            table.rows[row].height = Inches(cell_height)
+        table.rows[num_rows - 1].height = Inches(0.4)
+
+        def fill_cell(cell, text, size, bold, color, background=None):
+            cell.text = text
+            if background is None:
+                cell.fill.background()
+            else:
+                cell.fill.solid()
+                cell.fill.fore_color.rgb = background
+            cell.vertical_anchor = MSO_ANCHOR.MIDDLE
+            para = cell.text_frame.paragraphs[0]
+            para.alignment = PP_ALIGN.CENTER
+            para.font.size = Pt(size)
+            para.font.bold = bold
+            para.font.color.rgb = color
+
+        for row_idx, row in enumerate(heatmap):
+            fill_cell(table.cell(row_idx, 0), f"Likelihood\n{row['likelihood'].upper()}", 10, True, label_color)
+            for col_idx, cell in enumerate(row['cells'], start=1):
+                fill_cell(
+                    table.cell(row_idx, col_idx), str(cell['count']), 28, True,
+                    RGBColor(0x1F, 0x29, 0x37), severity_colors.get(cell['severity'])
+                )
+        fill_cell(table.cell(num_rows - 1, 0), "", 10, True, label_color)
+        for col_idx, cell in enumerate(heatmap[0]['cells'], start=1):
+            fill_cell(table.cell(num_rows - 1, col_idx), f"Impact {cell['impact'].upper()}", 10, True, label_color)
+
+        summary_box = slide.shapes.add_textbox(
+            Inches(margin), Inches(6.6), Inches(slide_width - 2 * margin), Inches(0.4))
+        summary = summary_box.text_frame.paragraphs[0]
+        summary.text = (
+            f"{aggregates['total']} risks \u00b7 {aggregates.get('open', 0)} open "
+            f"\u00b7 {aggregates.get('closed', 0)} closed"
+        )
+        summary.alignment = PP_ALIGN.CENTER
+        summary.font.size = Pt(12)
+        summary.font.color.rgb = label_color
+
     def get_slide_count(self) -> int:
         """Get the number of slides in the presentation."""
         if not self.presentation:
@@ -1341,3 +1839,34 @@ def create_default_template():
 
 # Create default template on module load
 create_default_template()
+
+
+# Shared read-only resources reused by every builder instance
+_shared_image_encoder = ImageEncoder()
+_default_template_bytes: Optional[bytes] = None
+
+
+def _get_default_template_bytes() -> Optional[bytes]:
+    """Default template file contents, read once and shared by all builders."""
+    global _default_template_bytes
+    if _default_template_bytes is None and os.path.exists(PowerPointBuilderService.DEFAULT_TEMPLATE_PATH):
+        with open(PowerPointBuilderService.DEFAULT_TEMPLATE_PATH, 'rb') as f:
+            _default_template_bytes = f.read()
+    return _default_template_bytes
+
+
+@lru_cache(maxsize=1)
+def _get_default_slide_size() -> tuple:
+    """Slide size (EMU) of the default template, parsed once."""
+    default_template = _get_default_template_bytes()
+    prs = Presentation(BytesIO(default_template)) if default_template else Presentation()
+    return (prs.slide_width, prs.slide_height)
+
+
+def create_builder() -> PowerPointBuilderService:
+    """Create a builder for a single export.
+    
+    Builders keep per-presentation state, so concurrent exports must not share
+    one. Immutable resources (default template, image encoder) are shared.
+    """
+    return PowerPointBuilderService(image_encoder=_shared_image_encoder)
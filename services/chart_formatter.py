@@ -166,6 +166,41 @@ class ChartFormatterService:
             'total': sum(counts.values())
         }
     
+    @staticmethod
+    def format_risk_heatmap(aggregates: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Format a likelihood x impact matrix as heat-map rows
+        
+        Args:
+            aggregates: RiskRepository.get_aggregates() result
+        
+        Returns:
+        [
+            {'likelihood': 'high', 'cells': [
+                {'impact': 'low', 'count': 2, 'severity': 'medium'}, ...
+            ]},
+            ...  # high likelihood first, impact low -> high
+        ]
+        """
+        from services.risk_parser import RiskParser
+        
+        levels = aggregates.get('matrix_levels', RiskParser.LEVELS)
+        matrix = aggregates.get('matrix') or [[0] * len(levels) for _ in levels]
+        return [
+            {
+                'likelihood': likelihood,
+                'cells': [
+                    {
+                        'impact': impact,
+                        'count': matrix[row][col],
+                        'severity': RiskParser.calculate_severity(likelihood, impact)
+                    }
+                    for col, impact in enumerate(levels)
+                ]
+            }
+            for row, likelihood in reversed(list(enumerate(levels)))
+        ]
+    
     @staticmethod
     def format_change_data(projects: List[Project]) -> List[Dict[str, Any]]:
         """
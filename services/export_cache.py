@@ -0,0 +1,157 @@
+"""
+Export Cache Service
+Bounded directory for generated decks. Builds write to a temporary file in
+the cache that is renamed into place when complete; old and least recently
+downloaded exports are evicted to keep the directory within size and age limits.
+"""
+from pathlib import Path
+from typing import Dict, Optional
+import logging
+import os
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+PARTIAL_SUFFIX = ".partial"
+
+
+class ExportCache:
+    """Size- and age-bounded LRU directory of exported files."""
+
+    def __init__(
+        self,
+        directory: Path,
+        max_bytes: Optional[int] = None,
+        max_age_seconds: Optional[int] = None
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            directory: Directory exports are stored in
+            max_bytes: Total size kept on disk
+                (EXPORT_CACHE_MAX_MB, default 500)
+            max_age_seconds: Exports not downloaded for this long are removed
+                (EXPORT_CACHE_MAX_AGE_SECONDS, default 86400)
+        """
+        if max_bytes is None:
+            max_bytes = int(os.getenv("EXPORT_CACHE_MAX_MB", "500")) * 1024 * 1024
+        if max_age_seconds is None:
+            max_age_seconds = int(os.getenv("EXPORT_CACHE_MAX_AGE_SECONDS", "86400"))
+
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def reserve(self, filename: str) -> Path:
+        """
+        Get a temporary path to build an export into.
+
+        Args:
+            filename: Final filename of the export
+
+        Returns:
+            Path to write to; pass it to commit() once the file is complete
+        """
+        return self.directory / f".{Path(filename).name}.{uuid.uuid4().hex[:8]}{PARTIAL_SUFFIX}"
+
+    def commit(self, temp_path: Path, filename: str) -> Path:
+        """
+        Move a finished export into place and enforce the cache limits.
+
+        Returns:
+            Final path of the export
+        """
+        final_path = self.directory / Path(filename).name
+        os.replace(temp_path, final_path)
+        self.enforce_limits(keep=final_path)
+        return final_path
+
+    def discard(self, temp_path: Path):
+        """Remove a temporary file left by a failed or cancelled build."""
+        try:
+            Path(temp_path).unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning(f"Could not remove partial export {temp_path}: {e}")
+
+    def touch(self, path: Path):
+        """Mark an export as recently used (mtime is the LRU clock)."""
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def enforce_limits(self, keep: Optional[Path] = None) -> int:
+        """
+        Evict expired exports, then least recently used ones until the
+        directory fits in max_bytes.
+
+        Args:
+            keep: Export that must survive (the one just written)
+
+        Returns:
+            Number of files removed
+        """
+        with self._lock:
+            now = time.time()
+            entries = []
+            for path in self.directory.iterdir():
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                if not path.is_file():
+                    continue
+                if path.name.endswith(PARTIAL_SUFFIX):
+                    # Builds in progress are only removed once clearly abandoned
+                    if now - stat.st_mtime > self.max_age_seconds:
+                        self._remove(path)
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+            removed = 0
+            kept = []
+            for mtime, size, path in entries:
+                if path != keep and self.max_age_seconds and now - mtime > self.max_age_seconds:
+                    removed += self._remove(path)
+                else:
+                    kept.append((mtime, size, path))
+
+            total = sum(size for _, size, _ in kept)
+            for mtime, size, path in sorted(kept, key=lambda e: e[0]):
+                if not self.max_bytes or total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                removed += self._remove(path)
+                total -= size
+
+            self.evictions += removed
+            if removed:
+                logger.info(f"🧹 Evicted {removed} cached exports ({total / 1024 / 1024:.1f}MB kept)")
+            return removed
+
+    def get_stats(self) -> Dict[str, int]:
+        """File count, size on disk and eviction counter."""
+        files = [p for p in self.directory.iterdir()
+                 if p.is_file() and not p.name.endswith(PARTIAL_SUFFIX)]
+        return {
+            "files": len(files),
+            "bytes": sum(p.stat().st_size for p in files),
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+        }
+
+    def _remove(self, path: Path) -> int:
+        """Delete a file; returns 1 if it was removed."""
+        try:
+            path.unlink()
+            return 1
+        except OSError as e:
+            logger.warning(f"Could not evict export {path}: {e}")
+            return 0
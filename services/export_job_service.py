@@ -0,0 +1,260 @@
+"""
+Export Job Service
+Runs PowerPoint exports as background jobs with a bounded worker pool,
+per-user concurrency limits, progress tracking, cancellation and TTL cleanup.
+Jobs that produce no file (risk imports) report a result dict instead.
+"""
+import asyncio
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Union
+import json
+import logging
+import os
+import uuid
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[[str, int, int], None]
+
+
+class JobLimitExceeded(Exception):
+    """Raised when a user already has the maximum number of active jobs."""
+
+
+class ExportJobManager:
+    """Queue and track export jobs in a shared jobs dict."""
+
+    TERMINAL_STATES = {"completed", "failed", "cancelled"}
+
+    def __init__(
+        self,
+        jobs: Dict[str, Dict[str, Any]],
+        max_workers: Optional[int] = None,
+        max_jobs_per_user: Optional[int] = None,
+        ttl_seconds: Optional[int] = None,
+        kind: str = "export"
+    ):
+        """
+        Initialize the job manager.
+
+        Args:
+            jobs: Dict the job records are stored in (keyed by job id)
+            max_workers: Jobs running at once (EXPORT_MAX_WORKERS, default 2)
+            max_jobs_per_user: Queued + running jobs allowed per user
+                (EXPORT_MAX_JOBS_PER_USER, default 2)
+            ttl_seconds: How long finished jobs and their files are kept
+                (EXPORT_JOB_TTL_SECONDS, default 3600)
+            kind: What the jobs do, for log messages
+        """
+        self.jobs = jobs
+        self.kind = kind
+        self.max_workers = max_workers or int(os.getenv("EXPORT_MAX_WORKERS", "2"))
+        self.max_jobs_per_user = max_jobs_per_user or int(os.getenv("EXPORT_MAX_JOBS_PER_USER", "2"))
+        self.ttl = timedelta(seconds=ttl_seconds or int(os.getenv("EXPORT_JOB_TTL_SECONDS", "3600")))
+
+        self._semaphore = asyncio.Semaphore(self.max_workers)
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._cleanup_task: Optional[asyncio.Task] = None
+
+    def submit(
+        self,
+        user_id: str,
+        runner: Callable[[str, ProgressCallback], Awaitable[Union[Path, Dict[str, Any]]]],
+        total: int = 0
+    ) -> Dict[str, Any]:
+        """
+        Queue a job; must be called from the running event loop.
+
+        Args:
+            user_id: Owner of the job
+            runner: Coroutine function(job_id, progress) that produces the
+                file, or returns a result dict for jobs without one
+            total: Expected number of progress steps (slides); the runner's
+                progress calls replace it once the real count is known
+
+        Returns:
+            Public view of the new job
+
+        Raises:
+            JobLimitExceeded: If the user has too many active jobs
+        """
+        self.cleanup_expired()
+
+        active = [j for j in self.list_jobs(user_id) if j["status"] not in self.TERMINAL_STATES]
+        if len(active) >= self.max_jobs_per_user:
+            raise JobLimitExceeded(
+                f"Maximum of {self.max_jobs_per_user} concurrent exports reached"
+            )
+
+        job_id = uuid.uuid4().hex
+        now = datetime.now()
+        self.jobs[job_id] = {
+            "job_id": job_id,
+            "user_id": user_id,
+            "status": "queued",
+            "stage": "queued",
+            "current": 0,
+            "total": total,
+            "created_at": now,
+            "updated_at": now,
+            "finished_at": None,
+            "filename": None,
+            "path": None,
+            "result": None,
+            "error": None,
+            "version": 0,
+        }
+        self._tasks[job_id] = asyncio.create_task(self._run(job_id, runner))
+        logger.info(f"📥 Queued {self.kind} job {job_id} for {user_id}")
+        return self.public_view(self.jobs[job_id])
+
+    async def _run(
+        self,
+        job_id: str,
+        runner: Callable[[str, ProgressCallback], Awaitable[Union[Path, Dict[str, Any]]]]
+    ):
+        """Run a job once a worker slot is free and record the outcome."""
+        job = self.jobs[job_id]
+
+        def progress(stage: str, current: int, total: int):
+            self._update(job, stage=stage, current=current, total=total)
+
+        try:
+            async with self._semaphore:
+                self._update(job, status="running", stage="starting")
+                outcome = await runner(job_id, progress)
+            if isinstance(outcome, dict):
+                output = {"result": outcome}
+            else:
+                output = {"path": str(outcome), "filename": Path(outcome).name}
+            self._update(
+                job,
+                status="completed",
+                stage="completed",
+                current=job["total"],
+                finished_at=datetime.now(),
+                **output
+            )
+            logger.info(f"✅ {self.kind.capitalize()} job {job_id} completed: {output.get('path', 'no file')}")
+        except asyncio.CancelledError:
+            self._update(job, status="cancelled", stage="cancelled", finished_at=datetime.now())
+            logger.info(f"🛑 {self.kind.capitalize()} job {job_id} cancelled")
+        except Exception as e:
+            self._update(job, status="failed", stage="failed", error=str(e),
+                         finished_at=datetime.now())
+            logger.error(f"❌ {self.kind.capitalize()} job {job_id} failed: {e}", exc_info=True)
+        finally:
+            self._tasks.pop(job_id, None)
+
+    def _update(self, job: Dict[str, Any], **changes):
+        """Apply changes to a job and bump its version for event streams."""
+        job.update(changes)
+        job["updated_at"] = datetime.now()
+        job["version"] += 1
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job record by id."""
+        return self.jobs.get(job_id)
+
+    def list_jobs(self, user_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """List job records, optionally only those owned by user_id."""
+        return [
+            job for job in self.jobs.values()
+            if user_id is None or job["user_id"] == user_id
+        ]
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a queued or running job.
+
+        Returns:
+            True if a cancellation was requested, False if already finished
+        """
+        task = self._tasks.get(job_id)
+        if task is None or task.done():
+            return False
+        task.cancel()
+        return True
+
+    def remove(self, job_id: str):
+        """Drop a finished job and delete its file."""
+        job = self.jobs.pop(job_id, None)
+        if job and job.get("path"):
+            try:
+                Path(job["path"]).unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning(f"Could not delete export {job['path']}: {e}")
+
+    def cleanup_expired(self) -> int:
+        """
+        Remove finished jobs (and files) older than the TTL.
+
+        Returns:
+            Number of jobs removed
+        """
+        cutoff = datetime.now() - self.ttl
+        expired = [
+            job_id for job_id, job in self.jobs.items()
+            if job["status"] in self.TERMINAL_STATES
+            and job["finished_at"] and job["finished_at"] < cutoff
+        ]
+        for job_id in expired:
+            self.remove(job_id)
+        if expired:
+            logger.info(f"🧹 Removed {len(expired)} expired {self.kind} jobs")
+        return len(expired)
+
+    def start_cleanup(self, interval_seconds: int = 300):
+        """Start periodic TTL cleanup (called from app startup)."""
+        async def _loop():
+            while True:
+                await asyncio.sleep(interval_seconds)
+                try:
+                    self.cleanup_expired()
+                except Exception as e:
+                    logger.warning(f"{self.kind.capitalize()} job cleanup failed: {e}")
+
+        if self._cleanup_task is None or self._cleanup_task.done():
+            self._cleanup_task = asyncio.create_task(_loop())
+
+    async def shutdown(self):
+        """Cancel running jobs and the cleanup loop (app shutdown)."""
+        tasks = list(self._tasks.values())
+        if self._cleanup_task:
+            tasks.append(self._cleanup_task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def events(self, job_id: str, poll_interval: float = 0.25) -> AsyncIterator[str]:
+        """Yield Server-Sent Events for a job until it reaches a final state."""
+        last_version = -1
+        while True:
+            job = self.jobs.get(job_id)
+            if job is None:
+                yield "event: error\ndata: {\"detail\": \"Job not found\"}\n\n"
+                return
+            if job["version"] != last_version:
+                last_version = job["version"]
+                yield f"event: progress\ndata: {json.dumps(self.public_view(job))}\n\n"
+            if job["status"] in self.TERMINAL_STATES:
+                return
+            await asyncio.sleep(poll_interval)
+
+    @staticmethod
+    def public_view(job: Dict[str, Any]) -> Dict[str, Any]:
+        """Job fields safe to return to clients."""
+        return {
+            "job_id": job["job_id"],
+            "status": job["status"],
+            "stage": job["stage"],
+            "current": job["current"],
+            "total": job["total"],
+            "filename": job["filename"],
+            "result": job["result"],
+            "error": job["error"],
+            "created_at": job["created_at"].isoformat(),
+            "updated_at": job["updated_at"].isoformat(),
+            "finished_at": job["finished_at"].isoformat() if job["finished_at"] else None,
+        }
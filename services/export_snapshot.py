@@ -0,0 +1,161 @@
+"""
+Export Snapshot Service
+Loads the project, risks, changes and custom metrics once at the start of an
+export. Native slide builders read from the snapshot, and dashboard pages
+rendered for the export's screenshots are served from it through the
+X-Export-Snapshot header, so the whole deck reflects one consistent state.
+"""
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import logging
+import os
+import threading
+import uuid
+
+from repositories.project_repository import ProjectRepository
+from repositories.custom_metrics_repository import CustomMetricsRepository
+from services.slide_cache import hash_data
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_HEADER = "X-Export-Snapshot"
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+class ExportSnapshot:
+    """Data an export reads, captured at one point in time."""
+
+    def __init__(
+        self,
+        user_id: Optional[str],
+        projects: List[Any],
+        project: Optional[Any],
+        risks: List[Dict[str, Any]],
+        metrics: List[Dict[str, Any]],
+        risk_aggregates: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Initialize the snapshot.
+
+        Args:
+            user_id: User the data was loaded for
+            projects: All projects visible to the user
+            project: The exported project (None if not found)
+            risks: The project's risk register
+            metrics: The project's custom metrics
+            risk_aggregates: Precomputed counts of the risk register
+                (heat map), None if it has no risks
+        """
+        self.user_id = user_id
+        self.projects = projects
+        self.project = project
+        self.risks = risks
+        self.metrics = metrics
+        self.risk_aggregates = risk_aggregates
+        self._version: Optional[str] = None
+
+    @property
+    def milestones(self) -> List[Any]:
+        return (self.project.milestones or []) if self.project else []
+
+    @property
+    def changes(self) -> List[Any]:
+        return (self.project.changes or []) if self.project else []
+
+    @property
+    def version(self) -> str:
+        """Content hash of the snapshot (the export's data version)."""
+        if self._version is None:
+            self._version = hash_data(
+                self.project.dict() if self.project else None, self.risks, self.metrics
+            )
+        return self._version
+
+    def get_metric(self, name: str) -> Optional[Dict[str, Any]]:
+        """Find a custom metric by name."""
+        for metric in self.metrics:
+            if metric.get('name') == name:
+                return metric
+        return None
+
+
+def load_export_snapshot(
+    project_name: str,
+    clean_name: str,
+    risk_repo,
+    user_id: Optional[str] = None,
+    is_admin: bool = False
+) -> ExportSnapshot:
+    """
+    Load everything an export needs in one pass.
+
+    Args:
+        project_name: Project as named in the export request
+        clean_name: Project name without extension/version suffix
+        risk_repo: RiskRepository to read the risk register from
+        user_id: Exporting user (projects are scoped like the dashboard)
+        is_admin: Whether the user sees all projects
+
+    Returns:
+        ExportSnapshot
+    """
+    data_dir = Path(os.getenv("DATA_STORAGE_PATH", str(BASE_DIR / "mock_data")))
+    projects = ProjectRepository(data_dir, user_id=user_id, is_admin=is_admin).load_all_projects()
+
+    project = None
+    for proj in projects:
+        if (clean_name.lower() in proj.project_name.lower() or
+                clean_name.lower() in proj.project_code.lower()):
+            project = proj
+            break
+
+    metrics_dir = Path(os.getenv("DATA_STORAGE_PATH", str(BASE_DIR / "data"))) / "custom_metrics"
+    metrics = CustomMetricsRepository(storage_dir=metrics_dir).load_metrics(project_name)
+
+    snapshot = ExportSnapshot(
+        user_id=user_id,
+        projects=projects,
+        project=project,
+        risks=risk_repo.load_risks(project_name) or [],
+        metrics=metrics,
+        risk_aggregates=risk_repo.get_aggregates(project_name)
+    )
+    logger.info(
+        f"📸 Export snapshot for {project_name}: {len(projects)} projects, "
+        f"{len(snapshot.milestones)} milestones, {len(snapshot.risks)} risks, "
+        f"{len(snapshot.changes)} changes, {len(metrics)} metrics"
+    )
+    return snapshot
+
+
+class SnapshotRegistry:
+    """Snapshots of running exports, looked up by an unguessable token."""
+
+    def __init__(self):
+        self._snapshots: Dict[str, ExportSnapshot] = {}
+        self._lock = threading.Lock()
+
+    def register(self, snapshot: ExportSnapshot) -> str:
+        """Make a snapshot available to in-process renders; returns its token."""
+        token = uuid.uuid4().hex
+        with self._lock:
+            self._snapshots[token] = snapshot
+        return token
+
+    def get(self, token: str, user_id: Optional[str]) -> Optional[ExportSnapshot]:
+        """Get a snapshot, only for the user it was loaded for."""
+        with self._lock:
+            snapshot = self._snapshots.get(token)
+        if snapshot is None or snapshot.user_id != user_id:
+            return None
+        return snapshot
+
+    def release(self, token: str):
+        """Forget a snapshot once its export has finished."""
+        with self._lock:
+            self._snapshots.pop(token, None)
+
+
+# Shared by the export router and the project context helpers
+export_snapshots = SnapshotRegistry()
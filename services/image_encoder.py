@@ -0,0 +1,177 @@
+"""
+Image Encoder Service
+Encodes captured screenshots for slides: crop/fit to the slide's target size
+in a single decode, pick an output format and respect a per-slide byte budget.
+"""
+from io import BytesIO
+from typing import Any, Dict, Optional, Tuple
+import logging
+import os
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+
+class ImageEncoder:
+    """Encode slide images as palette PNG (charts) or JPEG (photo-like)."""
+
+    # Formats python-pptx can embed; PowerPoint parts have no WebP support
+    FORMATS = ('auto', 'png', 'jpeg')
+
+    # Distinct colors in a 128x128 sample below which an image is treated
+    # as a chart/diagram rather than photo-like content
+    GRAPHIC_COLOR_THRESHOLD = 2048
+    MIN_QUALITY = 45
+    MIN_DIMENSION = 320
+
+    def __init__(
+        self,
+        output_format: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        quality: int = 85,
+        palette_colors: int = 256
+    ):
+        """
+        Initialize the encoder.
+
+        Args:
+            output_format: 'auto', 'png' or 'jpeg'. Defaults to
+                SCREENSHOT_IMAGE_FORMAT or 'auto'.
+            max_bytes: Per-image byte budget. Defaults to
+                SCREENSHOT_MAX_IMAGE_BYTES; None/0 disables the budget.
+            quality: Starting JPEG quality
+            palette_colors: Palette size for quantized PNGs
+
+        Raises:
+            ValueError: If WebP is configured - slides cannot embed it
+        """
+        if output_format is None:
+            output_format = os.getenv("SCREENSHOT_IMAGE_FORMAT", "auto")
+        output_format = output_format.lower().replace('jpg', 'jpeg')
+        if output_format == 'webp':
+            raise ValueError(
+                "WebP images cannot be embedded in PowerPoint slides; "
+                "use 'auto', 'png' or 'jpeg' for SCREENSHOT_IMAGE_FORMAT"
+            )
+        if output_format not in self.FORMATS:
+            logger.warning(f"Unknown image format '{output_format}', using auto")
+            output_format = 'auto'
+        self.output_format = output_format
+
+        if max_bytes is None:
+            max_bytes = int(os.getenv("SCREENSHOT_MAX_IMAGE_BYTES", "0") or 0)
+        self.max_bytes = max_bytes or None
+
+        self.quality = quality
+        self.palette_colors = palette_colors
+
+    def encode(
+        self,
+        image_bytes: bytes,
+        max_size: Optional[Tuple[int, int]] = None,
+        transform: Optional[Dict[str, Any]] = None
+    ) -> bytes:
+        """
+        Decode once, apply crop/scale, fit to max_size and encode.
+
+        Args:
+            image_bytes: Source image (typically a Playwright PNG)
+            max_size: (width, height) the image is downscaled to fit;
+                images are never upscaled
+            transform: Optional crop/scale dict (cropTop, cropBottom,
+                cropLeft, cropRight as percentages, scale)
+
+        Returns:
+            Encoded image bytes
+        """
+        img = Image.open(BytesIO(image_bytes))
+        img.load()
+
+        if transform:
+            img = self._apply_transform(img, transform)
+
+        if max_size and (img.width > max_size[0] or img.height > max_size[1]):
+            img.thumbnail(max_size, Image.Resampling.LANCZOS)
+
+        # Flatten transparency onto white - slides and JPEG have no alpha
+        if img.mode in ('RGBA', 'LA', 'P'):
+            background = Image.new('RGB', img.size, (255, 255, 255))
+            rgba = img.convert('RGBA')
+            background.paste(rgba, mask=rgba.split()[-1])
+            img = background
+        elif img.mode != 'RGB':
+            img = img.convert('RGB')
+
+        fmt = self._choose_format(img)
+        quality = self.quality
+        colors = self.palette_colors
+        data = self._encode_as(img, fmt, quality, colors)
+
+        # Walk quality/palette down first, then dimensions, until within budget
+        while self.max_bytes and len(data) > self.max_bytes:
+            if fmt == 'jpeg' and quality > self.MIN_QUALITY:
+                quality -= 10
+            elif fmt == 'png' and colors > 32:
+                colors //= 2
+            elif min(img.size) > self.MIN_DIMENSION:
+                img = img.resize(
+                    (int(img.width * 0.8), int(img.height * 0.8)),
+                    Image.Resampling.LANCZOS
+                )
+            else:
+                logger.warning(
+                    f"Image still {len(data)} bytes, over budget of {self.max_bytes}"
+                )
+                break
+            data = self._encode_as(img, fmt, quality, colors)
+
+        return data
+
+    def _apply_transform(self, img: Image.Image, transform: Dict[str, Any]) -> Image.Image:
+        """Apply percentage crop and scale factor from a slide transform."""
+        crop_top = transform.get('cropTop', 0) / 100
+        crop_bottom = transform.get('cropBottom', 0) / 100
+        crop_left = transform.get('cropLeft', 0) / 100
+        crop_right = transform.get('cropRight', 0) / 100
+
+        if any([crop_top, crop_bottom, crop_left, crop_right]):
+            width, height = img.size
+            img = img.crop((
+                int(width * crop_left),
+                int(height * crop_top),
+                int(width * (1 - crop_right)),
+                int(height * (1 - crop_bottom))
+            ))
+
+        scale = transform.get('scale', 1.0)
+        if scale != 1.0 and scale > 0:
+            img = img.resize(
+                (int(img.width * scale), int(img.height * scale)),
+                Image.Resampling.LANCZOS
+            )
+        return img
+
+    def _choose_format(self, img: Image.Image) -> str:
+        """Resolve 'auto' by sampling the color count of the image."""
+        fmt = self.output_format
+        if fmt == 'auto':
+            sample = img.resize((128, 128), Image.Resampling.NEAREST)
+            colors = sample.getcolors(maxcolors=self.GRAPHIC_COLOR_THRESHOLD)
+            fmt = 'png' if colors is not None else 'jpeg'
+        return fmt
+
+    def _encode_as(self, img: Image.Image, fmt: str, quality: int, colors: int) -> bytes:
+        """Encode an RGB image in the given format."""
+        output = BytesIO()
+        if fmt == 'png':
+            quantized = img.quantize(
+                colors=colors,
+                method=Image.Quantize.MEDIANCUT,
+                dither=Image.Dither.NONE
+            )
+            quantized.save(output, format='PNG', optimize=True)
+        else:
+            img.save(output, format='JPEG', quality=quality,
+                     optimize=True, progressive=True)
+        return output.getvalue()
@@ -233,7 +233,48 @@ class MetricsCalculator:
         Returns:
             Dictionary with risk_score (1-100) and risk_distribution
         """
-        if not risks:
+        return self.calculate_risk_metrics_from_summaries([self.summarize_risks(risks)])
+    
+    @staticmethod
+    def summarize_risks(risks: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Count risks the way the risk manifest does.
+        
+        Args:
+            risks: List of normalized risk dictionaries
+            
+        Returns:
+            Dictionary with risk_count, severity_counts and status_counts
+        """
+        severity_counts = {'critical': 0, 'high': 0, 'medium': 0, 'low': 0}
+        status_counts: Dict[str, int] = {}
+        
+        for risk in risks:
+            severity = risk.get('severity_normalized', 'medium')
+            if severity in severity_counts:
+                severity_counts[severity] += 1
+            status = str(risk.get('status') or 'open').lower()
+            status_counts[status] = status_counts.get(status, 0) + 1
+        
+        return {
+            'risk_count': len(risks),
+            'severity_counts': severity_counts,
+            'status_counts': status_counts
+        }
+    
+    def calculate_risk_metrics_from_summaries(self, summaries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Calculate risk score and distribution from risk counts (risk manifest
+        entries or summarize_risks() results), without the risks themselves.
+        
+        Args:
+            summaries: Dicts with risk_count, severity_counts and status_counts
+            
+        Returns:
+            Dictionary with risk_score (1-100) and risk_distribution
+        """
+        total = sum(summary['risk_count'] for summary in summaries)
+        if not total:
             return {
                 'risk_score': 0,
                 'risk_distribution': {
@@ -252,24 +293,27 @@ class MetricsCalculator:
             'medium': 0,
             'low': 0
         }
+        status_counts: Dict[str, int] = {}
         
-        for risk in risks:
-            severity = risk.get('severity_normalized', 'medium')
-            if severity in distribution:
-                distribution[severity] += 1
+        for summary in summaries:
+            for severity, count in summary['severity_counts'].items():
+                if severity in distribution:
+                    distribution[severity] += count
+            for status, count in summary.get('status_counts', {}).items():
+                status_counts[status] = status_counts.get(status, 0) + count
         
         # Calculate overall risk score (0-100 scale)
         # Weight: critical=100, high=75, medium=50, low=25
         weights = {'critical': 100, 'high': 75, 'medium': 50, 'low': 25}
         total_score = sum(distribution[sev] * weights[sev] for sev in distribution)
-        max_score = len(risks) * 100  # If all risks were critical
+        max_score = total * 100  # If all risks were critical
         
         risk_score = round((total_score / max_score) * 100) if max_score > 0 else 0
         
         return {
             'risk_score': risk_score,
             'risk_distribution': distribution,
-            'total_risks': len(risks),
-            'open_risks': sum(1 for r in risks if r.get('status', 'open').lower() == 'open'),
-            'closed_risks': sum(1 for r in risks if r.get('status', 'open').lower() == 'closed')
+            'total_risks': total,
+            'open_risks': status_counts.get('open', 0),
+            'closed_risks': status_counts.get('closed', 0)
         }
@@ -3,6 +3,7 @@ Risk Parser Service
 Parses risk data from YAML and Excel (XLSX) files into normalized format.
 """
 import yaml
+import numpy as np
 import pandas as pd
 from typing import List, Dict, Any, Optional
 from datetime import datetime
@@ -26,6 +27,16 @@ class RiskParser:
         ('low', 'low'): 'low',
     }
     
+    # Common variations of each likelihood/impact level
+    LEVEL_ALIASES = {
+        'h': 'high', 'high': 'high', '3': 'high', 'critical': 'high',
+        'm': 'medium', 'medium': 'medium', '2': 'medium', 'moderate': 'medium',
+        'l': 'low', 'low': 'low', '1': 'low', 'minor': 'low',
+    }
+    
+    # Category order of normalized levels
+    LEVELS = ['low', 'medium', 'high']
+    
     @staticmethod
     def normalize_level(level: str) -> str:
         """Normalize likelihood/impact levels to lowercase standard values."""
@@ -34,15 +45,8 @@ class RiskParser:
         
         level_lower = str(level).lower().strip()
         
-        # Map common variations
-        if level_lower in ['h', 'high', '3', 'critical']:
-            return 'high'
-        elif level_lower in ['m', 'medium', '2', 'moderate']:
-            return 'medium'
-        elif level_lower in ['l', 'low', '1', 'minor']:
-            return 'low'
-        else:
-            return 'medium'  # Default to medium if unknown
+        # Map common variations, default to medium if unknown
+        return RiskParser.LEVEL_ALIASES.get(level_lower, 'medium')
     
     @staticmethod
     def calculate_severity(likelihood: str, impact: str) -> str:
@@ -56,17 +60,23 @@ class RiskParser:
         )
     
     @staticmethod
-    def ensure_unique_ids(risks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def ensure_unique_ids(
+        risks: List[Dict[str, Any]],
+        seen_ids: Optional[set] = None
+    ) -> List[Dict[str, Any]]:
         """
         Ensure all risk IDs are unique. Auto-generate new IDs for duplicates.
         
         Args:
             risks: List of risk dictionaries
+            seen_ids: IDs already used by earlier chunks of the same file
+                (updated in place)
             
         Returns:
             List of risks with unique IDs
         """
-        seen_ids = set()
+        if seen_ids is None:
+            seen_ids = set()
         unique_risks = []
         counter = 1
         
@@ -162,6 +172,179 @@ class RiskParser:
         except Exception as e:
             raise ValueError(f"Error parsing YAML: {str(e)}")
     
+    @staticmethod
+    def map_columns(columns) -> Dict[str, str]:
+        """
+        Match spreadsheet headers to risk fields (flexible, case-insensitive).
+
+        Args:
+            columns: Lowercased, stripped column names
+
+        Returns:
+            Dict of risk field -> column name (later columns win)
+        """
+        column_map = {}
+        for col in columns:
+            if 'id' in col:
+                column_map['id'] = col
+            elif 'title' in col or 'name' in col or 'risk' in col:
+                column_map['title'] = col
+            elif 'desc' in col:
+                column_map['description'] = col
+            elif 'likelihood' in col or 'probability' in col:
+                column_map['likelihood'] = col
+            elif 'impact' in col or 'consequence' in col:
+                column_map['impact'] = col
+            elif 'mitigation' in col or 'response' in col or 'action' in col:
+                column_map['mitigations'] = col
+            elif 'owner' in col or 'assigned' in col:
+                column_map['owner'] = col
+            elif 'date' in col or 'identified' in col:
+                column_map['date_identified'] = col
+            elif 'status' in col:
+                column_map['status'] = col
+            elif 'category' in col or 'type' in col:
+                column_map['category'] = col
+            elif 'project' in col:
+                column_map['project'] = col
+        return column_map
+
+    @staticmethod
+    def _text_column(df: pd.DataFrame, column: Optional[str], default: str) -> pd.Series:
+        """Column as str, with empty cells (or a missing column) set to default."""
+        if column is None:
+            return pd.Series(default, index=df.index, dtype=object)
+        values = df[column]
+        return values.astype(object).astype(str).where(values.notna(), default)
+
+    @staticmethod
+    def _level_column(df: pd.DataFrame, column: Optional[str]) -> pd.Categorical:
+        """Likelihood/impact column normalized like normalize_level()."""
+        if column is None:
+            levels = pd.Series('medium', index=df.index)
+        else:
+            levels = (
+                df[column].astype(object).astype(str)
+                .str.lower().str.strip()
+                .map(RiskParser.LEVEL_ALIASES)
+                .fillna('medium')
+            )
+        return pd.Categorical(levels, categories=RiskParser.LEVELS)
+
+    @staticmethod
+    def _date_column(df: pd.DataFrame, column: Optional[str]) -> pd.Series:
+        """Dates as ISO strings; empty or unparseable cells get the import time."""
+        now = datetime.now().isoformat()
+        if column is None:
+            return pd.Series(now, index=df.index, dtype=object)
+
+        values = df[column]
+        if pd.api.types.is_datetime64_any_dtype(values):
+            parsed = values
+        elif pd.api.types.is_numeric_dtype(values):
+            parsed = pd.to_datetime(values, errors='coerce')
+        else:
+            try:
+                parsed = pd.to_datetime(values, errors='coerce', format='mixed')
+            except (TypeError, ValueError):
+                # e.g. mixed timezones, which cannot share one column
+                parsed = values.map(RiskParser._parse_date, na_action='ignore')
+
+        if isinstance(parsed.dtype, pd.DatetimeTZDtype) or not pd.api.types.is_datetime64_any_dtype(parsed):
+            dates = parsed.map(lambda ts: ts.isoformat() if pd.notna(ts) else None)
+        elif (((parsed.dt.microsecond == 0) & (parsed.dt.nanosecond == 0)) | parsed.isna()).all():
+            dates = parsed.dt.strftime('%Y-%m-%dT%H:%M:%S')
+        else:
+            dates = parsed.map(lambda ts: ts.isoformat(), na_action='ignore')
+        return dates.astype(object).where(dates.notna(), now)
+
+    @staticmethod
+    def _parse_date(value) -> Optional[pd.Timestamp]:
+        """Parse a single date cell, None if it is not a date."""
+        try:
+            return pd.to_datetime(value)
+        except (TypeError, ValueError, OverflowError):
+            return None
+
+    @staticmethod
+    def normalize_frame(df: pd.DataFrame, source: str) -> List[Dict[str, Any]]:
+        """
+        Normalize a spreadsheet of risks column-wise.
+
+        Args:
+            df: Raw sheet as read by pandas (default RangeIndex)
+            source: "Excel" or "CSV", used in error messages
+
+        Returns:
+            List of normalized risk dictionaries with unique IDs
+        """
+        df.columns = df.columns.str.strip().str.lower()
+        column_map = RiskParser.map_columns(df.columns)
+
+        if 'title' not in column_map:
+            raise ValueError(f"{source} must have a Title/Name/Risk column")
+
+        normalized_risks = RiskParser.frame_to_risks(df, column_map)
+
+        if not normalized_risks:
+            raise ValueError(f"No valid risks found in {source} file")
+
+        # Ensure all IDs are unique
+        return RiskParser.ensure_unique_ids(normalized_risks)
+
+    @staticmethod
+    def frame_to_risks(df: pd.DataFrame, column_map: Dict[str, str]) -> List[Dict[str, Any]]:
+        """
+        Normalize the rows of a (chunk of a) risk sheet, without the
+        uniqueness pass.
+
+        Args:
+            df: Rows with lowercased column names; the index is the data row
+                number used for generated IDs
+            column_map: Result of map_columns() (must contain 'title')
+
+        Returns:
+            List of normalized risk dictionaries
+        """
+        # Skip empty rows
+        df = df[df[column_map['title']].notna()]
+
+        # IDs default to the row number
+        risk_ids = 'R' + pd.Series(df.index + 1, index=df.index).astype(str).str.zfill(3)
+        if 'id' in column_map:
+            id_values = df[column_map['id']]
+            risk_ids = id_values.astype(object).astype(str).where(id_values.notna(), risk_ids)
+
+        # Severity from SEVERITY_MATRIX laid out as a grid indexed by the
+        # likelihood x impact category codes
+        likelihood = RiskParser._level_column(df, column_map.get('likelihood'))
+        impact = RiskParser._level_column(df, column_map.get('impact'))
+        severity_table = np.array(
+            [[RiskParser.SEVERITY_MATRIX[(l, i)] for i in RiskParser.LEVELS] for l in RiskParser.LEVELS],
+            dtype=object
+        )
+        severity = severity_table[likelihood.codes, impact.codes]
+
+        columns = {
+            'id': risk_ids,
+            'title': RiskParser._text_column(df, column_map['title'], 'Untitled Risk'),
+            'description': RiskParser._text_column(df, column_map.get('description'), ''),
+            'likelihood': likelihood.astype(object),
+            'impact': impact.astype(object),
+            'severity_normalized': severity,
+            'mitigations': RiskParser._text_column(df, column_map.get('mitigations'), ''),
+            'owner': RiskParser._text_column(df, column_map.get('owner'), 'Unassigned'),
+            'date_identified': RiskParser._date_column(df, column_map.get('date_identified')),
+            'status': RiskParser._text_column(df, column_map.get('status'), 'open').str.lower(),
+            'category': RiskParser._text_column(df, column_map.get('category'), 'general').str.lower(),
+            'project': RiskParser._text_column(df, column_map.get('project'), ''),
+        }
+
+        # Materialize records only once every column is normalized
+        keys = list(columns)
+        values = [column.tolist() for column in columns.values()]
+        return [dict(zip(keys, row)) for row in zip(*values)]
+
     @staticmethod
     def parse_excel(file_content: bytes) -> List[Dict[str, Any]]:
         """
@@ -187,125 +370,7 @@ class RiskParser:
             else:
                 df = pd.read_excel(file_content, engine='openpyxl')
             
-            # Normalize column names (case-insensitive matching)
-            df.columns = df.columns.str.strip().str.lower()
-            
-            # Column mapping (flexible matching)
-            column_map = {}
-            for col in df.columns:
-                if 'id' in col:
-                    column_map['id'] = col
-                elif 'title' in col or 'name' in col or 'risk' in col:
-                    column_map['title'] = col
-                elif 'desc' in col:
-                    column_map['description'] = col
-                elif 'likelihood' in col or 'probability' in col:
-                    column_map['likelihood'] = col
-                elif 'impact' in col or 'consequence' in col:
-                    column_map['impact'] = col
-                elif 'mitigation' in col or 'response' in col or 'action' in col:
-                    column_map['mitigations'] = col
-                elif 'owner' in col or 'assigned' in col:
-                    column_map['owner'] = col
-                elif 'date' in col or 'identified' in col:
-                    column_map['date_identified'] = col
-                elif 'status' in col:
-                    column_map['status'] = col
-                elif 'category' in col or 'type' in col:
-                    column_map['category'] = col
-                elif 'project' in col:
-                    column_map['project'] = col
-            
-            # Validate required columns
-            if 'title' not in column_map:
-                raise ValueError("Excel must have a Title/Name/Risk column")
-            
-            normalized_risks = []
-            for idx, row in df.iterrows():
-                # Skip empty rows
-                if pd.isna(row.get(column_map.get('title', ''))):
-                    continue
-                
-                # Get or generate ID
-                risk_id = row.get(column_map.get('id', ''), f"R{str(idx + 1).zfill(3)}")
-                if pd.isna(risk_id):
-                    risk_id = f"R{str(idx + 1).zfill(3)}"
-                else:
-                    risk_id = str(risk_id)
-                
-                # Get values with defaults
-                title = str(row.get(column_map.get('title', ''), 'Untitled Risk'))
-                description = str(row.get(column_map.get('description', ''), ''))
-                if pd.isna(row.get(column_map.get('description', ''))):
-                    description = ''
-                
-                # Parse likelihood and impact
-                likelihood_raw = row.get(column_map.get('likelihood', ''), 'medium')
-                impact_raw = row.get(column_map.get('impact', ''), 'medium')
-                
-                likelihood = RiskParser.normalize_level(likelihood_raw)
-                impact = RiskParser.normalize_level(impact_raw)
-                
-                # Get mitigations
-                mitigations = str(row.get(column_map.get('mitigations', ''), ''))
-                if pd.isna(row.get(column_map.get('mitigations', ''))):
-                    mitigations = ''
-                
-                # Get owner
-                owner = str(row.get(column_map.get('owner', ''), 'Unassigned'))
-                if pd.isna(row.get(column_map.get('owner', ''))):
-                    owner = 'Unassigned'
-                
-                # Parse date
-                date_raw = row.get(column_map.get('date_identified', ''))
-                if pd.isna(date_raw):
-                    date_identified = datetime.now().isoformat()
-                elif isinstance(date_raw, pd.Timestamp):
-                    date_identified = date_raw.isoformat()
-                else:
-                    try:
-                        date_identified = pd.to_datetime(date_raw).isoformat()
-                    except:
-                        date_identified = datetime.now().isoformat()
-                
-                # Get status and category
-                status = str(row.get(column_map.get('status', ''), 'open'))
-                if pd.isna(row.get(column_map.get('status', ''))):
-                    status = 'open'
-                
-                category = str(row.get(column_map.get('category', ''), 'general'))
-                if pd.isna(row.get(column_map.get('category', ''))):
-                    category = 'general'
-                
-                # Get project (optional)
-                project = str(row.get(column_map.get('project', ''), ''))
-                if pd.isna(row.get(column_map.get('project', ''))):
-                    project = ''
-                
-                normalized_risk = {
-                    'id': risk_id,
-                    'title': title,
-                    'description': description,
-                    'likelihood': likelihood,
-                    'impact': impact,
-                    'severity_normalized': RiskParser.calculate_severity(likelihood, impact),
-                    'mitigations': mitigations,
-                    'owner': owner,
-                    'date_identified': date_identified,
-                    'status': status.lower(),
-                    'category': category.lower(),
-                    'project': project
-                }
-                
-                normalized_risks.append(normalized_risk)
-            
-            if not normalized_risks:
-                raise ValueError("No valid risks found in Excel file")
-            
-            # Ensure all IDs are unique
-            normalized_risks = RiskParser.ensure_unique_ids(normalized_risks)
-            
-            return normalized_risks
+            return RiskParser.normalize_frame(df, 'Excel')
             
         except pd.errors.EmptyDataError:
             raise ValueError("Excel file is empty")
@@ -346,114 +411,7 @@ class RiskParser:
             text = file_content.decode('utf-8') if isinstance(file_content, (bytes, bytearray)) else str(file_content)
             df = pd.read_csv(io.StringIO(text))
 
-            # Reuse Excel parsing logic by writing df to a buffer and calling same mapping
-            # Normalize column names (case-insensitive matching)
-            df.columns = df.columns.str.strip().str.lower()
-
-            # Column mapping (flexible matching)
-            column_map = {}
-            for col in df.columns:
-                if 'id' in col:
-                    column_map['id'] = col
-                elif 'title' in col or 'name' in col or 'risk' in col:
-                    column_map['title'] = col
-                elif 'desc' in col:
-                    column_map['description'] = col
-                elif 'likelihood' in col or 'probability' in col:
-                    column_map['likelihood'] = col
-                elif 'impact' in col or 'consequence' in col:
-                    column_map['impact'] = col
-                elif 'mitigation' in col or 'response' in col or 'action' in col:
-                    column_map['mitigations'] = col
-                elif 'owner' in col or 'assigned' in col:
-                    column_map['owner'] = col
-                elif 'date' in col or 'identified' in col:
-                    column_map['date_identified'] = col
-                elif 'status' in col:
-                    column_map['status'] = col
-                elif 'category' in col or 'type' in col:
-                    column_map['category'] = col
-                elif 'project' in col:
-                    column_map['project'] = col
-
-            if 'title' not in column_map:
-                raise ValueError("CSV must have a Title/Name/Risk column")
-
-            normalized_risks = []
-            for idx, row in df.iterrows():
-                if pd.isna(row.get(column_map.get('title', ''))):
-                    continue
-
-                risk_id = row.get(column_map.get('id', ''), f"R{str(idx + 1).zfill(3)}")
-                if pd.isna(risk_id):
-                    risk_id = f"R{str(idx + 1).zfill(3)}"
-                else:
-                    risk_id = str(risk_id)
-
-                title = str(row.get(column_map.get('title', ''), 'Untitled Risk'))
-                description = str(row.get(column_map.get('description', ''), ''))
-                if pd.isna(row.get(column_map.get('description', ''))):
-                    description = ''
-
-                likelihood_raw = row.get(column_map.get('likelihood', ''), 'medium')
-                impact_raw = row.get(column_map.get('impact', ''), 'medium')
-
-                likelihood = RiskParser.normalize_level(likelihood_raw)
-                impact = RiskParser.normalize_level(impact_raw)
-
-                mitigations = str(row.get(column_map.get('mitigations', ''), ''))
-                if pd.isna(row.get(column_map.get('mitigations', ''))):
-                    mitigations = ''
-
-                owner = str(row.get(column_map.get('owner', ''), 'Unassigned'))
-                if pd.isna(row.get(column_map.get('owner', ''))):
-                    owner = 'Unassigned'
-
-                date_raw = row.get(column_map.get('date_identified', ''))
-                if pd.isna(date_raw):
-                    date_identified = datetime.now().isoformat()
-                else:
-                    try:
-                        date_identified = pd.to_datetime(date_raw).isoformat()
-                    except:
-                        date_identified = datetime.now().isoformat()
-
-                status = str(row.get(column_map.get('status', ''), 'open'))
-                if pd.isna(row.get(column_map.get('status', ''))):
-                    status = 'open'
-
-                category = str(row.get(column_map.get('category', ''), 'general'))
-                if pd.isna(row.get(column_map.get('category', ''))):
-                    category = 'general'
-
-                project = str(row.get(column_map.get('project', ''), ''))
-                if pd.isna(row.get(column_map.get('project', ''))):
-                    project = ''
-
-                normalized_risk = {
-                    'id': risk_id,
-                    'title': title,
-                    'description': description,
-                    'likelihood': likelihood,
-                    'impact': impact,
-                    'severity_normalized': RiskParser.calculate_severity(likelihood, impact),
-                    'mitigations': mitigations,
-                    'owner': owner,
-                    'date_identified': date_identified,
-                    'status': status.lower(),
-                    'category': category.lower(),
-                    'project': project
-                }
-
-                normalized_risks.append(normalized_risk)
-
-            if not normalized_risks:
-                raise ValueError("No valid risks found in CSV file")
-
-            # Ensure all IDs are unique
-            normalized_risks = RiskParser.ensure_unique_ids(normalized_risks)
-
-            return normalized_risks
+            return RiskParser.normalize_frame(df, 'CSV')
 
         except pd.errors.EmptyDataError:
             raise ValueError("CSV file is empty")
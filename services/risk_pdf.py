@@ -0,0 +1,242 @@
+"""
+Risk PDF Service
+Renders a risk register as a PDF (several risks per page) and keeps the
+results in a bounded cache keyed by (program, risk data version, layout).
+Rendering runs in the build pool, writes straight to a file and is served
+from disk, so a large register neither blocks the event loop nor is held in
+memory. Paragraph and table styles are built once per process and reused.
+"""
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import asyncio
+import logging
+
+from services.export_cache import ExportCache
+from services.slide_cache import hash_data
+
+logger = logging.getLogger(__name__)
+
+# Bump when the rendered output changes so cached PDFs are not reused
+PDF_FORMAT_VERSION = 1
+
+LAYOUTS = ('landscape', 'portrait')
+
+
+@lru_cache(maxsize=None)
+def _styles() -> Dict[str, Any]:
+    """Paragraph and table styles, built once per process."""
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_CENTER
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.platypus import TableStyle
+
+    styles = getSampleStyleSheet()
+    return {
+        'title': ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=16,
+            textColor=colors.HexColor('#1e40af'),
+            spaceAfter=6,
+            alignment=TA_CENTER
+        ),
+        'risk_title': ParagraphStyle(
+            'RiskTitle',
+            parent=styles['Heading2'],
+            fontSize=10,
+            textColor=colors.HexColor('#1e40af'),
+            spaceAfter=2,
+            spaceBefore=4
+        ),
+        'small': ParagraphStyle(
+            'Small',
+            parent=styles['Normal'],
+            fontSize=7
+        ),
+        'header_table': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#f3f4f6')),
+            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTSIZE', (0, 0), (-1, -1), 7),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('TOPPADDING', (0, 0), (-1, -1), 2),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
+        ]),
+        'body_table': TableStyle([
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('TOPPADDING', (0, 0), (-1, -1), 1),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 1),
+        ])
+    }
+
+
+def build_risk_pdf(
+    risks: List[Dict[str, Any]],
+    program_title: str,
+    output_path: str,
+    layout: str = 'landscape'
+) -> str:
+    """
+    Render risks to a PDF file (build pool worker entry point).
+
+    Args:
+        risks: Risks in register order
+        program_title: Program name shown in the heading
+        output_path: File the PDF is written to
+        layout: 'landscape' (default) or 'portrait' letter pages
+
+    Returns:
+        output_path
+    """
+    from reportlab.lib.pagesizes import letter, landscape
+    from reportlab.lib.units import inch
+    from reportlab.platypus import (
+        SimpleDocTemplate, Table, Paragraph, Spacer, KeepTogether
+    )
+
+    styles = _styles()
+    doc = SimpleDocTemplate(
+        output_path,
+        pagesize=landscape(letter) if layout == 'landscape' else letter,
+        topMargin=0.5*inch,
+        bottomMargin=0.5*inch,
+        leftMargin=0.5*inch,
+        rightMargin=0.5*inch
+    )
+
+    # Column widths were laid out for the 10" landscape frame
+    scale = doc.width / (10 * inch)
+    header_widths = [w * inch * scale for w in (1.4, 1.5, 2.2, 1.2, 1.2)]
+    body_widths = [w * inch * scale for w in (4.5, 4)]
+
+    elements = [
+        Paragraph(f"Risk Register: {program_title}", styles['title']),
+        Paragraph(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}", styles['small']),
+        Spacer(1, 0.15*inch)
+    ]
+
+    # Process risks - 3-4 per page in landscape
+    for i, risk in enumerate(risks):
+        risk_elements = [Paragraph(
+            f"<b>{risk.get('id', 'N/A')}: "
+            f"{risk.get('title', 'Untitled Risk')}</b>",
+            styles['risk_title']
+        )]
+
+        # Very compact single-row header
+        header_table = Table([[
+            f"Sev: {risk.get('severity_normalized', 'N/A').upper()}",
+            f"Status: {risk.get('status', 'N/A')}",
+            f"Owner: {risk.get('owner', 'N/A')}",
+            f"L: {risk.get('likelihood', 'N/A')}",
+            f"I: {risk.get('impact', 'N/A')}"
+        ]], colWidths=header_widths)
+        header_table.setStyle(styles['header_table'])
+        risk_elements.append(header_table)
+        risk_elements.append(Spacer(1, 0.05*inch))
+
+        # Description and Mitigations in 2 columns
+        desc_para = Paragraph(
+            f"<b>Description:</b> {risk.get('description', 'No description')}",
+            styles['small']
+        )
+        mitigations = risk.get('mitigations', [])
+        if mitigations:
+            if isinstance(mitigations, list):
+                miti_text = "; ".join(f"{idx}. {m}" for idx, m in enumerate(mitigations, 1))
+            else:
+                miti_text = str(mitigations)
+        else:
+            miti_text = "None"
+        miti_para = Paragraph(f"<b>Mitigations:</b> {miti_text}", styles['small'])
+
+        body_table = Table([[desc_para, miti_para]], colWidths=body_widths)
+        body_table.setStyle(styles['body_table'])
+        risk_elements.append(body_table)
+
+        # Keep risk together
+        elements.append(KeepTogether(risk_elements))
+
+        # Minimal spacing between risks
+        if i < len(risks) - 1:
+            elements.append(Spacer(1, 0.12*inch))
+
+    doc.build(elements)
+    return output_path
+
+
+class RiskPdfExporter:
+    """Builds risk PDFs in the build pool and caches them on disk."""
+
+    def __init__(self, cache_dir: Path):
+        """
+        Initialize the exporter.
+
+        Args:
+            cache_dir: Directory for generated PDFs (size/age bounded like
+                the deck export cache)
+        """
+        self.cache = ExportCache(cache_dir)
+        self._pending: Dict[str, asyncio.Future] = {}
+
+    @staticmethod
+    def cache_key(program_name: str, data_version: str, layout: str) -> str:
+        """Cache filename for one (program, data version, layout)."""
+        return f"risks_{hash_data(program_name, data_version, layout, PDF_FORMAT_VERSION)}.pdf"
+
+    async def get_pdf(self, risk_repo, program_name: str, layout: str = 'landscape') -> Optional[Path]:
+        """
+        Get the PDF of a program's current risks, building it if needed.
+        Concurrent requests for the same PDF share one build.
+
+        Args:
+            risk_repo: RiskRepository to read from
+            program_name: Program name (any form the alias index knows)
+            layout: One of LAYOUTS
+
+        Returns:
+            Path of the cached PDF, or None if the program has no risks
+        """
+        if layout not in LAYOUTS:
+            raise ValueError(f"Unknown layout '{layout}'. Use one of: {', '.join(LAYOUTS)}")
+
+        summary = risk_repo.get_summary(program_name)
+        if not summary or not summary['risk_count']:
+            return None
+
+        # Manifest entries change with every persisted write to the register
+        canonical = summary['program_name']
+        filename = self.cache_key(canonical, summary['last_updated'], layout)
+        path = self.cache.directory / filename
+        if path.exists():
+            self.cache.touch(path)
+            logger.info(f"♻️ Risk PDF for '{canonical}' served from cache")
+            return path
+
+        build = self._pending.get(filename)
+        if build is None:
+            build = asyncio.ensure_future(self._build(risk_repo, canonical, filename, layout))
+            self._pending[filename] = build
+            build.add_done_callback(lambda _: self._pending.pop(filename, None))
+        return await asyncio.shield(build)
+
+    async def _build(self, risk_repo, program_name: str, filename: str, layout: str) -> Optional[Path]:
+        """Render the PDF in the build pool into the cache."""
+        from services.build_pool import build_risk_pdf_async
+
+        risks = await asyncio.to_thread(risk_repo.load_risks, program_name)
+        if not risks:
+            return None
+
+        temp_path = self.cache.reserve(filename)
+        try:
+            await build_risk_pdf_async(risks, program_name, str(temp_path), layout)
+            path = self.cache.commit(temp_path, filename)
+        except BaseException:
+            self.cache.discard(temp_path)
+            raise
+        logger.info(f"📄 Built risk PDF for '{program_name}' ({len(risks)} risks, {layout})")
+        return path
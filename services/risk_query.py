@@ -0,0 +1,350 @@
+"""
+Risk Query Service
+Filtered, sorted and paginated reads of a program's risk register, so views
+only receive the page (and the fields) they show. For each program a set of
+indexes is built once per register version: the risks in every sort order,
+plus postings lists for the filterable fields. A query intersects the
+postings, walks the requested sort order from its cursor and projects the
+page. Cursors carry the last risk's sort key (value and sequence number,
+see RiskStore), so a page resumes where the previous one ended even if that
+risk has since moved or risks before it were added or deleted.
+"""
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from functools import total_ordering
+from typing import Any, Dict, List, Optional, Set, Tuple
+import base64
+import json
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Order values for the level fields (unknown values sort last)
+SEVERITY_ORDER = {'low': 0, 'medium': 1, 'high': 2, 'critical': 3}
+LEVEL_ORDER = {'low': 0, 'medium': 1, 'high': 2}
+
+SORT_FIELDS = (
+    'position', 'id', 'title', 'severity', 'likelihood', 'impact',
+    'status', 'owner', 'category', 'date_identified'
+)
+
+# Query parameter -> risk field of the exact-match filters
+FILTER_FIELDS = {
+    'severity': 'severity_normalized',
+    'status': 'status',
+    'owner': 'owner',
+    'category': 'category'
+}
+
+
+def _text(value: Any) -> str:
+    return str(value).strip().casefold() if value is not None else ''
+
+
+def _date(value: Any) -> str:
+    """YYYY-MM-DD part of a stored date ('' if missing)."""
+    return str(value)[:10] if value else ''
+
+
+def _sort_value(field: str, risk: Dict[str, Any]) -> Any:
+    """Comparable value of a risk for a sort field (None if missing)."""
+    if field == 'severity':
+        rank = SEVERITY_ORDER.get(risk.get('severity_normalized'))
+    elif field in ('likelihood', 'impact'):
+        rank = LEVEL_ORDER.get(_text(risk.get(field)))
+    elif field == 'date_identified':
+        rank = _date(risk.get(field)) or None
+    else:
+        rank = _text(risk.get(field)) or None
+    return rank
+
+
+@total_ordering
+class _Descending:
+    """Wraps a sort value so that larger values order first."""
+
+    __slots__ = ('value',)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def __eq__(self, other) -> bool:
+        return self.value == other.value
+
+    def __lt__(self, other) -> bool:
+        return other.value < self.value
+
+
+def _order_key(value: Any, sequence: int, order: str) -> Tuple:
+    """
+    Key of a risk in a sort order; keys increase strictly along the order
+    (missing values last, ties in register order, i.e. by sequence number).
+    """
+    if value is None:
+        return (1, sequence)
+    return (0, _Descending(value) if order == 'desc' else value, sequence)
+
+
+class RiskIndexes:
+    """Sort orders and filter postings of one register version. Sort
+    orders are built the first time they are asked for."""
+
+    def __init__(self, risks: List[Dict[str, Any]], version: int, sequences: Optional[List[int]] = None):
+        self.version = version
+        self.risks = risks
+        # Stable sequence number of each position (increasing along the register)
+        self.sequences = sequences if sequences is not None else list(range(len(risks)))
+        self._orders: Dict[Tuple[str, str], Tuple[List[int], List[int]]] = {}
+        self._order_keys: Dict[Tuple[str, str], List[Tuple]] = {}
+        self._lock = threading.Lock()
+
+        self.postings: Dict[str, Dict[str, Set[int]]] = {name: {} for name in FILTER_FIELDS}
+        for position, risk in enumerate(risks):
+            for name, field in FILTER_FIELDS.items():
+                self.postings[name].setdefault(_text(risk.get(field)), set()).add(position)
+
+        dated = sorted((_date(risk.get('date_identified')), p) for p, risk in enumerate(risks))
+        self.dates = [date for date, _ in dated]
+        self.date_positions = [position for _, position in dated]
+
+    def sort_order(self, field: str, order: str) -> Tuple[List[int], List[int]]:
+        """
+        Risk positions in a sort order, and each position's index in it.
+        Missing values sort last in both directions; ties keep register order.
+        """
+        with self._lock:
+            cached = self._orders.get((field, order))
+            if cached is not None:
+                return cached
+
+            values = [self.sort_value(field, position) for position in range(len(self.risks))]
+            present = [p for p, value in enumerate(values) if value is not None]
+            missing = [p for p, value in enumerate(values) if value is None]
+            # Sorting is stable (also with reverse=True), so equal values
+            # stay in register order
+            present.sort(key=values.__getitem__, reverse=(order == 'desc'))
+            walk = present + missing
+
+            index_of = [0] * len(walk)
+            for index, position in enumerate(walk):
+                index_of[position] = index
+            self._order_keys[(field, order)] = [
+                _order_key(values[p], self.sequences[p], order) for p in walk
+            ]
+            self._orders[(field, order)] = (walk, index_of)
+            return walk, index_of
+
+    def sort_value(self, field: str, position: int) -> Any:
+        """Value of the risk at a register position in a sort field
+        ('position' sorts by sequence number, i.e. register order)."""
+        if field == 'position':
+            return self.sequences[position]
+        return _sort_value(field, self.risks[position])
+
+    def index_after(self, field: str, order: str, value: Any, sequence: int) -> int:
+        """
+        Index into a sort order of the first risk after a sort key (a risk
+        with that value and sequence number need not exist any more).
+        """
+        self.sort_order(field, order)
+        keys = self._order_keys[(field, order)]
+        return bisect_right(keys, _order_key(value, sequence, order))
+
+    def matching(
+        self,
+        filters: Dict[str, List[str]],
+        date_from: Optional[str],
+        date_to: Optional[str]
+    ) -> Optional[Set[int]]:
+        """Positions passing every filter, or None if nothing is filtered."""
+        matches: Optional[Set[int]] = None
+        for name, values in filters.items():
+            if not values:
+                continue
+            postings = self.postings[name]
+            selected = set().union(*(postings.get(_text(value), set()) for value in values))
+            matches = selected if matches is None else matches & selected
+
+        if date_from or date_to:
+            # Risks without a date never match a date range
+            low = bisect_left(self.dates, date_from or '0000')
+            high = bisect_right(self.dates, date_to or '9999')
+            selected = set(self.date_positions[max(low, bisect_right(self.dates, '')):high])
+            matches = selected if matches is None else matches & selected
+        return matches
+
+
+class RiskQueryService:
+    """Server-side filtering, sorting and pagination of risk registers."""
+
+    def __init__(self, repository, max_programs: int = None):
+        """
+        Initialize the service.
+
+        Args:
+            repository: RiskRepository to read registers from
+            max_programs: Programs whose indexes are kept in memory
+                (RISK_QUERY_CACHE_PROGRAMS, default 32)
+        """
+        if max_programs is None:
+            max_programs = int(os.getenv("RISK_QUERY_CACHE_PROGRAMS", "32"))
+        self.repository = repository
+        self.max_programs = max(1, max_programs)
+        self._indexes: "OrderedDict[str, RiskIndexes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def query(
+        self,
+        program_name: str,
+        filters: Optional[Dict[str, List[str]]] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        sort: str = 'position',
+        order: str = 'asc',
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        offset: int = 0,
+        fields: Optional[List[str]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get one page of a program's risks.
+
+        Args:
+            program_name: Program name (any form the alias index knows)
+            filters: severity/status/owner/category -> accepted values
+                (case-insensitive; owners as shown, i.e. anonymized)
+            date_from: Earliest date_identified (YYYY-MM-DD, inclusive)
+            date_to: Latest date_identified (YYYY-MM-DD, inclusive)
+            sort: One of SORT_FIELDS ('position' is register order)
+            order: 'asc' or 'desc'
+            limit: Page size
+            cursor: next_cursor of the previous page (continues after it)
+            offset: Matches to skip when no cursor is given (page numbers)
+            fields: Risk fields to return ('id' is always included)
+
+        Returns:
+            Dict with total, risks and next_cursor, or None if the program
+            has no register
+
+        Raises:
+            ValueError: Unknown sort/filter field or malformed cursor
+        """
+        if sort not in SORT_FIELDS:
+            raise ValueError(f"Cannot sort by '{sort}'. Use one of: {', '.join(SORT_FIELDS)}")
+        if order not in ('asc', 'desc'):
+            raise ValueError("order must be 'asc' or 'desc'")
+        filters = filters or {}
+        unknown = set(filters) - set(FILTER_FIELDS)
+        if unknown:
+            raise ValueError(f"Cannot filter by: {', '.join(sorted(unknown))}")
+
+        indexes = self._get_indexes(program_name)
+        if indexes is None:
+            return None
+
+        walk, index_of = indexes.sort_order(sort, order)
+
+        start = max(0, offset)
+        if cursor:
+            start = self._resume(indexes, cursor, sort, order)
+
+        matches = indexes.matching(filters, date_from, date_to)
+        if matches is None:
+            total = len(walk)
+            page_indexes = list(range(start, min(start + limit, total)))
+            has_more = start + limit < total
+        else:
+            total = len(matches)
+            matched = sorted(index_of[p] for p in matches)
+            skip = bisect_left(matched, start) if cursor else start
+            page_indexes = matched[skip:skip + limit]
+            has_more = skip + limit < total
+
+        page_positions = [walk[index] for index in page_indexes]
+        page = [self._project(indexes.risks[p], fields) for p in page_positions]
+        next_cursor = None
+        if page_positions and has_more:
+            last = page_positions[-1]
+            next_cursor = self._encode_cursor({
+                'sort': sort,
+                'order': order,
+                'value': indexes.sort_value(sort, last),
+                'seq': indexes.sequences[last]
+            })
+
+        return {
+            'total': total,
+            'count': len(page),
+            'risks': page,
+            'next_cursor': next_cursor
+        }
+
+    def _get_indexes(self, program_name: str) -> Optional[RiskIndexes]:
+        """Indexes of the program's current register version."""
+        canonical = self.repository.resolve_program(program_name)
+        if canonical is None:
+            return None
+        version = self.repository.get_version(canonical)
+
+        with self._lock:
+            indexes = self._indexes.get(canonical)
+            if indexes is not None and indexes.version == version:
+                self._indexes.move_to_end(canonical)
+                return indexes
+
+        # Build outside the lock (other programs stay queryable meanwhile)
+        sequenced = self.repository.load_sequenced_risks(canonical)
+        if sequenced is None:
+            return None
+        risks = [risk for _, risk in sequenced]
+        indexes = RiskIndexes(risks, version, [sequence for sequence, _ in sequenced])
+        logger.info(f"🔎 Indexed {len(risks)} risks of '{canonical}' (version {version})")
+
+        with self._lock:
+            self._indexes[canonical] = indexes
+            self._indexes.move_to_end(canonical)
+            while len(self._indexes) > self.max_programs:
+                self._indexes.popitem(last=False)
+        return indexes
+
+    @staticmethod
+    def _resume(indexes: RiskIndexes, cursor: str, sort: str, order: str) -> int:
+        """Index into the sort order right after the cursor's sort key."""
+        state = RiskQueryService._decode_cursor(cursor)
+        if state.get('sort') != sort or state.get('order') != order:
+            raise ValueError("Cursor belongs to a different sort order")
+
+        value, sequence = state.get('value'), state.get('seq')
+        expected = int if sort in ('position', 'severity', 'likelihood', 'impact') else str
+        if (not isinstance(sequence, int) or isinstance(sequence, bool) or
+                not (value is None or (isinstance(value, expected) and not isinstance(value, bool)))):
+            raise ValueError("Invalid cursor")
+        return indexes.index_after(sort, order, value, sequence)
+
+    @staticmethod
+    def _project(risk: Dict[str, Any], fields: Optional[List[str]]) -> Dict[str, Any]:
+        if not fields:
+            return dict(risk)
+        projected = {'id': risk.get('id')}
+        for field in fields:
+            if field in risk:
+                projected[field] = risk[field]
+        return projected
+
+    @staticmethod
+    def _encode_cursor(state: Dict[str, Any]) -> str:
+        raw = json.dumps(state, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Dict[str, Any]:
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            state = json.loads(raw)
+        except (ValueError, TypeError):
+            raise ValueError("Invalid cursor")
+        if not isinstance(state, dict):
+            raise ValueError("Invalid cursor")
+        return state
@@ -0,0 +1,318 @@
+"""
+Risk Workbook Reader Service
+Streams risks out of large .xlsx risk registers. The workbook is opened with
+openpyxl in read_only mode so rows are read lazily; the header row is
+detected on each selected sheet and the rows below it are normalized in
+fixed-size chunks, so memory stays bounded however long the register is.
+CSV exports are streamed the same way through pandas' chunked reader.
+"""
+from fnmatch import fnmatch
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple, Union
+import logging
+import os
+
+import pandas as pd
+
+from services.risk_parser import RiskParser
+
+logger = logging.getLogger(__name__)
+
+# Called after each chunk with the fraction of the file read so far (0-1)
+ProgressCallback = Callable[[float], None]
+
+# Rows searched for the header (enterprise registers often start with a
+# title banner, logos or filter notes)
+HEADER_SCAN_ROWS = 20
+
+# A sheet's data ends after this many consecutive blank rows; formatting
+# can make read-only sheets report a million "used" rows
+MAX_BLANK_ROWS = 1000
+
+
+class RiskWorkbookReader:
+    """Lazy, chunked reader for risk registers in .xlsx workbooks."""
+
+    def __init__(self, chunk_size: int = None):
+        """
+        Initialize the reader.
+
+        Args:
+            chunk_size: Rows normalized at a time
+                (RISK_IMPORT_CHUNK_ROWS, default 2000)
+        """
+        if chunk_size is None:
+            chunk_size = int(os.getenv("RISK_IMPORT_CHUNK_ROWS", "2000"))
+        self.chunk_size = max(1, chunk_size)
+
+    def iter_chunks(
+        self,
+        source: Union[str, os.PathLike, BinaryIO],
+        sheet: Optional[str] = None,
+        seen_ids: Optional[set] = None,
+        progress: Optional[ProgressCallback] = None
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Stream normalized risks from a workbook.
+
+        Args:
+            source: Path or binary file object of the .xlsx
+            sheet: Sheet name or pattern ("Risks*", "*" for every sheet).
+                If omitted, the first sheet with a recognizable header is read
+            seen_ids: IDs already taken (updated in place; IDs stay unique
+                across chunks and sheets)
+            progress: Told the share of rows read after each chunk (from the
+                sheets' recorded dimensions, so an estimate)
+
+        Yields:
+            Lists of at most chunk_size normalized risk dictionaries
+        """
+        from openpyxl import load_workbook
+
+        if seen_ids is None:
+            seen_ids = set()
+
+        try:
+            workbook = load_workbook(source, read_only=True, data_only=True)
+        except Exception as e:
+            raise ValueError(f"Error parsing Excel: {str(e)}")
+
+        try:
+            worksheets = self.select_sheets(workbook, sheet)
+            found_header = False
+            row_number = 0
+
+            # A default sheet is the only one read
+            sheet_share = 1 / len(worksheets) if sheet is not None and worksheets else 1.0
+            for sheet_number, worksheet in enumerate(worksheets):
+                rows_read = 0
+                sheet_rows = worksheet.max_row or 0
+
+                def counted(rows):
+                    nonlocal rows_read
+                    for rows_read, values in enumerate(rows, 1):
+                        yield values
+
+                def report():
+                    if progress is not None:
+                        done = min(1.0, rows_read / sheet_rows) if sheet_rows else 0.0
+                        start = sheet_number * sheet_share if sheet is not None else 0.0
+                        progress(min(1.0, start + done * sheet_share))
+
+                rows = counted(worksheet.iter_rows(values_only=True))
+                header = self.detect_header(rows)
+                if header is None:
+                    if sheet is None:
+                        continue
+                    logger.warning(f"⚠️ No risk header found on sheet '{worksheet.title}', skipped")
+                    continue
+
+                found_header = True
+                columns, column_map = header
+                logger.info(
+                    f"📖 Reading risks from sheet '{worksheet.title}' "
+                    f"({len(column_map)} mapped columns)"
+                )
+
+                chunk_rows: List[Tuple] = []
+                for values in self._data_rows(rows, len(columns)):
+                    chunk_rows.append(values)
+                    if len(chunk_rows) >= self.chunk_size:
+                        chunk = self._normalize_chunk(chunk_rows, columns, column_map, row_number, seen_ids)
+                        report()
+                        yield chunk
+                        row_number += len(chunk_rows)
+                        chunk_rows = []
+                if chunk_rows:
+                    chunk = self._normalize_chunk(chunk_rows, columns, column_map, row_number, seen_ids)
+                    rows_read = sheet_rows
+                    report()
+                    yield chunk
+                    row_number += len(chunk_rows)
+
+                if sheet is None:
+                    break
+
+            if not found_header:
+                raise ValueError("Excel must have a Title/Name/Risk column")
+        finally:
+            workbook.close()
+
+    def iter_csv_chunks(
+        self,
+        source: Union[str, os.PathLike, BinaryIO],
+        seen_ids: Optional[set] = None,
+        progress: Optional[ProgressCallback] = None
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Stream normalized risks from a CSV file, reading chunk_size rows at
+        a time with pandas.
+
+        Args:
+            source: Path or binary file object of the CSV (UTF-8)
+            seen_ids: IDs already taken (updated in place; IDs stay unique
+                across chunks)
+            progress: Told the share of bytes read after each chunk (pandas
+                reads ahead, so an estimate)
+
+        Yields:
+            Lists of at most chunk_size normalized risk dictionaries
+        """
+        if seen_ids is None:
+            seen_ids = set()
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, 'rb') as f:
+                yield from self.iter_csv_chunks(f, seen_ids, progress)
+            return
+        total_bytes = self._stream_size(source)
+
+        try:
+            # Cells stay text so every chunk is typed the same way
+            reader = pd.read_csv(source, chunksize=self.chunk_size, dtype=str, encoding='utf-8-sig')
+        except pd.errors.EmptyDataError:
+            raise ValueError("CSV file is empty")
+        except Exception as e:
+            raise ValueError(f"Error parsing CSV: {str(e)}")
+
+        with reader:
+            column_map = None
+            try:
+                for df in reader:
+                    # Chunks keep counting rows in their index (generated IDs)
+                    df.columns = df.columns.str.strip().str.lower()
+                    if column_map is None:
+                        column_map = RiskParser.map_columns(df.columns)
+                        if 'title' not in column_map:
+                            raise ValueError("CSV must have a Title/Name/Risk column")
+                    risks = RiskParser.frame_to_risks(df, column_map)
+                    chunk = RiskParser.ensure_unique_ids(risks, seen_ids)
+                    if progress is not None and total_bytes:
+                        progress(min(1.0, source.tell() / total_bytes))
+                    yield chunk
+            except pd.errors.EmptyDataError:
+                raise ValueError("CSV file is empty")
+            except (pd.errors.ParserError, UnicodeDecodeError) as e:
+                raise ValueError(f"Error parsing CSV: {str(e)}")
+
+    @staticmethod
+    def _stream_size(source: BinaryIO) -> Optional[int]:
+        """Size in bytes of a seekable file object (None if unknown)."""
+        try:
+            position = source.tell()
+            size = source.seek(0, os.SEEK_END)
+            source.seek(position)
+            return size
+        except (AttributeError, OSError, ValueError):
+            return None
+
+    @staticmethod
+    def select_sheets(workbook, sheet: Optional[str] = None) -> List[Any]:
+        """
+        Pick the worksheets to read.
+
+        Args:
+            workbook: openpyxl workbook
+            sheet: Exact sheet name, or a case-insensitive glob pattern
+
+        Returns:
+            Matching worksheets in workbook order
+        """
+        if sheet is None:
+            return list(workbook.worksheets)
+        if sheet in workbook.sheetnames:
+            return [workbook[sheet]]
+
+        pattern = sheet.lower()
+        matches = [ws for ws in workbook.worksheets if fnmatch(ws.title.lower(), pattern)]
+        if not matches:
+            raise ValueError(
+                f"No sheet matches '{sheet}'. Available sheets: {', '.join(workbook.sheetnames)}"
+            )
+        return matches
+
+    @staticmethod
+    def detect_header(rows: Iterator[Tuple]) -> Optional[Tuple[List[str], Dict[str, str]]]:
+        """
+        Find the header row within the first HEADER_SCAN_ROWS rows.
+
+        A header maps a title column plus at least one other risk field,
+        which tells it apart from a "Risk Register" banner above the table.
+        Rows up to and including the header are consumed from the iterator.
+
+        Args:
+            rows: Row value tuples of a worksheet
+
+        Returns:
+            (column names, column map) or None if no header was found
+        """
+        for _ in range(HEADER_SCAN_ROWS):
+            values = next(rows, None)
+            if values is None:
+                return None
+            if not any(value is not None for value in values):
+                continue
+
+            columns = RiskWorkbookReader._column_names(values)
+            column_map = RiskParser.map_columns(columns)
+            if 'title' in column_map and len(column_map) >= 2:
+                return columns, column_map
+        return None
+
+    @staticmethod
+    def _column_names(values: Tuple) -> List[str]:
+        """Lowercased, stripped header names; blank and repeated names are
+        made unique the way pandas does."""
+        columns = []
+        seen: Dict[str, int] = {}
+        for idx, value in enumerate(values):
+            name = str(value).strip().lower() if value is not None else f"unnamed: {idx}"
+            if name in seen:
+                seen[name] += 1
+                name = f"{name}.{seen[name]}"
+            else:
+                seen[name] = 0
+            columns.append(name)
+        return columns
+
+    @staticmethod
+    def _data_rows(rows: Iterator[Tuple], width: int) -> Iterator[Tuple]:
+        """Rows below the header, padded/truncated to the header width, up to
+        the first long run of blank rows."""
+        blank_run = 0
+        for values in rows:
+            if not any(value is not None for value in values):
+                blank_run += 1
+                if blank_run >= MAX_BLANK_ROWS:
+                    return
+                continue
+            # Blank rows inside the table still count for generated row IDs
+            for _ in range(blank_run):
+                yield (None,) * width
+            blank_run = 0
+
+            if len(values) < width:
+                values = values + (None,) * (width - len(values))
+            yield tuple(
+                int(value) if isinstance(value, float) and value.is_integer() else value
+                for value in values[:width]
+            )
+
+    @staticmethod
+    def _normalize_chunk(
+        chunk_rows: List[Tuple],
+        columns: List[str],
+        column_map: Dict[str, str],
+        first_row: int,
+        seen_ids: set
+    ) -> List[Dict[str, Any]]:
+        """Normalize one chunk of raw rows column-wise."""
+        df = pd.DataFrame(
+            chunk_rows,
+            columns=columns,
+            index=pd.RangeIndex(first_row, first_row + len(chunk_rows))
+        )
+        risks = RiskParser.frame_to_risks(df, column_map)
+        return RiskParser.ensure_unique_ids(risks, seen_ids)
+
+
+# Shared by the risk upload endpoint
+risk_workbook_reader = RiskWorkbookReader()
@@ -0,0 +1,144 @@
+"""
+Risk XLSX Service
+Writes a risk register to an Excel workbook that the upload endpoint can read
+back. openpyxl's write_only mode writes each row to disk as it is appended.
+Risks are taken one at a time from the store, and cell styles are created
+once, so memory stays flat however long the register is.
+"""
+from typing import Any, Dict, Iterable, List, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# (header, risk field, column width). Headers are the ones
+# RiskParser.map_columns recognizes, so an export can be re-imported as is
+# (the Severity column is informational; it is recomputed on import)
+EXPORT_COLUMNS: List[Tuple[str, str, int]] = [
+    ('ID', 'id', 12),
+    ('Title', 'title', 40),
+    ('Description', 'description', 60),
+    ('Likelihood', 'likelihood', 12),
+    ('Impact', 'impact', 12),
+    ('Severity', 'severity_normalized', 12),
+    ('Status', 'status', 12),
+    ('Owner', 'owner', 18),
+    ('Category', 'category', 16),
+    ('Date', 'date_identified', 14),
+    ('Mitigations', 'mitigations', 60),
+    ('Project', 'project', 20),
+]
+
+# Severity cell fill/font colors (same palette as the risk slides)
+SEVERITY_COLORS = {
+    'critical': ('7C3AED', 'FFFFFF'),
+    'high': ('DC2626', 'FFFFFF'),
+    'medium': ('F59E0B', '000000'),
+    'low': ('6B7280', 'FFFFFF'),
+}
+
+HEADER_FILL = '1E40AF'
+
+
+def _cell_value(field: str, value: Any) -> Any:
+    """Risk field value as written to a cell."""
+    if value is None:
+        return None
+    if field == 'mitigations' and isinstance(value, list):
+        return "\n".join(str(item) for item in value)
+    if field in ('likelihood', 'impact', 'severity_normalized'):
+        return str(value).capitalize()
+    if field == 'date_identified':
+        return str(value)[:10]
+    if isinstance(value, (dict, list)):
+        return str(value)
+    return value
+
+
+def _text_safe_cell(sheet, value: Any):
+    """
+    Write-only cell for a value. Text starting with "=" is stored as a
+    string (openpyxl would otherwise write it as a formula).
+    """
+    from openpyxl.cell import WriteOnlyCell
+
+    cell = WriteOnlyCell(sheet, value=value)
+    if isinstance(value, str) and value.startswith('='):
+        cell.data_type = 's'
+        cell.quotePrefix = True
+    return cell
+
+
+def write_risk_xlsx(risks: Iterable[Dict[str, Any]], program_title: str, output_path: str) -> int:
+    """
+    Write risks to an .xlsx file, one row per risk.
+
+    Args:
+        risks: Risks in register order (any iterable; consumed once)
+        program_title: Program name used as the sheet title
+        output_path: File the workbook is written to
+
+    Returns:
+        Number of risks written
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment, Font, PatternFill
+    from openpyxl.utils import get_column_letter
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=_sheet_title(program_title))
+    for index, (_, _, width) in enumerate(EXPORT_COLUMNS, 1):
+        sheet.column_dimensions[get_column_letter(index)].width = width
+    sheet.freeze_panes = 'A2'
+
+    header_font = Font(bold=True, color='FFFFFF')
+    header_fill = PatternFill('solid', fgColor=HEADER_FILL)
+    header = []
+    for title, _, _ in EXPORT_COLUMNS:
+        cell = WriteOnlyCell(sheet, value=title)
+        cell.font = header_font
+        cell.fill = header_fill
+        header.append(cell)
+    sheet.append(header)
+
+    # Style objects are shared by every severity cell
+    severity_styles = {
+        level: (PatternFill('solid', fgColor=fill), Font(bold=True, color=font))
+        for level, (fill, font) in SEVERITY_COLORS.items()
+    }
+    wrap = Alignment(wrap_text=True, vertical='top')
+    severity_column = next(i for i, (_, field, _) in enumerate(EXPORT_COLUMNS) if field == 'severity_normalized')
+    wrapped_columns = {
+        i for i, (_, field, _) in enumerate(EXPORT_COLUMNS) if field in ('description', 'mitigations')
+    }
+
+    count = 0
+    for risk in risks:
+        row = [_cell_value(field, risk.get(field)) for _, field, _ in EXPORT_COLUMNS]
+
+        severity = severity_styles.get(risk.get('severity_normalized'))
+        if severity is not None:
+            cell = _text_safe_cell(sheet, row[severity_column])
+            cell.fill, cell.font = severity
+            row[severity_column] = cell
+        for column in wrapped_columns:
+            if row[column]:
+                cell = _text_safe_cell(sheet, row[column])
+                cell.alignment = wrap
+                row[column] = cell
+        for column, value in enumerate(row):
+            if isinstance(value, str) and value.startswith('='):
+                row[column] = _text_safe_cell(sheet, value)
+
+        sheet.append(row)
+        count += 1
+
+    workbook.save(output_path)
+    logger.info(f"📊 Wrote {count} risks of '{program_title}' to XLSX")
+    return count
+
+
+def _sheet_title(program_title: str) -> str:
+    """Program name as a valid worksheet title (max 31 chars, no []:*?/\\)."""
+    title = "".join('_' if c in '[]:*?/\\' else c for c in program_title).strip()
+    return title[:31] or 'Risks'
@@ -1,18 +1,50 @@
 import asyncio
-from typing import Dict, List, Optional, Tuple
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from pathlib import Path
+from urllib.parse import urlparse, unquote
 import logging
+import mimetypes
 import io
+import os
 
 from playwright.async_api import (
-    async_playwright,
     Browser,
     Page,
+    Route,
     TimeoutError as PlaywrightTimeout
 )
 from PIL import Image
 
+from services.browser_manager import BrowserManager
+from services.image_encoder import ImageEncoder
+
 logger = logging.getLogger(__name__)
 
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# App mounts served straight from disk during capture (mirrors main.py)
+LOCAL_ASSET_DIRS = {
+    '/static/': BASE_DIR / 'static',
+    '/public/': BASE_DIR / 'public',
+}
+
+# Third-party hosts the templates load render-critical JS/CSS from.
+# Everything else off-origin (analytics, fonts, trackers) is blocked.
+DEFAULT_ALLOWED_HOSTS = {
+    'cdn.plot.ly',
+    'cdn.tailwindcss.com',
+    'cdn.jsdelivr.net',
+    'cdnjs.cloudflare.com',
+    'code.jquery.com',
+    'cdn.datatables.net',
+}
+
+# Resource types never needed for a static capture
+DEFAULT_BLOCKED_RESOURCE_TYPES = {
+    'media', 'websocket', 'eventsource', 'manifest', 'texttrack'
+}
+
 
 class ScreenshotService:
     """Service for capturing screenshots using Playwright."""
@@ -31,11 +63,96 @@ class ScreenshotService:
         '/metrics/trend/': '.js-plotly-plot',
     }
     
-    def __init__(self):
+    # Largest third-party asset kept in the in-memory cache (Plotly is ~3.5MB)
+    MAX_CACHED_ASSET_BYTES = 8 * 1024 * 1024
+    
+    def __init__(
+        self,
+        blocked_resource_types: Optional[Iterable[str]] = None,
+        allowed_hosts: Optional[Iterable[str]] = None,
+        asset_cache_mb: Optional[int] = None
+    ):
+        """
+        Initialize the screenshot service.
+        
+        Args:
+            blocked_resource_types: Playwright resource types to abort during
+                capture (e.g. 'font', 'media'). Defaults to
+                SCREENSHOT_BLOCKED_RESOURCE_TYPES or DEFAULT_BLOCKED_RESOURCE_TYPES.
+            allowed_hosts: Off-origin hosts that may still be fetched.
+                Defaults to SCREENSHOT_ALLOWED_HOSTS or DEFAULT_ALLOWED_HOSTS.
+            asset_cache_mb: Size limit of the in-memory asset cache
+                (SCREENSHOT_ASSET_CACHE_MB, default 64)
+        """
         self.default_resolution = (1920, 1080)
         self.timeout = 5000  # milliseconds for Playwright
-        self._browser: Optional[Browser] = None
-        self._playwright = None
+        
+        # Supervises launch, recycling and crash restart of Chromium
+        self.browser_manager = BrowserManager()
+        
+        if blocked_resource_types is None:
+            env_types = os.getenv("SCREENSHOT_BLOCKED_RESOURCE_TYPES")
+            blocked_resource_types = (
+                env_types.split(',') if env_types is not None
+                else DEFAULT_BLOCKED_RESOURCE_TYPES
+            )
+        self.blocked_resource_types = {
+            t.strip().lower() for t in blocked_resource_types if t.strip()
+        }
+        
+        if allowed_hosts is None:
+            env_hosts = os.getenv("SCREENSHOT_ALLOWED_HOSTS")
+            allowed_hosts = (
+                env_hosts.split(',') if env_hosts is not None
+                else DEFAULT_ALLOWED_HOSTS
+            )
+        self.allowed_hosts = {
+            h.strip().lower() for h in allowed_hosts if h.strip()
+        }
+        
+        # url/path -> (body, content_type, file stamp); shared by all
+        # captures, least recently used entries evicted past the size limit
+        if asset_cache_mb is None:
+            asset_cache_mb = int(os.getenv("SCREENSHOT_ASSET_CACHE_MB", "64"))
+        self.asset_cache_bytes = max(0, asset_cache_mb) * 1024 * 1024
+        self._asset_cache: "OrderedDict[str, Tuple[bytes, str, Any]]" = OrderedDict()
+        self._asset_cache_size = 0
+        
+        # Re-encodes captures for slides when an output size is requested
+        self.image_encoder = ImageEncoder()
+    
+    @staticmethod
+    def _capture_scale(
+        resolution: Tuple[int, int],
+        output_size: Optional[Tuple[int, int]],
+        transform: Optional[Dict[str, Any]]
+    ) -> float:
+        """Device scale factor that renders the viewport at the output size.
+        
+        The transform's crop and scale are accounted for so the region that
+        ends up on the slide still covers output_size; never scales above 1.
+        
+        Args:
+            resolution: CSS viewport (width, height)
+            output_size: Final (width, height) on the slide, if known
+            transform: Optional crop/scale dict applied after capture
+            
+        Returns:
+            Factor in (0, 1]
+        """
+        if not output_size:
+            return 1.0
+        transform = transform or {}
+        kept_width = 1 - (transform.get('cropLeft', 0) + transform.get('cropRight', 0)) / 100
+        kept_height = 1 - (transform.get('cropTop', 0) + transform.get('cropBottom', 0)) / 100
+        scale = transform.get('scale', 1.0)
+        if scale <= 0:
+            scale = 1.0
+        needed = max(
+            output_size[0] / max(resolution[0] * kept_width * scale, 1),
+            output_size[1] / max(resolution[1] * kept_height * scale, 1)
+        )
+        return min(1.0, round(needed, 3))
     
     def _get_content_selector(self, url: str) -> Optional[str]:
         """Get the content element selector for a given URL.
@@ -54,19 +171,111 @@ class ScreenshotService:
                 return self.CONTENT_SELECTORS[pattern]
         return None
         
+    def _resolve_local_asset(self, path: str) -> Optional[Path]:
+        """Map a same-origin request path to a file under a static mount.
+        
+        Returns None for anything that isn't a static asset or that would
+        escape the mount directory.
+        """
+        path = unquote(path)
+        if path == '/favicon.ico':
+            path = '/static/favicon.ico'
+        for prefix, directory in LOCAL_ASSET_DIRS.items():
+            if path.startswith(prefix):
+                candidate = (directory / path[len(prefix):]).resolve()
+                if directory.resolve() in candidate.parents and candidate.is_file():
+                    return candidate
+                return None
+        return None
+    
+    async def _route_request(self, route: Route, origin: str):
+        """Serve, fetch or block a request made while capturing.
+        
+        - Blocked resource types are aborted
+        - Same-origin /static and /public assets are served from disk (cached)
+        - Allowed off-origin hosts are fetched once and then served from memory
+        - Any other off-origin request is aborted
+        """
+        request = route.request
+        try:
+            if request.resource_type in self.blocked_resource_types:
+                await route.abort('blockedbyclient')
+                return
+            
+            parsed = urlparse(request.url)
+            if f"{parsed.scheme}://{parsed.netloc}" == origin:
+                local_file = self._resolve_local_asset(parsed.path)
+                if local_file is None:
+                    await route.continue_()
+                    return
+                # Edited files are re-read: entries are tied to mtime and size
+                stat = local_file.stat()
+                stamp = (stat.st_mtime_ns, stat.st_size)
+                key = str(local_file)
+                cached = self._cache_get(key, stamp)
+                if cached is None:
+                    content_type = (mimetypes.guess_type(local_file.name)[0]
+                                    or 'application/octet-stream')
+                    cached = (local_file.read_bytes(), content_type)
+                    self._cache_put(key, cached[0], content_type, stamp)
+                await route.fulfill(status=200, body=cached[0],
+                                    content_type=cached[1])
+                return
+            
+            if (parsed.hostname or '').lower() not in self.allowed_hosts:
+                logger.debug(f"Blocked off-origin request: {request.url}")
+                await route.abort('blockedbyclient')
+                return
+            
+            cached = self._cache_get(request.url)
+            if cached is None:
+                response = await route.fetch()
+                body = await response.body()
+                if response.ok and len(body) <= self.MAX_CACHED_ASSET_BYTES:
+                    content_type = response.headers.get(
+                        'content-type', 'application/octet-stream')
+                    self._cache_put(request.url, body, content_type)
+                await route.fulfill(response=response, body=body)
+                return
+            await route.fulfill(status=200, body=cached[0],
+                                content_type=cached[1])
+        except Exception as e:
+            logger.debug(f"Route handling failed for {request.url}: {e}")
+            try:
+                await route.abort('failed')
+            except Exception:
+                pass
+    
+    def _cache_get(self, key: str, stamp: Any = None) -> Optional[Tuple[bytes, str]]:
+        """Cached (body, content_type), or None if missing or stale."""
+        entry = self._asset_cache.get(key)
+        if entry is None:
+            return None
+        if entry[2] != stamp:
+            self._cache_drop(key)
+            return None
+        self._asset_cache.move_to_end(key)
+        return entry[0], entry[1]
+    
+    def _cache_put(self, key: str, body: bytes, content_type: str, stamp: Any = None):
+        """Cache an asset body, evicting least recently used entries."""
+        if len(body) > self.asset_cache_bytes:
+            return
+        self._cache_drop(key)
+        self._asset_cache[key] = (body, content_type, stamp)
+        self._asset_cache_size += len(body)
+        while self._asset_cache_size > self.asset_cache_bytes:
+            oldest = next(iter(self._asset_cache))
+            self._cache_drop(oldest)
+    
+    def _cache_drop(self, key: str):
+        entry = self._asset_cache.pop(key, None)
+        if entry is not None:
+            self._asset_cache_size -= len(entry[0])
+    
     async def _ensure_browser(self) -> Browser:
-        """Ensure browser is initialized."""
-        if self._browser is None or not self._browser.is_connected():
-            self._playwright = await async_playwright().start()
-            self._browser = await self._playwright.chromium.launch(
-                headless=True,
-                args=[
-                    '--no-sandbox',
-                    '--disable-dev-shm-usage',
-                    '--disable-gpu'
-                ]
-            )
-        return self._browser
+        """Ensure browser is initialized (one capture slot, see browser_manager)."""
+        return await self.browser_manager.acquire()
     
     async def capture_screenshot_async(
         self,
@@ -75,7 +284,10 @@ class ScreenshotService:
         resolution: Optional[Tuple[int, int]] = None,
         wait_for_selector: Optional[str] = None,
         extra_headers: Optional[Dict[str, str]] = None,
-        cookies: Optional[List[Dict]] = None
+        cookies: Optional[List[Dict]] = None,
+        output_size: Optional[Tuple[int, int]] = None,
+        transform: Optional[Dict[str, Any]] = None,
+        raise_on_error: bool = False
     ) -> bytes:
         """
         Asynchronously capture a screenshot of the specified URL.
@@ -88,23 +300,45 @@ class ScreenshotService:
             wait_for_selector: CSS selector to wait for before capturing
             extra_headers: Additional HTTP headers to send with the request
             cookies: List of cookie dicts to set before navigation
+            output_size: Final (width, height) the image will be placed at.
+                When set, the page is rasterized at about that size (see
+                _capture_scale) and re-encoded with image_encoder (format
+                and byte budget) in a single pass.
+            transform: Canvas crop/scale, applied in that same pass so the
+                lossy output is never decoded and encoded again
+            raise_on_error: Raise instead of returning a placeholder image,
+                for callers that must not mistake a placeholder for a capture
             
         Returns:
-            PNG image data as bytes
+            PNG image data as bytes (PNG or JPEG when output_size or
+            transform is set)
             
         Raises:
             PlaywrightTimeout: If the page takes too long to load
+                (only with raise_on_error)
         """
         if resolution is None:
             resolution = self.default_resolution
             
         browser = await self._ensure_browser()
         page = None
+        context = None
         
         try:
-            # Create new browser context with cookies if provided
+            # Lay the page out at the CSS viewport but rasterize it at the
+            # slide's size, so the capture is not downscaled afterwards
             context = await browser.new_context(
-                viewport={'width': resolution[0], 'height': resolution[1]}
+                viewport={'width': resolution[0], 'height': resolution[1]},
+                device_scale_factor=self._capture_scale(
+                    resolution, output_size, transform
+                )
+            )
+            
+            # Serve local assets from disk and block off-origin/unwanted requests
+            parsed_url = urlparse(url)
+            origin = f"{parsed_url.scheme}://{parsed_url.netloc}"
+            await context.route(
+                "**/*", lambda route: self._route_request(route, origin)
             )
             
             # Set cookies if provided (for authentication)
@@ -229,19 +463,37 @@ class ScreenshotService:
             if not screenshot:
                 screenshot = await page.screenshot(type='png', full_page=False)
             
+            if output_size or transform:
+                # Decode/resize/encode is CPU-bound; keep it off the event loop
+                raw_size = len(screenshot)
+                screenshot = await asyncio.to_thread(
+                    self.image_encoder.encode, screenshot, output_size, transform
+                )
+                logger.info(
+                    f"Encoded capture {raw_size} -> {len(screenshot)} bytes"
+                )
+            
             return screenshot
             
         except PlaywrightTimeout:
             logger.warning(f"Timeout capturing screenshot for {url}")
-            return self._create_placeholder_image(resolution)
+            if raise_on_error:
+                raise
+            return self._create_placeholder_image(output_size or resolution)
         except Exception as e:
             logger.error(f"Error capturing screenshot for {url}: {e}")
-            return self._create_placeholder_image(resolution)
+            if raise_on_error:
+                raise
+            return self._create_placeholder_image(output_size or resolution)
         finally:
-            if page:
-                await page.close()
-            if 'context' in locals() and context:
-                await context.close()
+            try:
+                if page:
+                    await page.close()
+                if context:
+                    await context.close()
+            except Exception as e:
+                logger.debug(f"Error closing capture context: {e}")
+            await self.browser_manager.release()
     
     def capture_screenshot(
         self,
@@ -264,8 +516,10 @@ class ScreenshotService:
             PNG image data as bytes
         """
         return asyncio.run(
-            self.capture_screenshot_async(
-                url, hide_navigation, resolution, wait_for_selector
+            self._run_and_close(
+                self.capture_screenshot_async(
+                    url, hide_navigation, resolution, wait_for_selector
+                )
             )
         )
     
@@ -327,11 +581,21 @@ class ScreenshotService:
             Dictionary mapping URLs to PNG image data
         """
         return asyncio.run(
-            self.capture_screenshots_parallel_async(
-                urls, hide_navigation, resolution
+            self._run_and_close(
+                self.capture_screenshots_parallel_async(
+                    urls, hide_navigation, resolution
+                )
             )
         )
     
+    async def _run_and_close(self, coro):
+        """Run a capture on a private event loop and close the browser after,
+        since it cannot outlive the loop created by asyncio.run()."""
+        try:
+            return await coro
+        finally:
+            await self.close()
+    
     async def _hide_navigation_elements(self, page: Page):
         """Hide navigation elements using JavaScript."""
         hide_script = """
@@ -363,20 +627,7 @@ class ScreenshotService:
     
     async def close(self):
         """Close browser and cleanup resources."""
-        if self._browser:
-            await self._browser.close()
-            self._browser = None
-        if self._playwright:
-            await self._playwright.stop()
-            self._playwright = None
-    
-    def __del__(self):
-        """Cleanup on deletion."""
-        if self._browser or self._playwright:
-            try:
-                asyncio.run(self.close())
-            except Exception:
-                pass
+        await self.browser_manager.close()
 
 
 # Additional helper functions for test compatibility
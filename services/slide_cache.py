@@ -0,0 +1,209 @@
+"""
+Slide Cache Service
+Remembers the captured screenshots of the previous deck for each report so an
+incremental export only re-captures slides whose fingerprint (view, data
+version, transform, template, viewport, hidden navigation) changed.
+"""
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import uuid
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+
+# Bump when what a cached capture contains changes (2: transform applied)
+CAPTURE_FORMAT_VERSION = 2
+
+
+def fingerprint_slide(
+    view: str,
+    data_version: str,
+    transform: Optional[Dict[str, Any]] = None,
+    template_version: Optional[str] = None,
+    viewport: Optional[Tuple[int, int]] = None,
+    hide_navigation: bool = False
+) -> str:
+    """
+    Fingerprint a slide spec; equal fingerprints render identical slides.
+
+    Args:
+        view: View URL the slide is captured from
+        data_version: Hash of the project data the view renders
+        transform: Canvas crop/scale applied to the capture
+        template_version: Template id/hash (decides the capture size)
+        viewport: Browser (width, height) the page is laid out at
+        hide_navigation: Whether navigation elements are hidden
+
+    Returns:
+        Hex digest
+    """
+    payload = json.dumps(
+        {"view": view, "data": data_version, "transform": transform or None,
+         "template": template_version, "format": CAPTURE_FORMAT_VERSION,
+         "viewport": list(viewport) if viewport else None,
+         "hide_navigation": hide_navigation},
+        sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def hash_data(*parts: Any) -> str:
+    """Stable content hash of JSON-serializable data (the data version)."""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+class SlideCache:
+    """Per-report store of the last deck's captures, keyed by fingerprint.
+
+    Exports of a report run between begin() and end(). While several exports
+    of the same report are in flight, captures any of them looked up or
+    stored are kept, so one export's commit cannot delete an image another
+    still needs. Only the most recently used reports are kept on disk.
+    """
+
+    def __init__(self, directory: Path, max_reports: int = None):
+        """
+        Initialize the cache.
+
+        Args:
+            directory: Root directory; each report gets a subdirectory
+            max_reports: Reports whose captures are kept
+                (SLIDE_CACHE_MAX_REPORTS, default 200)
+        """
+        if max_reports is None:
+            max_reports = int(os.getenv("SLIDE_CACHE_MAX_REPORTS", "200"))
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_reports = max(1, max_reports)
+        self._lock = threading.Lock()
+        # report_key -> number of exports in flight
+        self._in_flight: Dict[str, int] = {}
+        # report_key -> fingerprints used by the exports in flight
+        self._referenced: Dict[str, Set[str]] = {}
+
+    @staticmethod
+    def report_key(user_id: str, project_name: str, title: str) -> str:
+        """Identify "the same report" across weekly regenerations."""
+        return hashlib.sha256(f"{user_id}\0{project_name}\0{title}".encode()).hexdigest()[:24]
+
+    def begin(self, report_key: str):
+        """Register an export of a report; pair with end()."""
+        with self._lock:
+            self._in_flight[report_key] = self._in_flight.get(report_key, 0) + 1
+            self._referenced.setdefault(report_key, set())
+
+    def end(self, report_key: str):
+        """Mark an export started with begin() as finished (or failed)."""
+        with self._lock:
+            remaining = self._in_flight.get(report_key, 0) - 1
+            if remaining > 0:
+                self._in_flight[report_key] = remaining
+            else:
+                self._in_flight.pop(report_key, None)
+                self._referenced.pop(report_key, None)
+
+    def lookup(self, report_key: str, fingerprint: str) -> Optional[bytes]:
+        """
+        Get the previous deck's capture for a fingerprint.
+
+        Returns:
+            The cached image, or None if the slide changed
+        """
+        path = self._report_dir(report_key) / f"{fingerprint}.img"
+        with self._lock:
+            if fingerprint not in self._load_manifest(report_key):
+                return None
+            try:
+                data = path.read_bytes()
+            except OSError:
+                return None
+            self._reference(report_key, fingerprint)
+        return data
+
+    def store(self, report_key: str, fingerprint: str, image_path: Path):
+        """Keep a copy of a fresh capture for the next regeneration.
+
+        Only store real captures - never a placeholder for a failed one.
+        """
+        report_dir = self._report_dir(report_key)
+        report_dir.mkdir(parents=True, exist_ok=True)
+        target = report_dir / f"{fingerprint}.img"
+        with self._lock:
+            self._reference(report_key, fingerprint)
+            if target.exists():
+                return
+        temp_path = report_dir / f".{fingerprint}.{uuid.uuid4().hex[:8]}.tmp"
+        shutil.copyfile(image_path, temp_path)
+        temp_path.replace(target)
+
+    def commit(self, report_key: str, fingerprints: Iterable[str]):
+        """
+        Record the fingerprints used by the deck just built and drop the
+        captures it no longer references (unless another export of the
+        report in flight uses them). Least recently committed reports
+        beyond max_reports are removed.
+        """
+        keep = set(fingerprints)
+        report_dir = self._report_dir(report_key)
+        if not report_dir.exists():
+            return
+        with self._lock:
+            manifest_path = report_dir / MANIFEST_NAME
+            temp_path = manifest_path.with_suffix(".tmp")
+            temp_path.write_text(json.dumps(sorted(keep)))
+            temp_path.replace(manifest_path)
+
+            if self._in_flight.get(report_key, 0) > 1:
+                keep |= self._referenced.get(report_key, set())
+            for path in report_dir.glob("*.img"):
+                if path.stem not in keep:
+                    path.unlink(missing_ok=True)
+            self._evict_reports()
+
+    def _reference(self, report_key: str, fingerprint: str):
+        """Note a fingerprint used by an export in flight (lock held)."""
+        referenced = self._referenced.get(report_key)
+        if referenced is not None:
+            referenced.add(fingerprint)
+
+    def _evict_reports(self):
+        """Remove the least recently committed reports past max_reports
+        (lock held; reports with exports in flight are skipped)."""
+        reports = []
+        for report_dir in self.directory.iterdir():
+            if not report_dir.is_dir():
+                continue
+            try:
+                reports.append(((report_dir / MANIFEST_NAME).stat().st_mtime, report_dir))
+            except OSError:
+                reports.append((0.0, report_dir))
+        excess = len(reports) - self.max_reports
+        if excess <= 0:
+            return
+        for _, report_dir in sorted(reports, key=lambda r: r[0]):
+            if excess <= 0:
+                break
+            if report_dir.name in self._in_flight:
+                continue
+            shutil.rmtree(report_dir, ignore_errors=True)
+            excess -= 1
+            logger.info(f"🗑️ Evicted slide cache of report {report_dir.name}")
+
+    def _load_manifest(self, report_key: str) -> set:
+        """Fingerprints of the previous deck."""
+        manifest_path = self._report_dir(report_key) / MANIFEST_NAME
+        try:
+            return set(json.loads(manifest_path.read_text()))
+        except (OSError, ValueError):
+            return set()
+
+    def _report_dir(self, report_key: str) -> Path:
+        return self.directory / report_key
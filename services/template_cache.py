@@ -0,0 +1,176 @@
+"""
+Template Cache Service
+Keeps uploaded PowerPoint templates parsed, validated and stripped of their
+content slides as serialized bytes, so each export starts from a cheap copy.
+"""
+from collections import OrderedDict
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, Tuple
+import hashlib
+import logging
+import threading
+
+from pptx import Presentation
+
+logger = logging.getLogger(__name__)
+
+
+class TemplateCache:
+    """LRU cache of prepared templates keyed by (template id, file hash)."""
+
+    def __init__(self, max_entries: int = 16):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Prepared templates kept in memory
+        """
+        self.max_entries = max_entries
+        # (template_id, sha256, keep_title_slide) -> prepared pptx bytes
+        self._entries: "OrderedDict[Tuple[str, str, bool], bytes]" = OrderedDict()
+        # (path, mtime_ns, size) -> sha256, so unchanged files aren't rehashed
+        self._hashes: Dict[Tuple[str, int, int], str] = {}
+        # (template_id, sha256) -> (slide width, slide height) in EMU
+        self._slide_sizes: Dict[Tuple[str, str], Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_prepared(self, template_path: str, keep_title_slide: bool = True) -> bytes:
+        """
+        Get the template with its content slides removed, as pptx bytes.
+
+        Args:
+            template_path: Path to the uploaded .pptx template
+            keep_title_slide: Keep the template's first slide
+
+        Returns:
+            Prepared template bytes (open with Presentation(BytesIO(...)))
+
+        Raises:
+            ValueError: If the template is not a valid presentation
+        """
+        path = Path(template_path)
+        template_id = path.stem
+        key = (template_id, self.file_hash(path), keep_title_slide)
+
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        prepared, slide_size = self._prepare(path, keep_title_slide)
+
+        with self._lock:
+            # A changed file hash means the old entries for this id are stale
+            for stale in [k for k in self._entries if k[0] == template_id and k[1] != key[1]]:
+                del self._entries[stale]
+            for stale in [k for k in self._slide_sizes if k[0] == template_id and k[1] != key[1]]:
+                del self._slide_sizes[stale]
+            self._entries[key] = prepared
+            self._slide_sizes[key[:2]] = slide_size
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        logger.info(f"📦 Cached prepared template {template_id} ({len(prepared)} bytes)")
+        return prepared
+
+    def get_slide_size(self, template_path: str) -> Tuple[int, int]:
+        """
+        Slide size of a template, read when it is prepared (no re-parse).
+
+        Args:
+            template_path: Path to the uploaded .pptx template
+
+        Returns:
+            (width, height) in EMU
+
+        Raises:
+            ValueError: If the template is not a valid presentation
+        """
+        path = Path(template_path)
+        key = (path.stem, self.file_hash(path))
+        with self._lock:
+            size = self._slide_sizes.get(key)
+        if size is None:
+            self.get_prepared(template_path)
+            with self._lock:
+                size = self._slide_sizes.get(key)
+        if size is None:
+            # Invalidated in between; read it directly
+            size = self._prepare(path, True)[1]
+        return size
+
+    def invalidate(self, template_id: str) -> int:
+        """
+        Drop all cached entries for a template (re-upload or delete).
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            stale = [k for k in self._entries if k[0] == template_id]
+            for key in stale:
+                del self._entries[key]
+            for size_key in [k for k in self._slide_sizes if k[0] == template_id]:
+                del self._slide_sizes[size_key]
+            for stat_key in [k for k in self._hashes if Path(k[0]).stem == template_id]:
+                del self._hashes[stat_key]
+        if stale:
+            logger.info(f"🗑️ Invalidated {len(stale)} cached template(s) for {template_id}")
+        return len(stale)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Cache size and hit/miss counters."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": sum(len(v) for v in self._entries.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def file_hash(self, path: Path) -> str:
+        """SHA-256 of the template file, memoized by path, mtime and size."""
+        stat = path.stat()
+        stat_key = (str(path), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            digest = self._hashes.get(stat_key)
+        if digest is None:
+            digest = hashlib.sha256(path.read_bytes()).hexdigest()
+            with self._lock:
+                self._hashes[stat_key] = digest
+        return digest
+
+    def _prepare(self, path: Path, keep_title_slide: bool) -> Tuple[bytes, Tuple[int, int]]:
+        """Parse, validate and strip content slides from a template.
+
+        Returns:
+            (prepared pptx bytes, (slide width, slide height) in EMU)
+        """
+        try:
+            presentation = Presentation(str(path))
+            _ = presentation.slides
+            if not presentation.slide_layouts:
+                raise ValueError("Template has no slide layouts")
+        except Exception as e:
+            raise ValueError(f"Invalid template format: {str(e)}")
+
+        # Remove content slides in reverse order (optionally keep the first)
+        start_idx = 1 if keep_title_slide else 0
+        slide_ids = presentation.slides._sldIdLst
+        for idx in reversed(range(start_idx, len(slide_ids))):
+            presentation.part.drop_rel(slide_ids[idx].rId)
+            del slide_ids[idx]
+
+        output = BytesIO()
+        presentation.save(output)
+        return output.getvalue(), (presentation.slide_width, presentation.slide_height)
+
+
+# Shared by the builder and the template upload/delete endpoints
+template_cache = TemplateCache()
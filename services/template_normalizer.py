@@ -0,0 +1,175 @@
+"""
+Template Normalizer Service
+Shrinks uploaded PowerPoint templates at ingest: drops sample slides, layouts
+and slide masters exports never use, merges duplicate media and recompresses
+oversized images. The normalized copy is stored next to the original and used
+for exports, so every generated deck carries less dead weight.
+"""
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Dict
+import logging
+import os
+
+from pptx import Presentation
+from pptx.parts.image import ImagePart
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# The builder picks layouts by index (0 title, 1/5 content, 5/6 blank), so the
+# first seven layouts of the first master must keep their positions
+BUILDER_LAYOUT_COUNT = 7
+
+
+def normalized_path(template_path: Path) -> Path:
+    """Where the normalized copy of an uploaded template is stored."""
+    template_path = Path(template_path)
+    return template_path.parent / "normalized" / template_path.name
+
+
+class TemplateNormalizer:
+    """Produce a slimmed-down copy of a template that exports identically."""
+
+    def __init__(self, max_media_bytes: int = None, max_media_px: int = None):
+        """
+        Initialize the normalizer.
+
+        Args:
+            max_media_bytes: Images larger than this are recompressed
+                (TEMPLATE_MAX_MEDIA_KB, default 512)
+            max_media_px: Longest side recompressed images are scaled to
+                (TEMPLATE_MAX_MEDIA_PX, default 2560)
+        """
+        if max_media_bytes is None:
+            max_media_bytes = int(os.getenv("TEMPLATE_MAX_MEDIA_KB", "512")) * 1024
+        if max_media_px is None:
+            max_media_px = int(os.getenv("TEMPLATE_MAX_MEDIA_PX", "2560"))
+        self.max_media_bytes = max_media_bytes
+        self.max_media_px = max_media_px
+
+    def normalize(self, source_path: Path, output_path: Path) -> Dict[str, Any]:
+        """
+        Write a normalized copy of a template.
+
+        The template's first slide is kept (exports reuse it as the cover),
+        the remaining sample slides are removed.
+
+        Args:
+            source_path: Uploaded .pptx
+            output_path: Where to save the normalized .pptx
+
+        Returns:
+            Report with original/normalized sizes, bytes saved and counts of
+            removed slides, layouts, masters and merged/recompressed media
+        """
+        source_path, output_path = Path(source_path), Path(output_path)
+        prs = Presentation(str(source_path))
+
+        report = {
+            "removed_slides": self._strip_sample_slides(prs),
+            "removed_layouts": self._strip_unused_layouts(prs),
+            "removed_masters": self._strip_unused_masters(prs),
+            "deduplicated_media": self._dedupe_media(prs),
+            "recompressed_media": self._recompress_media(prs),
+        }
+
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = output_path.with_name(output_path.name + ".tmp")
+        prs.save(str(temp_path))
+        os.replace(temp_path, output_path)
+
+        report["original_bytes"] = source_path.stat().st_size
+        report["normalized_bytes"] = output_path.stat().st_size
+        report["saved_bytes"] = report["original_bytes"] - report["normalized_bytes"]
+        logger.info(
+            f"🗜️ Normalized {source_path.name}: {report['original_bytes']} -> "
+            f"{report['normalized_bytes']} bytes ({report['removed_slides']} slides, "
+            f"{report['removed_layouts']} layouts, {report['removed_masters']} masters removed; "
+            f"{report['deduplicated_media']} media merged, "
+            f"{report['recompressed_media']} recompressed)"
+        )
+        return report
+
+    @staticmethod
+    def _strip_sample_slides(prs) -> int:
+        """Remove every slide after the first."""
+        slide_ids = prs.slides._sldIdLst
+        removed = 0
+        for idx in reversed(range(1, len(slide_ids))):
+            prs.part.drop_rel(slide_ids[idx].rId)
+            del slide_ids[idx]
+            removed += 1
+        return removed
+
+    @staticmethod
+    def _strip_unused_layouts(prs) -> int:
+        """Remove first-master layouts past the ones the builder indexes,
+        unless the remaining slide is based on them."""
+        layouts = prs.slide_masters[0].slide_layouts
+        removed = 0
+        for layout in list(layouts)[BUILDER_LAYOUT_COUNT:]:
+            if not layout.used_by_slides:
+                layouts.remove(layout)
+                removed += 1
+        return removed
+
+    @staticmethod
+    def _strip_unused_masters(prs) -> int:
+        """Remove slide masters after the first whose layouts no slide uses."""
+        master_ids = prs.part._element.sldMasterIdLst
+        removed = 0
+        for idx in reversed(range(1, len(master_ids))):
+            master = prs.slide_masters[idx]
+            if any(layout.used_by_slides for layout in master.slide_layouts):
+                continue
+            rId = master_ids[idx].rId
+            master_ids.remove(master_ids[idx])
+            prs.part.drop_rel(rId)
+            removed += 1
+        return removed
+
+    @staticmethod
+    def _dedupe_media(prs) -> int:
+        """Point every relationship to byte-identical images at one part."""
+        canonical: Dict[str, ImagePart] = {}
+        merged = set()
+        for part in prs.part.package.iter_parts():
+            for rel in part.rels.values():
+                if rel.is_external or not isinstance(rel.target_part, ImagePart):
+                    continue
+                image_part = rel.target_part
+                first = canonical.setdefault(image_part.sha1, image_part)
+                if first is not image_part:
+                    rel._target = first
+                    merged.add(image_part.partname)
+        return len(merged)
+
+    def _recompress_media(self, prs) -> int:
+        """Downscale/re-encode oversized images, keeping their format."""
+        recompressed = 0
+        for part in prs.part.package.iter_parts():
+            if not isinstance(part, ImagePart) or len(part.blob) <= self.max_media_bytes:
+                continue
+            try:
+                image = Image.open(BytesIO(part.blob))
+                image_format = image.format
+                if image_format not in ("PNG", "JPEG"):
+                    continue
+                if max(image.size) > self.max_media_px:
+                    image.thumbnail((self.max_media_px, self.max_media_px), Image.Resampling.LANCZOS)
+                buffer = BytesIO()
+                if image_format == "JPEG":
+                    image.convert("RGB").save(buffer, "JPEG", quality=85, optimize=True)
+                else:
+                    image.save(buffer, "PNG", optimize=True)
+                if buffer.tell() < len(part.blob):
+                    part._blob = buffer.getvalue()
+                    recompressed += 1
+            except Exception as e:
+                logger.warning(f"Could not recompress {part.partname}: {e}")
+        return recompressed
+
+
+# Shared by the template upload endpoint
+template_normalizer = TemplateNormalizer()
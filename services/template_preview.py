@@ -0,0 +1,333 @@
+"""
+Template Preview Service
+Renders PowerPoint template previews (slide master plus one layout drawn
+with PIL) once per template content and layout, at several sizes, in the
+background after upload. Previews are keyed by the template's content hash
+and layout index so they can be served as immutable assets; they carry
+nothing else (such as the template's name) that could differ between
+uploads of the same file.
+"""
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, Tuple
+import logging
+import os
+import re
+import tempfile
+import zipfile
+
+from pptx import Presentation
+from pptx.enum.shapes import MSO_SHAPE_TYPE
+from PIL import Image, ImageDraw, ImageFont
+
+logger = logging.getLogger(__name__)
+
+PREVIEW_SIZES: Dict[str, Tuple[int, int]] = {
+    "full": (1920, 1080),
+    "medium": (960, 540),
+    "thumb": (320, 180),
+}
+
+ASSET_NAME_PATTERN = re.compile(r"^[0-9a-f]{16}_layout\d+_(" + "|".join(PREVIEW_SIZES) + r")\.png$")
+
+
+def select_layout_index(prs) -> int:
+    """Layout shown as a template's main preview (first content layout if any)."""
+    # Try to find a good content layout (skip cover pages)
+    for i, layout in enumerate(prs.slide_layouts):
+        if any(x in layout.name.lower() for x in ['content', 'text', 'title_text', 'white']):
+            return i
+    return 0
+
+
+def render_template_preview(template_path: Path, prs, layout_idx: int) -> Image.Image:
+    """Render the slide master and one layout of a template at 1920x1080.
+    
+    Dynamically renders all visual elements from the template including:
+    - All images (logos, graphics) at their actual positions
+    - Shape outlines and fills
+    - Placeholder areas (title, content, footer)
+    - Lines and separators
+    """
+    # Scale factors: slide EMU to 1920x1080 pixels
+    px_per_emu_x = 1920 / prs.slide_width
+    px_per_emu_y = 1080 / prs.slide_height
+    
+    def to_px(left, top, width, height):
+        return (
+            int(left * px_per_emu_x),
+            int(top * px_per_emu_y),
+            int(width * px_per_emu_x),
+            int(height * px_per_emu_y)
+        )
+    
+    # Create white base image
+    img = Image.new('RGBA', (1920, 1080), color=(255, 255, 255, 255))
+    draw = ImageDraw.Draw(img)
+    
+    # Load all images from the PPTX media folder
+    media_images = {}
+    with zipfile.ZipFile(template_path, 'r') as zf:
+        for name in zf.namelist():
+            if name.startswith('ppt/media/') and any(name.endswith(ext) for ext in ['.png', '.jpg', '.jpeg', '.gif']):
+                try:
+                    with zf.open(name) as f:
+                        media_images[name.split('/')[-1]] = Image.open(BytesIO(f.read())).copy()
+                except:
+                    pass
+    
+    logger.info(f"Loaded {len(media_images)} media images from template")
+    
+    # Get fonts
+    try:
+        font_title = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 28)
+        font_normal = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 16)
+        font_small = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 12)
+    except:
+        font_title = font_normal = font_small = ImageFont.load_default()
+    
+    # Function to render shapes from a shape collection
+    def render_shapes(shapes, is_master=False):
+        for shape in shapes:
+            left_px, top_px, width_px, height_px = to_px(
+                shape.left, shape.top, shape.width, shape.height
+            )
+            
+            # Skip off-screen elements
+            if left_px > 1920 or top_px > 1080:
+                continue
+            if width_px < 2 or height_px < 2:
+                continue
+            
+            shape_type = shape.shape_type
+            name = shape.name.lower()
+            
+            # Render PICTURES (logos, graphics)
+            if shape_type == MSO_SHAPE_TYPE.PICTURE:
+                try:
+                    # Try to get the image blob
+                    if hasattr(shape, 'image') and shape.image:
+                        pic_data = shape.image.blob
+                        pic_img = Image.open(BytesIO(pic_data))
+                        
+                        # Resize to match shape dimensions
+                        pic_img = pic_img.resize((max(1, width_px), max(1, height_px)), Image.Resampling.LANCZOS)
+                        
+                        if pic_img.mode != 'RGBA':
+                            pic_img = pic_img.convert('RGBA')
+                        
+                        # Paste with alpha if available
+                        img.paste(pic_img, (left_px, top_px), pic_img)
+                        logger.info(f"Rendered picture: {shape.name} at ({left_px}, {top_px})")
+                except Exception as e:
+                    # Draw placeholder for failed images
+                    draw.rectangle([(left_px, top_px), (left_px + width_px, top_px + height_px)],
+                                  outline=(200, 200, 210), width=1)
+            
+            # Render LINES
+            elif shape_type == MSO_SHAPE_TYPE.LINE:
+                draw.line([(left_px, top_px), (left_px + width_px, top_px + height_px)],
+                         fill=(180, 185, 195), width=2)
+            
+            # Render AUTO_SHAPES (rectangles, etc.)
+            elif shape_type == MSO_SHAPE_TYPE.AUTO_SHAPE:
+                # Check for fill
+                fill_color = None
+                try:
+                    if hasattr(shape, 'fill') and shape.fill.type is not None:
+                        if hasattr(shape.fill, 'fore_color') and shape.fill.fore_color:
+                            rgb = shape.fill.fore_color.rgb
+                            if rgb:
+                                fill_color = (rgb[0], rgb[1], rgb[2], 50)  # Semi-transparent
+                except:
+                    pass
+                
+                if fill_color:
+                    overlay = Image.new('RGBA', (width_px, height_px), fill_color)
+                    img.paste(overlay, (left_px, top_px), overlay)
+                
+                # Draw outline
+                draw.rectangle([(left_px, top_px), (left_px + width_px, top_px + height_px)],
+                              outline=(210, 215, 225), width=1)
+            
+            # Render PLACEHOLDERS (title, content, footer areas)
+            elif shape_type == MSO_SHAPE_TYPE.PLACEHOLDER:
+                # Determine placeholder type from name
+                is_title = 'titre' in name or 'title' in name
+                is_content = 'texte' in name or 'content' in name or 'text' in name
+                is_footer = 'pied' in name or 'footer' in name
+                
+                if is_title:
+                    # Title area - light blue tint
+                    overlay = Image.new('RGBA', (width_px, height_px), (230, 240, 255, 80))
+                    img.paste(overlay, (left_px, top_px), overlay)
+                    draw.rectangle([(left_px, top_px), (left_px + width_px, top_px + height_px)],
+                                  outline=(150, 180, 220), width=2)
+                    draw.text((left_px + 10, top_px + 5), "TITLE AREA", fill=(120, 150, 190), font=font_small)
+                
+                elif is_content and height_px > 200:
+                    # Content area - dashed border
+                    for i in range(left_px, left_px + width_px, 15):
+                        draw.line([(i, top_px), (min(i+8, left_px + width_px), top_px)], fill=(200, 210, 225), width=1)
+                        draw.line([(i, top_px + height_px), (min(i+8, left_px + width_px), top_px + height_px)], fill=(200, 210, 225), width=1)
+                    for i in range(top_px, top_px + height_px, 15):
+                        draw.line([(left_px, i), (left_px, min(i+8, top_px + height_px))], fill=(200, 210, 225), width=1)
+                        draw.line([(left_px + width_px, i), (left_px + width_px, min(i+8, top_px + height_px))], fill=(200, 210, 225), width=1)
+                    # Label
+                    label = "CONTENT AREA - Place your screenshot here"
+                    bbox = draw.textbbox((0, 0), label, font=font_normal)
+                    lx = left_px + (width_px - (bbox[2] - bbox[0])) // 2
+                    ly = top_px + (height_px - (bbox[3] - bbox[1])) // 2
+                    draw.text((lx, ly), label, fill=(180, 190, 210), font=font_normal)
+                
+                elif is_footer:
+                    # Footer area - subtle gray
+                    overlay = Image.new('RGBA', (width_px, height_px), (245, 245, 250, 100))
+                    img.paste(overlay, (left_px, top_px), overlay)
+                    draw.line([(left_px, top_px), (left_px + width_px, top_px)], fill=(220, 225, 235), width=1)
+            
+            # Render GROUPS (may contain multiple elements)
+            elif shape_type == MSO_SHAPE_TYPE.GROUP:
+                # Draw group boundary
+                draw.rectangle([(left_px, top_px), (left_px + width_px, top_px + height_px)],
+                              outline=(190, 200, 215), width=1)
+            
+            # Render TEXT_BOX
+            elif shape_type == MSO_SHAPE_TYPE.TEXT_BOX:
+                if hasattr(shape, 'text') and shape.text.strip():
+                    # Small text boxes with content (like confidentiality marks)
+                    draw.rectangle([(left_px, top_px), (left_px + width_px, top_px + height_px)],
+                                  fill=(250, 250, 252), outline=(230, 235, 245), width=1)
+    
+    # Render slide master elements (persistent across all slides)
+    logger.info("Rendering slide master elements...")
+    render_shapes(prs.slide_master.shapes, is_master=True)
+    
+    # Render the selected slide layout
+    if layout_idx < len(prs.slide_layouts):
+        logger.info(f"Rendering slide layout: {prs.slide_layouts[layout_idx].name}")
+        render_shapes(prs.slide_layouts[layout_idx].shapes)
+    
+    return img.convert('RGB')
+
+
+def render_placeholder_preview() -> Image.Image:
+    """Styled placeholder used when a template cannot be rendered."""
+    img = Image.new('RGB', (1920, 1080), color=(250, 250, 252))
+    draw = ImageDraw.Draw(img)
+    
+    try:
+        font_large = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 36)
+        font_small = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 24)
+    except:
+        font_large = ImageFont.load_default()
+        font_small = ImageFont.load_default()
+    
+    # Draw a subtle header area
+    draw.rectangle([(0, 0), (1920, 80)], fill=(245, 245, 250))
+    draw.line([(0, 80), (1920, 80)], fill=(220, 220, 225), width=1)
+    
+    # Draw header title
+    draw.text((30, 25), "Template preview unavailable", fill=(60, 60, 70), font=font_large)
+    
+    # Draw content area placeholder with dashed border
+    for i in range(0, 1840, 20):
+        draw.line([(40 + i, 100), (min(50 + i, 1880), 100)], fill=(200, 200, 210), width=1)
+        draw.line([(40 + i, 1040), (min(50 + i, 1880), 1040)], fill=(200, 200, 210), width=1)
+    
+    # Draw "Content Area" text
+    text = "Drag your content here"
+    bbox = draw.textbbox((0, 0), text, font=font_small)
+    x = (1920 - (bbox[2] - bbox[0])) // 2
+    draw.text((x, 560), text, fill=(180, 180, 180), font=font_small)
+    
+    return img
+
+
+class TemplatePreviewService:
+    """Pre-renders and locates template previews keyed by content hash."""
+
+    def __init__(self, preview_dir: Path):
+        """
+        Initialize the service.
+
+        Args:
+            preview_dir: Directory the preview PNGs are written to
+        """
+        self.preview_dir = Path(preview_dir)
+        self.preview_dir.mkdir(parents=True, exist_ok=True)
+        # Main preview layout per content hash
+        self._default_layouts: Dict[str, int] = {}
+
+    @staticmethod
+    def asset_name(content_hash: str, layout_index: int, size: str) -> str:
+        """File name of a preview; changes whenever the template content does."""
+        return f"{content_hash[:16]}_layout{layout_index}_{size}.png"
+
+    def get_path(self, content_hash: str, layout_index: int, size: str = "full") -> Path:
+        """Path of a preview (it may not be rendered yet)."""
+        return self.preview_dir / self.asset_name(content_hash, layout_index, size)
+
+    def default_layout(self, template_path: Path, content_hash: str) -> int:
+        """Index of the layout shown as the template's main preview."""
+        layout_idx = self._default_layouts.get(content_hash)
+        if layout_idx is None:
+            try:
+                layout_idx = select_layout_index(Presentation(template_path))
+            except Exception as e:
+                logger.warning(f"Could not read layouts of {Path(template_path).name}: {e}")
+                layout_idx = 0
+            self._default_layouts[content_hash] = layout_idx
+        return layout_idx
+
+    def render_all(self, template_path: Path, content_hash: str) -> int:
+        """
+        Render a preview of every layout of a template at every size.
+
+        Each layout is rendered once. If the template cannot be read, a
+        placeholder is written in place of its main preview. Meant to run as
+        a background task right after upload.
+
+        Returns:
+            Number of preview files written
+        """
+        template_path = Path(template_path)
+        renders: Dict[int, Image.Image] = {}
+        try:
+            prs = Presentation(template_path)
+            self._default_layouts[content_hash] = select_layout_index(prs)
+            for layout_idx in range(len(prs.slide_layouts)):
+                renders[layout_idx] = render_template_preview(template_path, prs, layout_idx)
+        except Exception as e:
+            logger.error(f"Failed to generate preview from PPTX: {e}")
+            renders = {self._default_layouts.get(content_hash, 0): render_placeholder_preview()}
+
+        written = 0
+        for layout_idx, full_image in renders.items():
+            for size, dimensions in PREVIEW_SIZES.items():
+                image = full_image if dimensions == full_image.size else full_image.resize(
+                    dimensions, Image.Resampling.LANCZOS)
+                buffer = BytesIO()
+                image.save(buffer, 'PNG', optimize=True)
+                self._write(self.get_path(content_hash, layout_idx, size), buffer.getvalue())
+                written += 1
+
+        logger.info(f"🖼️ Rendered {written} previews for {template_path.name} ({content_hash[:16]})")
+        return written
+
+    def delete(self, content_hash: str) -> int:
+        """Delete all previews of a template content hash."""
+        deleted = 0
+        self._default_layouts.pop(content_hash, None)
+        for path in self.preview_dir.glob(f"{content_hash[:16]}_*.png"):
+            path.unlink(missing_ok=True)
+            deleted += 1
+        return deleted
+
+    @staticmethod
+    def _write(path: Path, data: bytes):
+        """Write atomically so a concurrent request never sees a partial PNG."""
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with open(fd, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
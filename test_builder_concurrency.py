@@ -0,0 +1,94 @@
+"""
+Concurrency stress test for PowerPoint generation
+Runs many generate_hybrid_presentation calls at once and checks that every
+deck is valid and contains only its own content
+"""
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+from pptx import Presentation
+
+from services.builder_service import create_builder
+
+NUM_EXPORTS = 8
+
+
+def _png(color) -> bytes:
+    buffer = io.BytesIO()
+    Image.new('RGB', (400, 300), color=color).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def _build_export(idx: int) -> bytes:
+    """Generate one deck whose every slide carries a marker unique to idx."""
+    marker = f"EXPORT-{idx:02d}"
+    risks = [
+        {
+            'id': f"{marker}-R{n:03d}",
+            'title': f"{marker} risk {n}",
+            'mitigation': 'Monitor',
+            'severity_normalized': 'high',
+            'status': 'open',
+            'owner': 'Owner A',
+            'likelihood': 3,
+            'impact': 3,
+        }
+        for n in range(1, 9)
+    ]
+    tasks = [
+        {
+            'Task': f"{marker} milestone {n}",
+            'Start': f"2025-0{n}-01",
+            'Finish': f"2025-0{n}-15",
+            'Resource': marker,
+            'Status': 'IN_PROGRESS',
+        }
+        for n in range(1, 7)
+    ]
+    slides_data = [
+        {'type': 'risks', 'data': risks, 'title': f"Risk Register: {marker}",
+         'page_num': 1, 'total_pages': 1},
+        {'type': 'gantt', 'data': tasks, 'title': f"Gantt Chart: {marker}"},
+        {'type': 'screenshot', 'data': _png((idx * 30, 100, 150)), 'title': f"Dashboard: {marker}"},
+    ]
+    report_data = {'title': f"Report {marker}", 'include_title_slide': True}
+    return create_builder().generate_hybrid_presentation(report_data, slides_data)
+
+
+def _slide_text(slide) -> str:
+    parts = []
+    for shape in slide.shapes:
+        if shape.has_text_frame:
+            parts.append(shape.text_frame.text)
+        if shape.has_table:
+            for row in shape.table.rows:
+                parts.extend(cell.text for cell in row.cells)
+    return '\n'.join(parts)
+
+
+def test_concurrent_hybrid_presentations_are_independent():
+    """Concurrent builds must not leak slides or state between exports"""
+    with ThreadPoolExecutor(max_workers=NUM_EXPORTS) as pool:
+        outputs = list(pool.map(_build_export, range(NUM_EXPORTS)))
+
+    for idx, pptx_bytes in enumerate(outputs):
+        prs = Presentation(io.BytesIO(pptx_bytes))
+        # Title + risk table + gantt + screenshot
+        assert len(prs.slides) == 4
+
+        deck_text = '\n'.join(_slide_text(slide) for slide in prs.slides)
+        assert f"Report EXPORT-{idx:02d}" in deck_text
+        assert f"EXPORT-{idx:02d}-R008" in deck_text
+        assert f"EXPORT-{idx:02d} milestone 6" in deck_text
+        for other in range(NUM_EXPORTS):
+            if other != idx:
+                assert f"EXPORT-{other:02d}" not in deck_text
+
+
+def test_create_builder_returns_independent_instances():
+    """Each export gets its own builder state"""
+    first, second = create_builder(), create_builder()
+    assert first is not second
+    first.generate_hybrid_presentation({'title': 'A'}, [])
+    assert second.presentation is None
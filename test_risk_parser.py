@@ -0,0 +1,132 @@
+"""
+Risk spreadsheet parsing test
+Checks the column-wise Excel/CSV normalization against the per-value rules
+(normalize_level, calculate_severity) and the defaults for empty cells
+"""
+import io
+
+import pandas as pd
+
+from services.risk_parser import RiskParser
+
+
+LEVELS = ['H', 'high', ' Medium ', 'm', 'L', 'low', 3, 2, 1, '3', None, 'x', 'Critical', 'minor', 0]
+
+
+def _sheet():
+    rows = []
+    for n in range(len(LEVELS) * 2):
+        rows.append({
+            'Risk ID': None if n % 5 == 0 else ('R001' if n == 7 else f"R{n + 100}"),
+            'Title': None if n == 3 else f"Risk {n}",
+            'Description': None if n % 2 else f"Description {n}",
+            'Likelihood': LEVELS[n % len(LEVELS)],
+            'Impact': LEVELS[(n * 7) % len(LEVELS)],
+            'Owner': None if n % 4 == 0 else 'Ann',
+            'Date': None if n == 2 else ('not a date' if n == 6 else '2025-01-15'),
+            'Status': None if n == 1 else 'CLOSED',
+            'Category': 'Supply Chain',
+        })
+    return pd.DataFrame(rows)
+
+
+def _check(risks, df):
+    rows = df[df['Title'].notna()].reset_index()
+    assert len(risks) == len(rows)
+
+    ids = [risk['id'] for risk in risks]
+    assert len(set(ids)) == len(ids)
+
+    for risk, (_, row) in zip(risks, rows.iterrows()):
+        likelihood = RiskParser.normalize_level(row['Likelihood'])
+        impact = RiskParser.normalize_level(row['Impact'])
+        assert risk['likelihood'] == likelihood
+        assert risk['impact'] == impact
+        assert risk['severity_normalized'] == RiskParser.calculate_severity(likelihood, impact)
+        assert risk['title'] == row['Title']
+        assert risk['description'] == ('' if pd.isna(row['Description']) else row['Description'])
+        assert risk['owner'] == ('Unassigned' if pd.isna(row['Owner']) else 'Ann')
+        assert risk['status'] == ('open' if pd.isna(row['Status']) else 'closed')
+        assert risk['category'] == 'supply chain'
+        assert risk['project'] == ''
+        if row['index'] % 5 == 0:
+            assert risk['id'] == f"R{str(row['index'] + 1).zfill(3)}"
+        if pd.isna(row['Date']) or row['Date'] == 'not a date':
+            assert not risk['date_identified'].startswith('2025-01-15')
+        else:
+            assert risk['date_identified'] == '2025-01-15T00:00:00'
+
+
+def _without_now(risk):
+    if risk['date_identified'].startswith('2025-01-15'):
+        return risk
+    return {key: value for key, value in risk.items() if key != 'date_identified'}
+
+
+def test_parse_excel_column_wise():
+    df = _sheet()
+    buffer = io.BytesIO()
+    df.to_excel(buffer, index=False)
+    _check(RiskParser.parse_excel(buffer.getvalue()), df)
+
+
+def test_parse_csv_column_wise():
+    df = _sheet()
+    _check(RiskParser.parse_csv(df.to_csv(index=False).encode()), df)
+
+
+def test_workbook_reader_streams_like_parse_excel():
+    """Chunked read-only reading matches parse_excel, across sheets and banners"""
+    from openpyxl import Workbook
+    from services.risk_workbook_reader import RiskWorkbookReader
+
+    df = _sheet()
+    buffer = io.BytesIO()
+    df.to_excel(buffer, index=False)
+    reader = RiskWorkbookReader(chunk_size=4)
+    streamed = [risk for chunk in reader.iter_chunks(io.BytesIO(buffer.getvalue())) for risk in chunk]
+    # Empty dates get the import time, which differs between the two parses
+    assert [_without_now(risk) for risk in streamed] == \
+        [_without_now(risk) for risk in RiskParser.parse_excel(buffer.getvalue())]
+
+    workbook = Workbook()
+    workbook.active.title = 'Summary'
+    workbook.active.append(['Program', 'Total'])
+    for name in ('Risks Open', 'Risks Closed'):
+        worksheet = workbook.create_sheet(name)
+        worksheet.append(['Risk Register'])
+        worksheet.append([])
+        worksheet.append(['ID', 'Title', 'Likelihood', 'Impact'])
+        for n in range(3):
+            worksheet.append([f"R{n + 1:03d}", f"{name} {n}", 'H', 'L'])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+
+    first = [risk for chunk in reader.iter_chunks(io.BytesIO(buffer.getvalue())) for risk in chunk]
+    assert [risk['title'] for risk in first] == ['Risks Open 0', 'Risks Open 1', 'Risks Open 2']
+    assert first[0]['severity_normalized'] == 'medium'
+
+    shares = []
+    both = [
+        risk for chunk in reader.iter_chunks(io.BytesIO(buffer.getvalue()), sheet='risks*', progress=shares.append)
+        for risk in chunk
+    ]
+    assert len(both) == 6
+    assert len({risk['id'] for risk in both}) == 6
+    assert shares == sorted(shares) and shares[-1] == 1.0
+
+
+def test_csv_reader_streams_like_parse_csv():
+    """Chunked CSV reading matches parse_csv"""
+    from services.risk_workbook_reader import RiskWorkbookReader
+
+    df = _sheet()
+    content = df.to_csv(index=False).encode()
+    shares = []
+    chunks = list(RiskWorkbookReader(chunk_size=4).iter_csv_chunks(io.BytesIO(content), progress=shares.append))
+    assert len(chunks) == -(-len(df) // 4)
+    assert len(shares) == len(chunks) and shares[-1] == 1.0
+    streamed = [risk for chunk in chunks for risk in chunk]
+    _check(streamed, df)
+    assert [_without_now(risk) for risk in streamed] == \
+        [_without_now(risk) for risk in RiskParser.parse_csv(content)]
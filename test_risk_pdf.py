@@ -0,0 +1,33 @@
+"""
+Risk PDF export test
+A PDF is built once per register version and layout, then served from the
+cache until the register changes
+"""
+import asyncio
+
+from repositories.risk_repository import RiskRepository
+from services.risk_pdf import RiskPdfExporter
+
+
+def test_pdf_cached_until_register_changes(tmp_path):
+    repo = RiskRepository(str(tmp_path / "risks"))
+    repo.save_risks('PDF Test', [
+        {'id': f"PDF-{n}", 'title': f"Risk {n}", 'severity_normalized': 'high'}
+        for n in range(1, 4)
+    ])
+    exporter = RiskPdfExporter(tmp_path / "pdfs")
+
+    async def export(layout='landscape'):
+        return await exporter.get_pdf(repo, 'PDF Test', layout)
+
+    async def export_twice():
+        return await asyncio.gather(export(), export())
+
+    first, shared = asyncio.run(export_twice())
+    assert first == shared and first.read_bytes().startswith(b'%PDF')
+    assert asyncio.run(export()) == first
+    assert asyncio.run(export('portrait')) != first
+
+    repo.delete_risk('PDF Test', 'PDF-2')
+    assert asyncio.run(export()) != first
+    assert asyncio.run(exporter.get_pdf(repo, 'Missing', 'landscape')) is None
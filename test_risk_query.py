@@ -0,0 +1,103 @@
+"""
+Risk query test
+Cursor pages of a filtered, sorted query must together return every match
+exactly once, in order, and the indexes must follow register changes
+"""
+from repositories.risk_repository import RiskRepository
+from services.risk_query import RiskQueryService
+
+
+def _risks():
+    severities = ['low', 'medium', 'high', 'critical']
+    return [
+        {
+            'id': f"QT-{n:03d}",
+            'title': f"Risk {n % 7}",
+            'severity_normalized': severities[n % 4],
+            'status': 'closed' if n % 5 == 0 else 'open',
+            'date_identified': f"2025-0{n % 9 + 1}-01" if n % 10 else None
+        }
+        for n in range(1, 101)
+    ]
+
+
+def test_cursor_pages_follow_sort_and_filters(tmp_path):
+    repo = RiskRepository(str(tmp_path))
+    repo.save_risks('Query Test', _risks())
+    service = RiskQueryService(repo)
+
+    ids, cursor = [], None
+    while True:
+        page = service.query(
+            'Query Test', filters={'status': ['open']}, sort='severity',
+            order='desc', limit=7, cursor=cursor, fields=['severity_normalized']
+        )
+        ids += [risk['id'] for risk in page['risks']]
+        assert all(set(risk) == {'id', 'severity_normalized'} for risk in page['risks'])
+        cursor = page['next_cursor']
+        if not cursor:
+            break
+
+    order = {'critical': 0, 'high': 1, 'medium': 2, 'low': 3}
+    expected = sorted(
+        (risk for risk in _risks() if risk['status'] == 'open'),
+        key=lambda risk: order[risk['severity_normalized']]
+    )
+    assert ids == [risk['id'] for risk in expected]
+    assert page['total'] == len(expected)
+
+    dated = service.query('Query Test', date_from='2025-03-01', date_to='2025-04-30', limit=500)
+    assert {risk['date_identified'] for risk in dated['risks']} == {'2025-03-01', '2025-04-01'}
+
+    repo.delete_risk('Query Test', 'QT-003')
+    assert service.query('Query Test', filters={'severity': ['critical']}, limit=500)['total'] == 24
+
+
+def test_cursor_resumes_after_its_sort_key_when_the_last_risk_moves(tmp_path):
+    repo = RiskRepository(str(tmp_path))
+    repo.save_risks('Query Test', _risks())
+    service = RiskQueryService(repo)
+
+    first = service.query('Query Test', sort='severity', order='desc', limit=10)
+    anchor = first['risks'][-1]['id']
+    repo.update_risk('Query Test', anchor, lambda risk: risk.update(severity_normalized='low'))
+
+    ids, cursor = [risk['id'] for risk in first['risks']], first['next_cursor']
+    while cursor:
+        page = service.query('Query Test', sort='severity', order='desc', limit=10, cursor=cursor)
+        ids += [risk['id'] for risk in page['risks']]
+        cursor = page['next_cursor']
+
+    # Every other risk is returned once; the moved one shows up again at its new place
+    assert sorted(ids) == sorted([risk['id'] for risk in _risks()] + [anchor])
+    assert ids.index(anchor, 10) > ids.index('QT-004')
+
+
+def test_cursor_survives_deletes_and_inserts_before_it(tmp_path):
+    from repositories.risk_store import RiskStore
+
+    repo = RiskRepository(str(tmp_path))
+    repo.save_risks('Query Test', [
+        {'id': f"P-{n:03d}", 'severity_normalized': 'high'} for n in range(1, 11)
+    ])
+    service = RiskQueryService(repo)
+
+    for sort in ('position', 'severity'):
+        first = service.query('Query Test', filters={'severity': ['high']}, sort=sort, limit=5)
+        assert [risk['id'] for risk in first['risks']] == [f"P-{n:03d}" for n in range(1, 6)]
+        repo.delete_risk('Query Test', 'P-001')
+        repo.create_risk('Query Test', {'severity_normalized': 'high'}, 'P')
+        second = service.query(
+            'Query Test', filters={'severity': ['high']}, sort=sort, limit=5, cursor=first['next_cursor']
+        )
+        assert [risk['id'] for risk in second['risks']][:5] == [f"P-{n:03d}" for n in range(6, 11)]
+        repo.save_risks('Query Test', [
+            {'id': f"P-{n:03d}", 'severity_normalized': 'high'} for n in range(1, 11)
+        ])
+
+    # Sequence numbers are persisted, so a reload keeps cursors valid
+    repo.delete_risk('Query Test', 'P-002')
+    repo.create_risk('Query Test', {'severity_normalized': 'high'}, 'P')
+    assert RiskStore(str(tmp_path)).list_sequenced('Query Test') == repo.store.list_sequenced('Query Test')
+    repo.store.rewrite('Query Test', lambda risks: risks)
+    assert RiskStore(str(tmp_path)).list_sequenced('Query Test') == repo.store.list_sequenced('Query Test')
@@ -0,0 +1,200 @@
+"""
+Risk store test
+Concurrent inserts and read-modify-write updates through RiskStore must not
+lose updates or reuse IDs, and a fresh store must replay the journal
+"""
+import threading
+
+from repositories.risk_store import RiskStore
+
+
+def test_concurrent_edits_and_journal_replay(tmp_path):
+    store = RiskStore(str(tmp_path), compact_min_entries=25)
+    store.replace_all('Program', [
+        {'id': f"PRG-{n:03d}", 'severity_normalized': 'low', 'edits': 0}
+        for n in range(1, 4)
+    ])
+
+    created = []
+
+    def edit():
+        for _ in range(20):
+            created.append(store.insert('Program', {'severity_normalized': 'high'}, 'PRG')['id'])
+            store.update('Program', 'PRG-001', lambda risk: risk.update(edits=risk['edits'] + 1))
+
+    threads = [threading.Thread(target=edit) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(set(created)) == 120
+    assert 'PRG-002' not in created
+    assert store.get('Program', 'PRG-001')['edits'] == 120
+    assert store.severity_counts('Program') == {'critical': 0, 'high': 120, 'medium': 0, 'low': 3}
+
+    assert store.delete('Program', 'PRG-002')
+    assert not store.delete('Program', 'PRG-002')
+
+    reloaded = RiskStore(str(tmp_path))
+    assert reloaded.list('Program') == store.list('Program')
+    assert reloaded.severity_counts('Program') == {'critical': 0, 'high': 120, 'medium': 0, 'low': 2}
+    assert reloaded.allocate_id('Program', 'PRG') == 'PRG-124'
+
+
+def test_alias_index_resolves_variants_and_survives_restart(tmp_path):
+    store = RiskStore(str(tmp_path))
+    store.replace_all('Line Plan', [{'id': 'LP-001', 'severity_normalized': 'low'}])
+    store.aliases.add('Line Plan', ['Line Plan-09.xml', 'LP-1'])
+
+    assert store.aliases.resolve('line plan-10.xlsx') == 'Line Plan'
+    assert store.aliases.resolve('LP-1') == 'Line Plan'
+    assert store.aliases.resolve('Line Plan-10.xlsx', exact=True) is None
+
+    reloaded = RiskStore(str(tmp_path))
+    assert reloaded.aliases.resolve('LP-1') == 'Line Plan'
+    reloaded.remove('Line Plan')
+    assert reloaded.aliases.resolve('Line Plan') is None
+
+
+def test_alias_never_takes_over_another_programs_name(tmp_path):
+    store = RiskStore(str(tmp_path))
+    store.replace_all('PRJ1', [{'id': 'P-001', 'severity_normalized': 'low'}])
+    store.replace_all('ABC', [{'id': 'A-001', 'severity_normalized': 'low'}])
+    store.aliases.add('Widget', ['PRJ1', 'W-1'])
+
+    assert store.aliases.resolve('PRJ1') == 'PRJ1'
+    assert store.aliases.resolve('W-1') == 'Widget'
+    assert RiskStore(str(tmp_path)).aliases.resolve('PRJ1') == 'PRJ1'
+
+    # The text before the first dash is only tried on request
+    assert store.aliases.resolve('ABC-Phase Two') is None
+    assert store.aliases.resolve('ABC-Phase Two', prefix=True) == 'ABC'
+
+
+def test_manifest_tracks_every_write(tmp_path):
+    store = RiskStore(str(tmp_path))
+    store.replace_all('Program', [
+        {'id': 'PRG-001', 'severity_normalized': 'high', 'status': 'Open'},
+        {'id': 'PRG-002', 'severity_normalized': 'low', 'status': 'Closed'}
+    ])
+    store.insert('Program', {'severity_normalized': 'high'}, 'PRG')
+    store.update('Program', 'PRG-002', lambda risk: risk.update(status='open'))
+
+    entry = store.manifest.get('Program')
+    assert entry['risk_count'] == 3
+    assert entry['severity_counts'] == {'critical': 0, 'high': 2, 'medium': 0, 'low': 1}
+    assert entry['status_counts'] == {'open': 3}
+
+    # A missing manifest is rebuilt from the registers (journal included)
+    (tmp_path / 'risk_manifest.json').unlink()
+    rebuilt = RiskStore(str(tmp_path)).manifest.get('Program')
+    assert {k: rebuilt[k] for k in ('risk_count', 'severity_counts', 'status_counts')} == \
+        {k: entry[k] for k in ('risk_count', 'severity_counts', 'status_counts')}
+
+    store.remove('Program')
+    assert store.manifest.entries() == []
+
+
+def test_aggregates_follow_incremental_writes(tmp_path):
+    from repositories.risk_aggregates import RiskAggregates
+
+    store = RiskStore(str(tmp_path))
+    store.replace_all('Program', [
+        {'id': 'PRG-001', 'likelihood': 'high', 'impact': 'low', 'severity_normalized': 'medium',
+         'owner': 'Ann', 'category': 'Cost'},
+        {'id': 'PRG-002', 'likelihood': 'medium', 'impact': 'high', 'severity_normalized': 'high',
+         'status': 'Closed'}
+    ])
+    store.insert('Program', {'likelihood': 'high', 'impact': 'high',
+                             'severity_normalized': 'critical', 'owner': 'Ann'}, 'PRG')
+    store.update('Program', 'PRG-001', lambda risk: risk.update(impact='medium', category=None))
+    store.delete('Program', 'PRG-002')
+
+    aggregates = store.aggregates('Program')
+    labels = store.owner_labels('Program')
+    assert aggregates == RiskAggregates.from_risks(store.list('Program'), labels.get).to_dict()
+    assert aggregates['matrix'] == [[0, 0, 0], [0, 0, 0], [0, 1, 1]]
+    assert aggregates['owners'] == {'Ann': 2}
+    assert aggregates['labeled_owners'] == {'Owner A': 2}
+    assert aggregates['categories'] == {'Uncategorized': 2}
+    assert (aggregates['open'], aggregates['closed']) == (2, 0)
+
+
+def test_streamed_replace_and_eviction(tmp_path):
+    store = RiskStore(str(tmp_path), max_programs=2)
+    store.replace_all('Stream', [{'id': 'OLD-001', 'severity_normalized': 'low'}])
+    chunks = (
+        [{'id': f"ST-{n:03d}", 'severity_normalized': 'high', 'status': 'open'} for n in range(start, start + 5)]
+        for start in (1, 6, 11)
+    )
+    result = store.replace_stream('Stream', chunks)
+    assert result['risk_count'] == 15
+    assert result['severity_counts'] == {'critical': 0, 'high': 15, 'medium': 0, 'low': 0}
+    assert store.aggregates('Stream')['status_counts'] == {'open': 15}
+    assert store.manifest.get('Stream')['risk_count'] == 15
+    assert RiskStore(str(tmp_path)).list('Stream') == store.list('Stream')
+    assert not list(tmp_path.glob('*.tmp'))
+
+    version = store.version('Stream')
+    for name in ('Other A', 'Other B'):
+        store.replace_all(name, [{'id': 'X-001', 'severity_normalized': 'medium'}])
+    assert len(store._programs) == 2
+    # An evicted register is reloaded from disk with a newer version
+    assert store.count('Stream') == 15
+    assert store.version('Stream') > version
+
+
+def test_concurrent_streamed_imports_use_their_own_files(tmp_path):
+    store = RiskStore(str(tmp_path))
+    both_writing = threading.Barrier(2)
+
+    def chunks(prefix):
+        yield [{'id': f"{prefix}-001", 'severity_normalized': 'low'}]
+        both_writing.wait(timeout=5)
+        yield [{'id': f"{prefix}-002", 'severity_normalized': 'low'}]
+
+    threads = [threading.Thread(target=store.replace_stream, args=('Stream', chunks(p))) for p in 'AB']
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(risk['id'] for risk in RiskStore(str(tmp_path)).list('Stream')) in (
+        ['A-001', 'A-002'], ['B-001', 'B-002']
+    )
+
+    def failing():
+        yield [{'id': 'C-001'}]
+        raise ValueError("bad row")
+
+    try:
+        store.replace_stream('Stream', failing())
+    except ValueError:
+        pass
+    assert store.count('Stream') == 2
+    assert not list(tmp_path.glob('*.tmp'))
+
+
+def test_owner_labels_are_kept_across_writes_and_reloads(tmp_path):
+    from repositories.risk_repository import RiskRepository
+
+    repo = RiskRepository(str(tmp_path))
+    repo.save_risks('Program', [
+        {'id': 'PRG-001', 'owner': 'Ann'},
+        {'id': 'PRG-002', 'owner': 'Bob'},
+        {'id': 'PRG-003', 'owner': 'Safran Ops'}
+    ])
+    assert [risk['owner'] for risk in repo.load_risks('Program')] == ['Owner A', 'Owner B', 'Owner C']
+
+    # Removing Ann's only risk does not shift the other labels
+    repo.delete_risk('Program', 'PRG-001')
+    repo.create_risk('Program', {'owner': 'Cy'}, 'PRG')
+    assert repo.get_risk('Program', 'PRG-002')['owner'] == 'Owner B'
+    assert repo.get_risk('Program', 'PRG-004')['owner'] == 'Owner D'
+    assert repo.get_aggregates('Program')['owners'] == {'Owner B': 1, 'Owner C': 1, 'Owner D': 1}
+    assert [risk['owner'] for risk in repo.iter_risks('Program')] == ['Owner B', 'Owner C', 'Owner D']
+
+    reloaded = RiskStore(str(tmp_path))
+    assert reloaded.owner_labels('Program') == repo.store.owner_labels('Program')
+    repo.store.rewrite('Program', lambda risks: risks)
+    assert RiskStore(str(tmp_path)).owner_labels('Program') == reloaded.owner_labels('Program')
@@ -0,0 +1,64 @@
+"""
+Risk XLSX export test
+An exported register must read back through the upload parser unchanged,
+with severity cells colored
+"""
+from openpyxl import load_workbook
+
+from repositories.risk_repository import RiskRepository
+from services.risk_parser import RiskParser
+from services.risk_xlsx import SEVERITY_COLORS, write_risk_xlsx
+
+
+def test_xlsx_export_round_trips(tmp_path):
+    levels = ['low', 'medium', 'high']
+    risks = [
+        {
+            'id': f"XL-{n:03d}",
+            'title': f"Risk {n}",
+            'likelihood': levels[n % 3],
+            'impact': levels[n // 3 % 3],
+            'severity_normalized': RiskParser.calculate_severity(levels[n % 3], levels[n // 3 % 3]),
+            'mitigations': [f"Step {n}", "Review"],
+            'owner': f"Person {n % 4}",
+            'status': 'open',
+            'category': 'schedule'
+        }
+        for n in range(1, 51)
+    ]
+    repo = RiskRepository(str(tmp_path / "risks"))
+    repo.save_risks('XLSX Test', risks)
+
+    path = tmp_path / "export.xlsx"
+    assert write_risk_xlsx(repo.iter_risks('XLSX Test'), 'XLSX Test', str(path)) == 50
+
+    imported = RiskParser.parse_excel(path.read_bytes())
+    stored = repo.load_risks('XLSX Test')
+    for field in ('id', 'title', 'likelihood', 'impact', 'severity_normalized', 'owner'):
+        assert [risk[field] for risk in imported] == [risk[field] for risk in stored]
+    assert imported[0]['mitigations'] == "Step 1\nReview"
+
+    sheet = load_workbook(path).active
+    first = next(sheet.iter_rows(min_row=2, max_row=2))
+    assert first[5].fill.fgColor.rgb.endswith(SEVERITY_COLORS[stored[0]['severity_normalized']][0])
+    assert repo.iter_risks('Missing') is None
+
+
+def test_xlsx_export_keeps_formula_like_text_as_text(tmp_path):
+    risks = [
+        {'id': 'XL-001', 'title': '=HYPERLINK("http://example.com","Click")',
+         'description': '= supplier late', 'likelihood': 'high', 'impact': 'high',
+         'severity_normalized': 'high', 'owner': '=1+1', 'status': 'open'},
+        {'id': 'XL-002', 'title': 'Plain', 'likelihood': 'low', 'impact': 'low',
+         'severity_normalized': 'low', 'status': 'open'},
+    ]
+    path = tmp_path / "export.xlsx"
+    write_risk_xlsx(risks, 'Formula Test', str(path))
+
+    cells = next(load_workbook(path).active.iter_rows(min_row=2, max_row=2))
+    assert [cells[i].data_type for i in (1, 2, 7)] == ['s', 's', 's']
+
+    imported = RiskParser.parse_excel(path.read_bytes())
+    assert imported[0]['title'] == '=HYPERLINK("http://example.com","Click")'
+    assert imported[0]['description'] == '= supplier late'
+    assert imported[0]['owner'] == '=1+1'
@@ -0,0 +1,43 @@
+"""
+Slide cache test
+Concurrent exports of one report must not delete each other's captures,
+and only the most recently used reports are kept
+"""
+from services.slide_cache import SlideCache, fingerprint_slide
+
+
+def test_concurrent_commits_and_report_eviction(tmp_path):
+    cache = SlideCache(tmp_path / "cache", max_reports=2)
+    image = tmp_path / "capture.img"
+    image.write_bytes(b"capture")
+
+    cache.begin('report')
+    cache.begin('report')
+    cache.store('report', 'first', image)
+    cache.store('report', 'second', image)
+
+    # The first export's commit keeps the capture the second still needs
+    cache.commit('report', ['first'])
+    cache.end('report')
+    assert cache.lookup('report', 'first') == b"capture"
+    cache.commit('report', ['second'])
+    cache.end('report')
+    assert cache.lookup('report', 'second') == b"capture"
+    assert cache.lookup('report', 'first') is None
+
+    for report in ('newer', 'newest'):
+        cache.begin(report)
+        cache.store(report, 'slide', image)
+        cache.commit(report, ['slide'])
+        cache.end(report)
+    assert sorted(p.name for p in (tmp_path / "cache").iterdir()) == ['newer', 'newest']
+
+
+def test_fingerprint_covers_capture_options():
+    base = fingerprint_slide('/dashboard', 'v1', None, 't1', viewport=(1920, 1080))
+    assert base == fingerprint_slide('/dashboard', 'v1', None, 't1', viewport=(1920, 1080))
+    assert base != fingerprint_slide('/dashboard', 'v1', None, 't1', viewport=(1280, 1080))
+    assert base != fingerprint_slide('/dashboard', 'v1', None, 't1', viewport=(1920, 720))
+    assert base != fingerprint_slide(
+        '/dashboard', 'v1', None, 't1', viewport=(1920, 1080), hide_navigation=True
+    )
@@ -0,0 +1,79 @@
+"""
+Native table fast path test
+Builds the risk, milestone and changes tables with and without prototype
+cell stamping and checks the slide XML is identical
+"""
+import io
+from datetime import datetime, timedelta
+
+from lxml import etree
+from pptx import Presentation
+
+from services.builder_service import create_builder
+
+
+def _dates(days):
+    today = datetime.now()
+    return [(today + timedelta(days=d)).strftime('%Y-%m-%d') for d in days]
+
+
+def _slides_data():
+    risks = [
+        {
+            'id': f"R-{n:03d}",
+            'title': f"Supplier risk {n}" if n != 4 else "Multi\nline title",
+            'mitigation': '' if n == 2 else f"Dual source & qualify <vendor {n}>",
+            'severity_normalized': ['high', 'medium', 'low', 'critical'][n % 4],
+            'status': 'open',
+            'owner': '' if n == 5 else 'Owner A',
+            'likelihood': n % 5 + 1,
+            'impact': 3,
+        }
+        for n in range(1, 9)
+    ]
+    this_month = _dates([0, 0, 0, 0, 0, 0])
+    milestones = [
+        {
+            'name': name,
+            'target_date': date,
+            'status': status,
+            'resources': resources,
+        }
+        for name, date, status, resources in zip(
+            ['Design review', 'PPAP\nsubmission', 'Line trial', 'SOP', 'Audit', 'Release'],
+            this_month,
+            ['COMPLETED', 'IN_PROGRESS', 'NOT_STARTED', 'IN_PROGRESS', 'COMPLETED', 'NOT_STARTED'],
+            ['Team A', '', 'Team B', 'Team A', 'Team C', ''],
+        )
+    ]
+    changes = [
+        {
+            'milestone_name': f"Milestone {n}-2025-01-01-to-2025-02-01",
+            'old_date': '2025-01-01',
+            'new_date': '2025-02-01',
+            'reason': 'Vendor delay' if n != 3 else '',
+            'impact': 'Expedite\ttooling' if n != 4 else 'Line 1\nLine 2',
+        }
+        for n in range(1, 10)
+    ]
+    return [
+        {'type': 'risks', 'data': risks, 'title': 'Risk Register', 'page_num': 1, 'total_pages': 1},
+        {'type': 'milestones', 'data': milestones, 'title': 'Milestones'},
+        {'type': 'changes', 'data': changes, 'title': 'Schedule Changes', 'rows_per_slide': 6},
+    ]
+
+
+def _slide_xml(fast: bool):
+    builder = create_builder()
+    builder.FAST_TABLES = fast
+    pptx_bytes = builder.generate_hybrid_presentation({'title': 'Tables'}, _slides_data())
+    prs = Presentation(io.BytesIO(pptx_bytes))
+    return [etree.tostring(slide._element) for slide in prs.slides]
+
+
+def test_fast_tables_match_slow_path():
+    """Stamped cells must serialize exactly like individually formatted ones"""
+    fast, slow = _slide_xml(True), _slide_xml(False)
+    # Title, risks, milestones, two pages of changes
+    assert len(fast) == 5
+    assert fast == slow
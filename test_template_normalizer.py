@@ -0,0 +1,94 @@
+"""
+Tests for template normalization at upload
+The normalized copy must stay usable by the builder (layout indexes 0-6)
+and every image it references must still resolve
+"""
+import io
+import os
+
+from PIL import Image
+from pptx import Presentation
+from pptx.parts.image import ImagePart
+from pptx.util import Inches
+
+from services.builder_service import create_builder
+from services.template_normalizer import BUILDER_LAYOUT_COUNT, TemplateNormalizer
+from services.template_preview import TemplatePreviewService
+
+
+def _png(color, size=(200, 100)) -> bytes:
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color=color).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def _add_logo(slide_like, image: bytes, name: str):
+    """Put a picture on a master or layout (their shape trees have no add_picture)."""
+    _, rId = slide_like.part.get_or_add_image_part(io.BytesIO(image))
+    spTree = slide_like.shapes._spTree
+    spTree.add_pic(spTree.max_shape_id + 1, name, '', rId, Inches(0.2), Inches(0.2), Inches(1), Inches(0.5))
+
+
+def _template(path):
+    """Default 11-layout template with logos, sample slides and a large image."""
+    prs = Presentation()
+    logo = _png((200, 30, 30))
+    _add_logo(prs.slide_master, logo, 'Master Logo')
+    _add_logo(prs.slide_layouts[1], logo, 'Layout Logo')
+    _add_logo(prs.slide_layouts[9], _png((30, 30, 200)), 'Unused Layout Logo')
+    for n in range(3):
+        slide = prs.slides.add_slide(prs.slide_layouts[n])
+        slide.shapes.add_picture(io.BytesIO(logo), Inches(1), Inches(1))
+    noisy = Image.frombytes('RGB', (1200, 900), os.urandom(1200 * 900 * 3))
+    buffer = io.BytesIO()
+    noisy.save(buffer, format='PNG')
+    prs.slides[0].shapes.add_picture(buffer, Inches(2), Inches(2), Inches(4))
+    prs.save(path)
+    return prs
+
+
+def _assert_media_resolve(prs):
+    for part in prs.part.package.iter_parts():
+        for rel in part.rels.values():
+            if not rel.is_external and isinstance(rel.target_part, ImagePart):
+                Image.open(io.BytesIO(rel.target_part.blob)).load()
+
+
+def test_normalized_template_keeps_builder_layouts_and_media(tmp_path):
+    source, normalized = tmp_path / "template.pptx", tmp_path / "normalized" / "template.pptx"
+    layout_names = [layout.name for layout in _template(source).slide_layouts]
+
+    report = TemplateNormalizer(max_media_bytes=64 * 1024, max_media_px=800).normalize(source, normalized)
+    assert report['removed_slides'] == 2
+    assert report['removed_layouts'] == len(layout_names) - BUILDER_LAYOUT_COUNT
+    assert report['recompressed_media'] == 1
+    assert report['normalized_bytes'] < report['original_bytes']
+
+    prs = Presentation(normalized)
+    assert [layout.name for layout in prs.slide_layouts] == layout_names[:BUILDER_LAYOUT_COUNT]
+    _assert_media_resolve(prs)
+
+    # Every layout index the builder uses can still be added from the template
+    builder = create_builder()
+    builder._load_template(str(normalized))
+    for layout_idx in range(BUILDER_LAYOUT_COUNT):
+        builder.presentation.slides.add_slide(builder.presentation.slide_layouts[layout_idx])
+    deck = Presentation(io.BytesIO(builder._save_to_bytes()))
+    assert [slide.slide_layout.name for slide in deck.slides][-BUILDER_LAYOUT_COUNT:] == (
+        layout_names[:BUILDER_LAYOUT_COUNT]
+    )
+    assert any(shape.name == 'Master Logo' for shape in deck.slide_master.shapes)
+    assert any(shape.name == 'Layout Logo' for shape in deck.slide_layouts[1].shapes)
+    _assert_media_resolve(deck)
+
+    # A full export on the normalized template still works
+    pptx_bytes = create_builder().generate_hybrid_presentation(
+        {'title': 'Normalized', 'include_title_slide': True},
+        [{'type': 'screenshot', 'data': _png((0, 120, 80), (800, 450)), 'title': 'Dashboard'}],
+        template_path=str(normalized),
+    )
+    _assert_media_resolve(Presentation(io.BytesIO(pptx_bytes)))
+
+    # Previews render from the normalized file, one per remaining layout
+    previews = TemplatePreviewService(tmp_path / "previews")
+    assert previews.render_all(normalized, "ab" * 32) == BUILDER_LAYOUT_COUNT * 3